@@ -13,3 +13,13 @@ scripts/bots.py \
     --beam_size 1 \
     --confidence_level 0.75 \
     --output_pickle "out/reports/bots__band_1k__target_75__hill_climbing.pkl"
+
+echo "Generating adversarial examples with the hill climbing search..."
+scripts/bots.py \
+    1 \
+    --log_file "log/bots__band_1k__target_75__hill_climbing_search.log" \
+    --popularity_band 1k \
+    --bins 20 \
+    --search hill_climbing \
+    --confidence_level 0.75 \
+    --output_pickle "out/reports/bots__band_1k__target_75__hill_climbing_search.pkl"
@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the graph search engines.
+
+Runs the searches on a synthetic bots-like categorical problem (quantized one-hot
+features, transformations that shift a quantized value by one bin), and on the
+website fingerprinting traces.
+"""
+
+import sys
+
+sys.path.append("..")
+
+# Ignore warnings.
+import warnings
+
+warnings.filterwarnings("ignore")
+
+import functools
+import time
+import tracemalloc
+
+import click
+import numpy as np
+
+from sklearn.linear_model import LogisticRegression
+
+from trickster.optim import CategoricalLpProblemContext
+from trickster.domain.categorical import FeatureExpansionSpec, Node
+from trickster.domain.categorical import expand_quantized
+from trickster.utils.counter import ExpansionCounter
+from trickster.utils.log import setup_custom_logger
+
+
+def make_categorical_problem(num_features=12, bins=20, num_examples=500, seed=1):
+    """Fit a logistic regression on random quantized data, and pick an example to attack.
+
+    :return: Tuple (problem context, initial node).
+    """
+    rng = np.random.RandomState(seed)
+    values = rng.randint(bins, size=(num_examples, num_features))
+    X = np.zeros((num_examples, num_features * bins))
+    for j in range(num_features):
+        X[np.arange(num_examples), j * bins + values[:, j]] = 1
+    w = rng.randn(num_features)
+    y = (values.dot(w) > np.median(values.dot(w))).astype(int)
+
+    clf = LogisticRegression(C=0.1).fit(X, y)
+    specs = [
+        FeatureExpansionSpec(
+            idxs=list(range(j * bins, (j + 1) * bins)), expand_fn=expand_quantized
+        )
+        for j in range(num_features)
+    ]
+    problem_ctx = CategoricalLpProblemContext(
+        clf=clf,
+        target_class=0,
+        target_confidence=0.5,
+        lp_space=1,
+        expansion_specs=specs,
+    )
+
+    # The most confidently classified example is the hardest one.
+    idx = np.argmax(clf.predict_proba(X)[:, 1])
+    return problem_ctx, Node(src=X[idx])
+
+
+def make_wfp_problem(data_path, num_traces=50, max_trace_len=None, seed=1):
+    """Fit a logistic regression on CUMUL features of the traces, and pick a trace to attack.
+
+    :return: Tuple (problem context, initial node).
+    """
+    from wfp_attacks import WfpProblemContext, TraceNode
+    from trickster.domain.wfp import extract, load_data
+
+    traces, y = load_data(
+        data_path,
+        max_traces=num_traces,
+        max_trace_len=max_trace_len,
+        filter_by_len=False,
+        verbose=False,
+    )
+    X = np.array([extract(trace) for trace in traces])
+    clf = LogisticRegression(max_iter=1000, random_state=seed).fit(X, y)
+    problem_ctx = WfpProblemContext(
+        clf=clf, target_class=1, target_confidence=0.5, epsilon=1
+    )
+
+    idx = np.argmin(clf.predict_proba(X)[:, 1])
+    return problem_ctx, TraceNode(traces[idx])
+
+
+def make_problem(problem, data_path, max_trace_len=None):
+    if problem == "categorical":
+        problem_ctx, initial_node = make_categorical_problem()
+        return problem_ctx.get_graph_search_problem(initial_node.src), initial_node
+    elif problem == "wfp":
+        problem_ctx, initial_node = make_wfp_problem(
+            data_path, max_trace_len=max_trace_len
+        )
+        return problem_ctx.get_graph_search_problem(), initial_node
+
+
+def run_search(graph_search_problem, initial_node, trace_memory=False, **kwargs):
+    """Run the search and collect statistics.
+
+    :return: Dictionary with the number of expanded and generated nodes, the
+            number of heuristic and goal function calls, the runtime, and the
+            peak memory if ``trace_memory`` is set.
+    """
+    num_generated = [0]
+    num_calls = [0]
+
+    def expand_fn(node):
+        children = list(graph_search_problem.expand_fn(node))
+        num_generated[0] += len(children)
+        return children
+
+    def counted(fn):
+        def wrapped(*args):
+            num_calls[0] += 1
+            return fn(*args)
+
+        return wrapped
+
+    if kwargs.get("heuristic_batch_fn") is not None:
+        kwargs["heuristic_batch_fn"] = counted(kwargs["heuristic_batch_fn"])
+
+    ExpansionCounter.set_global_default(ExpansionCounter())
+    if trace_memory:
+        tracemalloc.start()
+
+    t0 = time.time()
+    result = graph_search_problem.search_fn(
+        initial_node,
+        expand_fn=expand_fn,
+        goal_fn=counted(graph_search_problem.goal_fn),
+        heuristic_fn=counted(graph_search_problem.heuristic_fn),
+        hash_fn=graph_search_problem.hash_fn,
+        **kwargs,
+    )
+    runtime = time.time() - t0
+
+    stats = dict(
+        result=result,
+        found=result[0] is not None,
+        expanded=ExpansionCounter.get_default().count,
+        generated=num_generated[0],
+        clf_calls=num_calls[0],
+        runtime=runtime,
+    )
+    if trace_memory:
+        _, stats["peak_bytes"] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return stats
+
+
+common_options = [
+    click.option(
+        "--problem",
+        default="categorical",
+        show_default=True,
+        type=click.Choice(["categorical", "wfp"]),
+        help="Benchmark problem.",
+    ),
+    click.option(
+        "--data_path",
+        default="data/wfp_traces_toy",
+        show_default=True,
+        type=click.Path(),
+        help="Path to the traces, if the problem is wfp.",
+    ),
+    click.option(
+        "--max_trace_len",
+        default=500,
+        show_default=True,
+        help="Truncate the traces to this length, if the problem is wfp.",
+    ),
+    click.option(
+        "--iter_lim",
+        default=200,
+        show_default=True,
+        help="Max number of search iterations.",
+    ),
+    click.option(
+        "--log_file",
+        default="log/bench_search.log",
+        type=click.Path(),
+        help="Log file path.",
+    ),
+]
+
+
+def add_options(options):
+    def _add_options(func):
+        for option in reversed(options):
+            func = option(func)
+        return func
+
+    return _add_options
+
+
+@click.group()
+def cli():
+    """Benchmark the graph search engines."""
+    pass
+
+
+@cli.command()
+@add_options(common_options)
+def memory(problem, data_path, max_trace_len, iter_lim, log_file):
+    """Memory per generated node with and without the lean bookkeeping.
+
+    Reports the peak traced memory, which includes the nodes in the open set.
+    """
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    peak = {}
+    for lean in [False, True]:
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            trace_memory=True,
+            iter_lim=iter_lim,
+            lean=lean,
+        )
+        peak[lean] = stats["peak_bytes"] / max(stats["generated"], 1)
+        logger.info(
+            "lean={}: {} generated, {:.0f} peak bytes per generated node, "
+            "{:.2f}s".format(lean, stats["generated"], peak[lean], stats["runtime"])
+        )
+    logger.info("Reduction: {:.2f}x peak".format(peak[False] / peak[True]))
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--table_size",
+    default=100000,
+    show_default=True,
+    help="Size of the IDA* transposition table.",
+)
+@click.option(
+    "--confidence_margin",
+    default=0.1,
+    show_default=True,
+    help="Target confidence above the initial one. IDA* is too slow for the "
+    "default target.",
+)
+def ida(
+    problem, data_path, max_trace_len, iter_lim, log_file, table_size, confidence_margin
+):
+    """Classifier calls of IDA* with and without the transposition table."""
+    from trickster.search import ida_star_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+    graph_search_problem.search_fn = ida_star_search
+
+    # Lower the target so that the search terminates in reasonable time.
+    problem_ctx = graph_search_problem.goal_fn.problem_ctx
+    init_confidence = problem_ctx.clf.predict_proba([initial_node.features])[
+        0, problem_ctx.target_class
+    ]
+    problem_ctx.target_confidence = init_confidence + confidence_margin
+
+    calls = {}
+    for size in [None, table_size]:
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            table_size=size,
+        )
+        calls[size] = stats["clf_calls"]
+        logger.info(
+            "table_size={}: found={}, {} classifier calls, {} expanded, {:.2f}s".format(
+                size,
+                stats["found"],
+                stats["clf_calls"],
+                stats["expanded"],
+                stats["runtime"],
+            )
+        )
+    logger.info("Reduction: {:.2f}x".format(calls[None] / calls[table_size]))
+
+
+@cli.command()
+@add_options(common_options)
+def greedy(problem, data_path, max_trace_len, iter_lim, log_file):
+    """Expansions per second of hill climbing and of A* with beam size 1."""
+    from trickster.search import generalized_a_star_search, hill_climbing_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    throughput = {}
+    for name, search_fn, kwargs in [
+        ("beam_size=1", generalized_a_star_search, dict(beam_size=1)),
+        ("hill_climbing", hill_climbing_search, {}),
+    ]:
+        graph_search_problem.search_fn = search_fn
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            **kwargs,
+        )
+        throughput[name] = stats["expanded"] / stats["runtime"]
+        logger.info(
+            "{}: found={}, {} expanded, {:.0f} expansions/s".format(
+                name, stats["found"], stats["expanded"], throughput[name]
+            )
+        )
+    logger.info(
+        "Speedup: {:.2f}x".format(
+            throughput["hill_climbing"] / throughput["beam_size=1"]
+        )
+    )
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--expansion_width",
+    default=8,
+    show_default=True,
+    help="Number of nodes that are expanded together.",
+)
+@click.option(
+    "--num_workers",
+    default=4,
+    show_default=True,
+    help="Number of worker processes that expand a batch.",
+)
+def batch(
+    problem, data_path, max_trace_len, iter_lim, log_file, expansion_width, num_workers
+):
+    """Runtime of A* with and without batch expansion in worker processes."""
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    runtime = {}
+    for name, kwargs in [
+        ("a_star", {}),
+        ("batch", dict(expansion_width=expansion_width)),
+        (
+            "batch_workers",
+            dict(expansion_width=expansion_width, num_workers=num_workers),
+        ),
+    ]:
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            **kwargs,
+        )
+        runtime[name] = stats["runtime"]
+        logger.info(
+            "{}: found={}, cost={}, {} expanded, {} classifier calls, "
+            "{:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["expanded"],
+                stats["clf_calls"],
+                stats["runtime"],
+            )
+        )
+    logger.info(
+        "Speedup: {:.2f}x without workers, {:.2f}x with workers".format(
+            runtime["a_star"] / runtime["batch"],
+            runtime["a_star"] / runtime["batch_workers"],
+        )
+    )
+
+
+@cli.command()
+@add_options(common_options)
+def deferred(problem, data_path, max_trace_len, iter_lim, log_file):
+    """Classifier calls and runtime of A* with and without deferred evaluation."""
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    # The batched evaluation of the children is the baseline that deferred
+    # evaluation has to beat.
+    runtime = {}
+    for name, kwargs in [
+        ("eager", {}),
+        (
+            "eager_batch",
+            dict(heuristic_batch_fn=graph_search_problem.heuristic_batch_fn),
+        ),
+        ("deferred", dict(deferred_heuristic=True)),
+    ]:
+        stats = run_search(
+            graph_search_problem, initial_node, iter_lim=iter_lim, **kwargs
+        )
+        runtime[name] = stats["runtime"]
+        logger.info(
+            "{}: found={}, cost={}, {} classifier calls, {} expanded, "
+            "{:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["clf_calls"],
+                stats["expanded"],
+                stats["runtime"],
+            )
+        )
+    logger.info(
+        "Speedup of deferred evaluation: {:.2f}x over eager, {:.2f}x over "
+        "eager_batch".format(
+            runtime["eager"] / runtime["deferred"],
+            runtime["eager_batch"] / runtime["deferred"],
+        )
+    )
+
+
+@cli.command()
+@add_options(common_options)
+def ties(problem, data_path, max_trace_len, iter_lim, log_file):
+    """Expansions to the goal of A* with every tie breaking policy."""
+    from trickster.search import TIE_BREAKING_POLICIES
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    for tie_breaking in TIE_BREAKING_POLICIES:
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            tie_breaking=tie_breaking,
+        )
+        logger.info(
+            "tie_breaking={}: found={}, {} expanded, {:.2f}s".format(
+                tie_breaking, stats["found"], stats["expanded"], stats["runtime"]
+            )
+        )
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--memory_lim",
+    default=1000,
+    show_default=True,
+    help="Max number of open nodes in memory for the external-memory A*.",
+)
+def external(problem, data_path, max_trace_len, iter_lim, log_file, memory_lim):
+    """Peak memory of A* and of the external-memory A*."""
+    from trickster.search import a_star_search, external_a_star_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    peak = {}
+    for name, search_fn, kwargs in [
+        ("a_star", a_star_search, {}),
+        ("external", external_a_star_search, dict(memory_lim=memory_lim)),
+    ]:
+        graph_search_problem.search_fn = search_fn
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            trace_memory=True,
+            iter_lim=iter_lim,
+            **kwargs,
+        )
+        peak[name] = stats["peak_bytes"]
+        logger.info(
+            "{}: found={}, cost={}, {} expanded, {} generated, {:.1f} MB peak, "
+            "{:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["expanded"],
+                stats["generated"],
+                peak[name] / 2**20,
+                stats["runtime"],
+            )
+        )
+    logger.info("Reduction: {:.2f}x".format(peak["a_star"] / peak["external"]))
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--weight",
+    default=1.5,
+    show_default=True,
+    help="Suboptimality bound of the focal search.",
+)
+def focal(problem, data_path, max_trace_len, iter_lim, log_file, weight):
+    """Expansions and costs of A* and of the focal search."""
+    from trickster.search import a_star_search, focal_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    for name, search_fn, kwargs in [
+        ("a_star", a_star_search, {}),
+        (
+            "focal",
+            focal_search,
+            dict(
+                weight=weight,
+                secondary_batch_fn=graph_search_problem.secondary_batch_fn,
+            ),
+        ),
+    ]:
+        graph_search_problem.search_fn = search_fn
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            **kwargs,
+        )
+        logger.info(
+            "{}: found={}, cost={}, {} expanded, {:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["expanded"],
+                stats["runtime"],
+            )
+        )
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--confidence_margin",
+    default=0.1,
+    show_default=True,
+    help="Target confidence above the initial one. The linear-memory searches "
+    "re-expand nodes, and are too slow for the default target.",
+)
+def linear(problem, data_path, max_trace_len, iter_lim, log_file, confidence_margin):
+    """Peak memory of A* and of the linear-memory searches."""
+    from trickster.search import a_star_search, dfbnb_search, rbfs_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    problem_ctx = graph_search_problem.goal_fn.problem_ctx
+    init_confidence = problem_ctx.clf.predict_proba([initial_node.features])[
+        0, problem_ctx.target_class
+    ]
+    problem_ctx.target_confidence = init_confidence + confidence_margin
+
+    for name, search_fn in [
+        ("a_star", a_star_search),
+        ("dfbnb", dfbnb_search),
+        ("rbfs", rbfs_search),
+    ]:
+        graph_search_problem.search_fn = search_fn
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            trace_memory=True,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+        )
+        logger.info(
+            "{}: found={}, cost={}, {} expanded, {:.1f} MB peak, {:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["expanded"],
+                stats["peak_bytes"] / 2**20,
+                stats["runtime"],
+            )
+        )
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--incumbent_iter_lim",
+    default=100,
+    show_default=True,
+    help="Max number of hill climbing iterations for the incumbent.",
+)
+def incumbent(
+    problem, data_path, max_trace_len, iter_lim, log_file, incumbent_iter_lim
+):
+    """Open set size and peak memory of A* with and without a greedy incumbent."""
+    from trickster.search import a_star_search, hill_climbing_search
+    from trickster.utils.observers import CompositeObserver, OpenSetSizeObserver
+    from trickster.utils.observers import BranchingFactorObserver
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+    graph_search_problem.search_fn = a_star_search
+
+    for name, incumbent_fn in [
+        ("a_star", None),
+        (
+            "incumbent",
+            functools.partial(hill_climbing_search, iter_lim=incumbent_iter_lim),
+        ),
+    ]:
+        sizes = OpenSetSizeObserver()
+        counter = BranchingFactorObserver()
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            trace_memory=True,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            incumbent_fn=incumbent_fn,
+            observer=CompositeObserver(sizes, counter),
+        )
+        logger.info(
+            "{}: found={}, cost={}, {} expanded, {} pruned by the bound, max "
+            "open set {}, {:.1f} MB peak, {:.2f}s".format(
+                name,
+                stats["found"],
+                stats["result"][1],
+                stats["expanded"],
+                counter.num_pruned.get("bound", 0),
+                sizes.max_size,
+                stats["peak_bytes"] / 2**20,
+                stats["runtime"],
+            )
+        )
+
+
+@cli.command()
+@add_options(common_options)
+@click.option(
+    "--num_workers",
+    default=4,
+    show_default=True,
+    help="Number of worker processes of the parallel IDA*.",
+)
+@click.option(
+    "--confidence_margin",
+    default=0.1,
+    show_default=True,
+    help="Target confidence above the initial one. IDA* is too slow for the "
+    "default target.",
+)
+def parallel_ida(
+    problem,
+    data_path,
+    max_trace_len,
+    iter_lim,
+    log_file,
+    num_workers,
+    confidence_margin,
+):
+    """Runtime of IDA* and of the parallel IDA*."""
+    from trickster.search import ida_star_search, parallel_ida_star_search
+
+    logger = setup_custom_logger(log_file)
+    graph_search_problem, initial_node = make_problem(problem, data_path, max_trace_len)
+
+    problem_ctx = graph_search_problem.goal_fn.problem_ctx
+    init_confidence = problem_ctx.clf.predict_proba([initial_node.features])[
+        0, problem_ctx.target_class
+    ]
+    problem_ctx.target_confidence = init_confidence + confidence_margin
+
+    runtime = {}
+    for name, search_fn, kwargs in [
+        ("ida", ida_star_search, {}),
+        ("parallel_ida", parallel_ida_star_search, dict(num_workers=num_workers)),
+    ]:
+        graph_search_problem.search_fn = search_fn
+        stats = run_search(
+            graph_search_problem,
+            initial_node,
+            iter_lim=iter_lim,
+            heuristic_batch_fn=graph_search_problem.heuristic_batch_fn,
+            **kwargs,
+        )
+        runtime[name] = stats["runtime"]
+        logger.info(
+            "{}: found={}, cost={}, {:.2f}s".format(
+                name, stats["found"], stats["result"][1], stats["runtime"]
+            )
+        )
+    logger.info("Speedup: {:.2f}x".format(runtime["ida"] / runtime["parallel_ida"]))
+
+
+if __name__ == "__main__":
+    cli()
@@ -16,6 +16,8 @@ import ast
 import pprint
 import click
 import random
+import functools
+import os
 from sklearn.svm import SVC
 from sklearn.linear_model import LogisticRegressionCV
 from sklearn.model_selection import train_test_split
@@ -25,7 +27,9 @@ from trickster.optim import SpecExpandFunc
 from trickster.optim import CategoricalLpProblemContext
 from trickster.linear import LinearGridHeuristic, LinearHeuristic
 from trickster.utils.log import setup_custom_logger
-from trickster.search import a_star_search
+from trickster.search import a_star_search, hill_climbing_search, focal_search
+from trickster.search import TIE_BREAKING_POLICIES
+from trickster.search import dfbnb_search, rbfs_search, parallel_ida_star_search
 from trickster.domain.categorical import *
 
 
@@ -416,6 +420,7 @@ class RandomHeuristicProblemContext(CategoricalLpProblemContext):
 
         graph_search_problem.expand_fn = NoCostExpandFunc(problem_ctx=self)
         graph_search_problem.heuristic_fn = lambda x: random.random() * grid_step
+        graph_search_problem.heuristic_batch_fn = None
         return graph_search_problem
 
 
@@ -429,6 +434,12 @@ class GridHeuristicProblemContext(CategoricalLpProblemContext):
 
         raw_heuristic = LinearGridHeuristic(problem_ctx=self, grid_step=grid_step)
         graph_search_problem.heuristic_fn = lambda x: raw_heuristic(x.features)
+        graph_search_problem.heuristic_batch_fn = lambda xs: raw_heuristic.batch(
+            [x.features for x in xs]
+        )
+
+        # Transformation costs and heuristic values are on the same grid.
+        graph_search_problem.grid_step = grid_step
         return graph_search_problem
 
 
@@ -459,6 +470,9 @@ class DollarCostProblemContext(CategoricalLpProblemContext):
         graph_search_problem.expand_fn = expand_fn
         raw_heuristic = LinearHeuristic(problem_ctx=self, weight_vec=weight_vec)
         graph_search_problem.heuristic_fn = lambda x: raw_heuristic(x.features)
+        graph_search_problem.heuristic_batch_fn = lambda xs: raw_heuristic.batch(
+            [x.features for x in xs]
+        )
         return graph_search_problem
 
 
@@ -549,6 +563,85 @@ class DollarCostProblemContext(CategoricalLpProblemContext):
     show_default=True,
     help="Max number of search iterations until before giving up.",
 )
+@click.option(
+    "--search",
+    default="a_star",
+    show_default=True,
+    type=click.Choice(
+        ["a_star", "hill_climbing", "focal", "dfbnb", "rbfs", "parallel_ida"]
+    ),
+    help="Search algorithm. Only A* uses the beam size. Depth-first "
+    "branch-and-bound (dfbnb) and recursive best-first search (rbfs) only keep "
+    "the current path in memory. Parallel IDA* (parallel_ida) searches the "
+    "subtrees of the initial example in several processes.",
+)
+@click.option(
+    "--num_workers",
+    default=os.cpu_count(),
+    show_default=True,
+    help="Number of worker processes of the parallel IDA*.",
+)
+@click.option(
+    "--focal_weight",
+    default=1.5,
+    show_default=True,
+    help="Suboptimality bound of the focal search. Nodes within this factor of "
+    "the lowest f-score are picked by the classifier confidence.",
+)
+@click.option(
+    "--retry_iter_lim",
+    type=int,
+    default=None,
+    show_default=True,
+    help="Number of additional iterations for the examples that ran out of "
+    "iter_lim. The search continues from where it stopped.",
+)
+@click.option(
+    "--deferred_heuristic/--no_deferred_heuristic",
+    default=False,
+    show_default=True,
+    help="Only evaluate the heuristic of the nodes popped from the A* open set.",
+)
+@click.option(
+    "--incumbent_iter_lim",
+    type=int,
+    default=None,
+    help="If given, hill climbing with this many iterations is run first, and "
+    "A* discards the children that cannot be cheaper than its solution.",
+)
+@click.option(
+    "--max_cost",
+    type=float,
+    default=None,
+    help="Budget of the transformation cost, e.g. in dollars with the "
+    "buyretweet graph. Examples that cannot be flipped within it are reported "
+    "as not found as soon as the nodes within the budget run out. Every search "
+    "gets it as max_cost, and examples that cost exactly the budget are found. "
+    "The dfbnb search has no separate cost bound here: it starts with the "
+    "budget, and tightens it to the cost of every cheaper example it finds. "
+    "Nodes are pruned on their f-scores, so all epsilons must be at most 1.",
+)
+@click.option(
+    "--expansion_width",
+    default=1,
+    show_default=True,
+    help="Number of nodes with the lowest f-scores that A* expands together. "
+    "Their children are scored with one classifier call.",
+)
+@click.option(
+    "--expansion_workers",
+    type=int,
+    default=None,
+    help="If given, the nodes of an A* batch are expanded by this many worker "
+    "processes. Only useful with --expansion_width above 1.",
+)
+@click.option(
+    "--tie_breaking",
+    default="fifo",
+    show_default=True,
+    type=click.Choice(TIE_BREAKING_POLICIES),
+    help="Which of the nodes with equal f-scores A* expands first.",
+)
 @click.pass_context
 def generate(
     ctx,
@@ -569,7 +662,41 @@ def generate(
     confidence_level,
     output_pickle,
     iter_lim,
+    search,
+    retry_iter_lim,
+    deferred_heuristic,
+    focal_weight,
+    num_workers,
+    incumbent_iter_lim,
+    max_cost,
+    expansion_width,
+    expansion_workers,
+    tie_breaking,
 ):
+    if search != "a_star" and retry_iter_lim is not None:
+        raise click.UsageError("--retry_iter_lim is only supported by the A* search.")
+    if search != "a_star" and deferred_heuristic:
+        raise click.UsageError(
+            "--deferred_heuristic is only supported by the A* search."
+        )
+    if search != "a_star" and incumbent_iter_lim is not None:
+        raise click.UsageError(
+            "--incumbent_iter_lim is only supported by the A* search."
+        )
+    if search != "a_star" and tie_breaking != "fifo":
+        raise click.UsageError("--tie_breaking is only supported by the A* search.")
+    if search != "a_star" and (expansion_width != 1 or expansion_workers):
+        raise click.UsageError(
+            "--expansion_width and --expansion_workers are only supported by the "
+            "A* search."
+        )
+    if max_cost is not None and any(epsilon > 1 for epsilon in epsilons):
+        raise click.UsageError(
+            "--max_cost needs epsilons of at most 1. The heuristic is scaled by "
+            "epsilon, and the nodes are pruned on their f-scores, so a larger "
+            "epsilon would prune examples within the budget."
+        )
+
     np.random.seed(seed=seed)
     logger = setup_custom_logger(log_file)
     logger.info("Params:\n%s" % pprint.pformat(ctx.params))
@@ -635,6 +762,20 @@ def generate(
                 lp_space=p_norm,
                 epsilon=epsilon,
             )
+            if search == "hill_climbing":
+                problem_ctx_params["search_fn"] = hill_climbing_search
+            elif search == "focal":
+                problem_ctx_params["search_fn"] = functools.partial(
+                    focal_search, weight=focal_weight
+                )
+            elif search == "dfbnb":
+                problem_ctx_params["search_fn"] = dfbnb_search
+            elif search == "rbfs":
+                problem_ctx_params["search_fn"] = rbfs_search
+            elif search == "parallel_ida":
+                problem_ctx_params["search_fn"] = functools.partial(
+                    parallel_ida_star_search, num_workers=num_workers
+                )
 
             if graph == "all":
                 expansion_specs, transformable_feature_idxs = get_expansions_specs(
@@ -663,10 +804,24 @@ def generate(
                 )
 
             logger.info("Running the attack...")
+            graph_search_kwargs = dict(iter_lim=iter_lim, max_cost=max_cost)
+            if search == "a_star":
+                graph_search_kwargs["beam_size"] = beam_size
+                graph_search_kwargs["deferred_heuristic"] = deferred_heuristic
+                graph_search_kwargs["expansion_width"] = expansion_width
+                graph_search_kwargs["num_workers"] = expansion_workers
+                graph_search_kwargs["tie_breaking"] = tie_breaking
+                if incumbent_iter_lim is not None:
+                    graph_search_kwargs["incumbent_fn"] = functools.partial(
+                        hill_climbing_search, iter_lim=incumbent_iter_lim
+                    )
+            elif search == "hill_climbing":
+                graph_search_kwargs["seed"] = seed
             result = run_experiment(
                 data=(X_test, y_test),
                 problem_ctx=problem_ctx,
-                graph_search_kwargs=dict(iter_lim=iter_lim, beam_size=beam_size),
+                graph_search_kwargs=graph_search_kwargs,
+                retry_iter_lim=retry_iter_lim,
                 reduce_classifier=reduce_classifier,
                 transformable_feature_idxs=transformable_feature_idxs,
                 logger=logger,
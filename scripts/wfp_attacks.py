@@ -15,6 +15,7 @@ import argparse
 import logging
 import pprint
 import random
+import struct
 import functools
 
 import attr
@@ -22,10 +23,15 @@ import click
 import numpy as np
 import pandas as pd
 
-from trickster.search import generalized_a_star_search
+from trickster.search import generalized_a_star_search, PartialExpansion
+from trickster.search import SearchInterruptedError
+from trickster.search import SearchTimeoutError
+from trickster.search import TIE_BREAKING_POLICIES
+from trickster.search import external_a_star_search
 from trickster.utils.counter import ExpansionCounter
+from trickster.utils.serialization import pack_array, unpack_array
 from trickster.optim import GraphSearchProblem, _find_adversarial_example
-from trickster.optim import GoalFunc
+from trickster.optim import GoalFunc, get_node_op
 from trickster.optim import LpSpace
 from trickster.optim import CategoricalLpProblemContext
 from trickster.linear import LinearGridHeuristic, LinearHeuristic
@@ -198,10 +204,18 @@ class TraceNode:
     :param features: One of ["cumul", "raw", "total"]
     :param max_len: Max trace length (to pad to)
     :param dummies_per_insertion: Number of dummies to insert for each neighbouring node.
+    :param op: Operation code of the insertion that produced this node from its
+            parent: a tuple (position, direction).
     """
 
     def __init__(
-        self, trace, depth=0, features="cumul", max_len=None, dummies_per_insertion=1
+        self,
+        trace,
+        depth=0,
+        features="cumul",
+        max_len=None,
+        dummies_per_insertion=1,
+        op=None,
     ):
         self._features_type = features
 
@@ -209,6 +223,7 @@ class TraceNode:
         self.depth = depth
         self.max_len = max_len
         self.dummies_per_insertion = dummies_per_insertion
+        self.op = op
 
     @property
     @profiled
@@ -249,6 +264,20 @@ class TraceNode:
             cloned._features = self._features
         return cloned
 
+    def to_bytes(self):
+        """Serialize the trace and the depth, e.g., to spill the node to disk."""
+        return struct.pack("<q", self.depth) + pack_array(self.trace)
+
+    def from_bytes(self, data):
+        """Rebuild a node serialized with :py:meth:`to_bytes`.
+
+        The node gets the feature type, max length, and number of dummies of
+        this node. The operation code is not kept.
+        """
+        (depth,) = struct.unpack_from("<q", data)
+        trace = unpack_array(data, offset=8).tolist()
+        return self.clone(new_trace=trace, new_depth=depth)
+
     @profiled
     def expand(self):
         """Generate neighbours in the graph."""
@@ -259,19 +288,22 @@ class TraceNode:
 
         children = []
         for i in range(len(self.trace)):
-            trace = insert_dummy_packets(self.trace, i, self.dummies_per_insertion)
-            if self.max_len is not None and (len(trace) > self.max_len):
-                trace = trace[: self.max_len]
-            node = self.clone(new_trace=trace, new_depth=self.depth + 1)
-            children.append(node)
-
-            trace = insert_dummy_packets(self.trace, i, self.dummies_per_insertion, direction=-1)
-            if self.max_len is not None and (len(trace) > self.max_len):
-                trace = trace[: self.max_len]
-            node = self.clone(new_trace=trace, new_depth=self.depth + 1)
-            children.append(node)
+            children.append(self.replay((i, 1)))
+            children.append(self.replay((i, -1)))
         return children
 
+    def replay(self, op):
+        """Return the neighbour with dummies inserted at the position and direction in ``op``."""
+        i, direction = op
+        trace = insert_dummy_packets(
+            self.trace, i, self.dummies_per_insertion, direction=direction
+        )
+        if self.max_len is not None and (len(trace) > self.max_len):
+            trace = trace[: self.max_len]
+        node = self.clone(new_trace=trace, new_depth=self.depth + 1)
+        node.op = op
+        return node
+
     def __repr__(self):
         return "{}({})".format(self.__class__.__name__, self.trace)
 
@@ -335,6 +367,9 @@ class WfpProblemContext(CategoricalLpProblemContext):
     heuristic = attr.ib(default="confidence")
     cost = attr.ib(default="zero")
 
+    # Only put the children with the lowest f-scores into the open set.
+    partial_expansion = attr.ib(default=False)
+
     # Only used if heuristic is random.
     heuristic_seed = attr.ib(default=0)
 
@@ -344,22 +379,41 @@ class WfpProblemContext(CategoricalLpProblemContext):
         elif self.cost == "lp":
             expand_fn = LpExpandFunc(problem_ctx=self)
 
+        heuristic_batch_fn = None
         if self.heuristic == "confidence":
             raw_heuristic = ConfidenceHeuristic(problem_ctx=self)
             heuristic_fn = lambda x: raw_heuristic(x.features)
+            heuristic_batch_fn = lambda xs: raw_heuristic.batch([x.features for x in xs])
         elif self.heuristic == "dist":
             raw_heuristic = LinearHeuristic(problem_ctx=self)
             heuristic_fn = lambda x: raw_heuristic(x.features)
+            heuristic_batch_fn = lambda xs: raw_heuristic.batch([x.features for x in xs])
         elif self.heuristic == "random":
             random.seed(self.heuristic_seed)
             heuristic_fn = lambda x: random.random()
 
+        select_fn = None
+        if self.partial_expansion:
+            select_fn = PartialExpansion(
+                expand_fn=expand_fn,
+                heuristic_fn=heuristic_fn,
+                hash_fn=hash_fn,
+                op_fn=get_node_op,
+                replay_fn=lambda x, op: x.replay(op),
+                heuristic_batch_fn=heuristic_batch_fn,
+            )
+
+        goal_fn = GoalFunc(problem_ctx=self)
         return GraphSearchProblem(
-            goal_fn=GoalFunc(problem_ctx=self),
-            search_fn=generalized_a_star_search,
+            goal_fn=goal_fn,
+            search_fn=self.search_fn,
             expand_fn=expand_fn,
             heuristic_fn=heuristic_fn,
             hash_fn=hash_fn,
+            heuristic_batch_fn=heuristic_batch_fn,
+            goal_batch_fn=goal_fn.batch,
+            op_fn=get_node_op,
+            select_fn=select_fn,
         )
 
 
@@ -378,6 +432,16 @@ class ConfidenceHeuristic:
         sign = -1 if self.problem_ctx.target_class == 1 else +1
         return sign * self.problem_ctx.epsilon * score
 
+    def batch(self, xs):
+        """Compute the heuristic for a list of examples using a single classifier call."""
+        confidences = self.problem_ctx.clf.predict_proba(xs)[
+                :, self.problem_ctx.target_class]
+        scores = np.array(self.problem_ctx.clf.decision_function(xs), dtype=float)
+        sign = -1 if self.problem_ctx.target_class == 1 else +1
+        h = sign * self.problem_ctx.epsilon * scores
+        h[confidences >= self.problem_ctx.target_confidence] = -np.inf
+        return h
+
 
 common_options = [
     click.option(
@@ -507,6 +571,12 @@ def train(
     show_default=True,
     help="Max number of search iterations before giving up.",
 )
+@click.option(
+    "--time_lim",
+    default=None,
+    type=float,
+    help="Max number of seconds to search for each example before giving up.",
+)
 @click.option(
     "--beam_size",
     default=None,
@@ -514,6 +584,13 @@ def train(
     type=int,
     help="A* fringe size.",
 )
+@click.option(
+    "--early_goal/--no_early_goal",
+    default=False,
+    show_default=True,
+    help="Test nodes for being adversarial when they are generated. The search "
+    "stops at once with zero cost, and otherwise once no cheaper node is open.",
+)
 @click.option(
     "--sort_by_len/--no_sort_by_len",
     default=False,
@@ -551,6 +628,34 @@ def train(
     type=int,
     help="If using random heuristic, its seed.",
 )
+@click.option(
+    "--partial_expansion/--no_partial_expansion",
+    default=False,
+    show_default=True,
+    help="If true, only the children with the lowest f-scores are put into "
+    "the open set, and the others are generated when they are needed.",
+)
+@click.option(
+    "--tie_breaking",
+    default="fifo",
+    show_default=True,
+    type=click.Choice(TIE_BREAKING_POLICIES),
+    help="Which of the nodes with equal f-scores to expand first.",
+)
+@click.option(
+    "--memory_lim",
+    default=None,
+    type=int,
+    help="If set, use the external-memory A* that keeps at most this many "
+    "open nodes in memory, and spills the others to disk.",
+)
+@click.option(
+    "--spill_dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Directory for the nodes spilled by the external-memory A*. By "
+    "default, the system temporary directory.",
+)
 @click.option(
     "--output_pickle",
     type=click.Path(exists=False, dir_okay=False),
@@ -572,7 +677,9 @@ def generate(
     confidence_level,
     num_adv_examples,
     iter_lim,
+    time_lim,
     beam_size,
+    early_goal,
     sort_by_len,
     dummies_per_insertion,
     epsilon,
@@ -580,6 +687,10 @@ def generate(
     p_norm,
     heuristic,
     heuristic_seed,
+    partial_expansion,
+    tie_breaking,
+    memory_lim,
+    spill_dir,
     output_pickle,
 ):
     """Generate adversarial examples."""
@@ -619,10 +730,32 @@ def generate(
             "nodes_expanded",
             "runtime",
             "conf_level",
+            "timed_out",
+            "interrupt_reason",
+            "best_x",
+            "best_path_cost",
         ]
     )
 
     # Set the global search parameters.
+    graph_search_kwargs = dict(iter_lim=iter_lim, time_lim=time_lim)
+    if memory_lim is None:
+        search_fn = generalized_a_star_search
+        graph_search_kwargs.update(
+            beam_size=beam_size, early_goal=early_goal, tie_breaking=tie_breaking
+        )
+    elif beam_size is not None or early_goal or partial_expansion or (
+        tie_breaking != "fifo"
+    ):
+        raise click.UsageError(
+            "--memory_lim does not support --beam_size, --early_goal, "
+            "--partial_expansion, and --tie_breaking."
+        )
+    else:
+        search_fn = functools.partial(
+            external_a_star_search, memory_lim=memory_lim, spill_dir=spill_dir
+        )
+
     problem_ctx = WfpProblemContext(
         clf=clf,
         target_class=1,
@@ -632,6 +765,8 @@ def generate(
         heuristic=heuristic,
         heuristic_seed=heuristic_seed,
         cost=cost,
+        partial_expansion=partial_expansion,
+        search_fn=search_fn,
     )
 
     # Set the transformation graph parameters.
@@ -668,16 +803,28 @@ def generate(
         per_example_profiler = Profiler()
         Profiler.set_global_default(per_example_profiler)
 
-        x_adv, path_cost = _find_adversarial_example(
-            initial_example_node=initial_example_node,
-            graph_search_problem=problem_ctx.get_graph_search_problem(),
-            iter_lim=iter_lim,
-            beam_size=beam_size,
-        )
+        timed_out = False
+        interrupt_reason = None
+        best_x, best_path_cost = None, None
+        try:
+            x_adv, path_cost = _find_adversarial_example(
+                initial_example_node=initial_example_node,
+                graph_search_problem=problem_ctx.get_graph_search_problem(),
+                **graph_search_kwargs
+            )
+        except SearchInterruptedError as e:
+            logger.debug("For example at index {}: {}".format(original_index, e))
+            x_adv, path_cost = None, None
+            timed_out = isinstance(e, SearchTimeoutError)
+            interrupt_reason = "timeout" if timed_out else "cancelled"
+            if e.best_node is not None:
+                best_x, best_path_cost = e.best_node.trace, e.best_cost
 
         nodes_expanded = expanded_counter.count
         profiler_stats = per_example_profiler.compute_stats()
-        runtime = profiler_stats["_find_adversarial_example"]["tot"]
+        runtime = None
+        if "_find_adversarial_example" in profiler_stats:
+            runtime = profiler_stats["_find_adversarial_example"]["tot"]
 
         features = datasets.X_test_features[original_index]
         original_confidence = clf.predict_proba([features])[0, 1]
@@ -698,6 +845,10 @@ def generate(
                 nodes_expanded,
                 runtime,
                 confidence_level,
+                timed_out,
+                interrupt_reason,
+                best_x,
+                best_path_cost,
             ]
 
         else:
@@ -718,6 +869,10 @@ def generate(
                 nodes_expanded,
                 runtime,
                 confidence_level,
+                timed_out,
+                interrupt_reason,
+                best_x,
+                best_path_cost,
             ]
 
         if output_pickle is not None:
@@ -11,7 +11,6 @@ INSTALL_REQUIRES = [
     "scikit-learn",
     "attrs",
     "tqdm",
-    "depq",
     "profiled",
     "pandas",
 ]
@@ -161,3 +161,25 @@ def test_expand_collection_unset(a, feat_idxs, expected):
 def test_expand_collection(a, feat_idxs, expected):
     children = expand_collection(a, feat_idxs)
     assert np.array_equal(np.array(children), np.array(expected))
+
+
+def test_node_replay():
+    specs = [
+        FeatureExpansionSpec(idxs=FEAT_IDXS[3], expand_fn=expand_quantized),
+        FeatureExpansionSpec(idxs=[7, 8, 9, 10, 11, 12], expand_fn=expand_collection),
+    ]
+    node = Node(src=np.concatenate([A, B]))
+    for child in node.expand(specs):
+        replayed = node.replay(child.op)
+        assert np.array_equal(replayed.src, child.src)
+        assert replayed.depth == child.depth == 1
+
+
+def test_node_to_bytes():
+    node = Node(src=np.array([0.0, 1.0, 0.0, 0.0, 1.0]), depth=3)
+    restored = node.from_bytes(node.to_bytes())
+
+    np.testing.assert_array_equal(restored.src, node.src)
+    assert restored.src.dtype == node.src.dtype
+    assert restored.depth == 3
+    assert len(node.to_bytes()) < node.src.nbytes
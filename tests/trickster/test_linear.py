@@ -101,3 +101,15 @@ def test_grid_heuristic(problem_ctx):
     h = LinearGridHeuristic(problem_ctx, grid_step=0.2)
     assert h([1, 0]) == 0
     assert h([0, 6]) == 1.6  # 1.5
+
+
+@pytest.mark.parametrize("target_class", [0, 1])
+@pytest.mark.parametrize("heuristic_cls", [LinearHeuristic, LinearGridHeuristic])
+def test_heuristic_batch(problem_ctx, target_class, heuristic_cls):
+    problem_ctx.target_class = target_class
+    problem_ctx.target_confidence = 0.95
+    X = [[1, 0], [0, 6], [0, 3], [2, 1]]
+
+    h = heuristic_cls(problem_ctx)
+    expected = [h(x) for x in X]
+    assert h.batch(X) == pytest.approx(expected)
@@ -0,0 +1,74 @@
+import pytest
+
+import numpy as np
+
+from sklearn.linear_model import LogisticRegression
+
+from trickster.optim import CategoricalLpProblemContext
+from trickster.optim import _dataset_find_adversarial_examples
+from trickster.domain.categorical import FeatureExpansionSpec
+from trickster.domain.categorical import expand_categorical
+from trickster.search import CancellationToken
+from trickster.search import generalized_a_star_search, ida_star_search
+from trickster.search import sma_star_search, ara_star_search
+from trickster.search import dfbnb_search, rbfs_search, parallel_ida_star_search
+
+
+@pytest.fixture(scope="function")
+def data():
+    # One-hot encoded categorical feature, where only the last category is
+    # in the positive class.
+    X = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    y = np.array([0, 0, 1])
+    clf = LogisticRegression(C=100).fit(X, y)
+    return X, clf
+
+
+def make_problem_ctx(clf, **kwargs):
+    return CategoricalLpProblemContext(
+        clf=clf,
+        target_class=1,
+        lp_space=1,
+        expansion_specs=[FeatureExpansionSpec([0, 1, 2], expand_categorical)],
+        **kwargs
+    )
+
+
+# Only some of the search functions record the paths as operation codes.
+SEARCH_FUNCS = [
+    generalized_a_star_search,
+    ida_star_search,
+    sma_star_search,
+    ara_star_search,
+    dfbnb_search,
+    rbfs_search,
+    parallel_ida_star_search,
+]
+
+
+@pytest.mark.parametrize("search_fn", SEARCH_FUNCS)
+def test_dataset_find_adversarial_examples(data, search_fn):
+    X, clf = data
+    results = _dataset_find_adversarial_examples(
+        data=X, idxs=[0, 1], problem_ctx=make_problem_ctx(clf, search_fn=search_fn)
+    )
+
+    assert results["found"].all()
+    assert list(results["path_cost"]) == [2, 2]
+    assert not results["timed_out"].any()
+
+
+def test_dataset_find_adversarial_examples_cancelled(data):
+    X, clf = data
+    token = CancellationToken()
+    token.cancel()
+    results = _dataset_find_adversarial_examples(
+        data=X,
+        idxs=[0],
+        problem_ctx=make_problem_ctx(clf),
+        graph_search_kwargs=dict(cancel_token=token),
+    )
+
+    assert not results["found"].any()
+    assert not results["timed_out"].any()
+    assert list(results["interrupt_reason"]) == ["cancelled"]
@@ -1,6 +1,23 @@
 import pytest
+import pickle
+import multiprocessing
+import concurrent.futures
+import time
+import functools
+import os
 
 from trickster.search import a_star_search, ida_star_search, generalized_a_star_search
+from trickster.search import ara_star_search, sma_star_search, hill_climbing_search
+from trickster.search import hda_star_search, external_a_star_search, focal_search
+from trickster.search import dfbnb_search, rbfs_search, parallel_ida_star_search
+from trickster.search import CancellationToken, SearchCancelledError, SearchTimeoutError
+from trickster.search import CompactPath, PartialExpansion, SearchState
+from trickster.search import OperatorSelection
+from trickster.utils.counter import ExpansionCounter
+from trickster.utils.open_list import HeapOpenList, float_to_tie_key
+from trickster.utils.observers import SearchObserver, CompositeObserver
+from trickster.utils.observers import BranchingFactorObserver
+from trickster.utils.observers import HeuristicErrorObserver, OpenSetSizeObserver
 from trickster.utils.romania import *
 
 
@@ -12,7 +29,15 @@ def expand_fn(node):
     return GRAPH_TRANSITIONS[node]
 
 
-HEURISTIC_SEARCH_FUNCS = [a_star_search, ida_star_search]
+HEURISTIC_SEARCH_FUNCS = [
+    a_star_search,
+    ida_star_search,
+    functools.partial(ida_star_search, table_size=100),
+    sma_star_search,
+    dfbnb_search,
+    functools.partial(dfbnb_search, table_size=100),
+    rbfs_search,
+]
 HASH_FUNCS = [None, hash]
 
 
@@ -91,3 +116,1793 @@ def test_beam_search(beam_size, expected):
     )
 
     assert goal is None if not expected else goal is not None
+
+
+@pytest.mark.parametrize("search_fn", HEURISTIC_SEARCH_FUNCS)
+def test_batched_heuristic(search_fn):
+    start_node = "Arad"
+    goal_fn = lambda x: x == "Bucharest"
+    batch_sizes = []
+
+    def heuristic_batch_fn(nodes):
+        batch_sizes.append(len(nodes))
+        return [HEURISTIC_MAP[node] for node in nodes]
+
+    goal, path_costs, optimal_path = search_fn(
+        start_node=start_node,
+        heuristic_fn=heuristic_fn,
+        heuristic_batch_fn=heuristic_batch_fn,
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        return_path=True,
+    )
+
+    assert OPTIMAL_PATH_FROM_ARAD == optimal_path
+    assert max(batch_sizes) > 1
+
+
+@pytest.mark.parametrize("use_batch", [False, True])
+def test_early_goal(use_batch):
+    start_node = "Arad"
+    goal_fn = lambda x: x == "Bucharest"
+    goal_batch_fn = lambda nodes: [goal_fn(node) for node in nodes]
+
+    # Zero-cost edges make early goal testing exact.
+    zero_cost_expand_fn = lambda node: [(n, 0) for n, _ in expand_fn(node)]
+    goal, cost = generalized_a_star_search(
+        start_node=start_node,
+        expand_fn=zero_cost_expand_fn,
+        goal_fn=goal_fn,
+        goal_batch_fn=goal_batch_fn if use_batch else None,
+        early_goal=True,
+    )
+    assert goal == "Bucharest"
+    assert cost == 0
+
+    goal, path_costs, path = generalized_a_star_search(
+        start_node=start_node,
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        goal_batch_fn=goal_batch_fn if use_batch else None,
+        early_goal=True,
+        return_path=True,
+    )
+    assert path == OPTIMAL_PATH_FROM_ARAD
+    assert path_costs["Bucharest"] == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+
+def test_early_goal_costs():
+    # The goal child "a" is generated first, but "c" is cheaper.
+    graph = {"r": [("a", 10), ("b", 1)], "b": [("c", 1)], "a": [], "c": []}
+    goal, cost = generalized_a_star_search(
+        start_node="r",
+        expand_fn=lambda x: graph[x],
+        goal_fn=lambda x: x in ("a", "c"),
+        early_goal=True,
+    )
+
+    assert goal == "c"
+    assert cost == 2
+
+
+def test_early_goal_start_node():
+    goal, cost = generalized_a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Arad",
+        early_goal=True,
+    )
+    assert goal == "Arad"
+    assert cost == 0
+
+
+@pytest.mark.parametrize("search_fn", HEURISTIC_SEARCH_FUNCS)
+def test_time_limit(search_fn):
+    # Goal is unreachable, and the graph is infinite.
+    expand_fn = lambda node: [(node + 1, 1), (node + 2, 1)]
+
+    with pytest.raises(SearchTimeoutError) as exc_info:
+        search_fn(
+            start_node=0,
+            expand_fn=expand_fn,
+            goal_fn=lambda x: False,
+            heuristic_fn=lambda x: 1.0 / (x + 1),
+            time_lim=0.1,
+        )
+    assert exc_info.value.best_node is not None
+    assert exc_info.value.best_node > 0
+
+
+@pytest.mark.parametrize("search_fn", HEURISTIC_SEARCH_FUNCS)
+def test_cancellation(search_fn):
+    token = CancellationToken()
+    token.cancel()
+
+    with pytest.raises(SearchCancelledError):
+        search_fn(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            cancel_token=token,
+        )
+
+
+def test_ara_star_search():
+    solutions = []
+    goal, path_costs, optimal_path = ara_star_search(
+        start_node="Arad",
+        heuristic_fn=heuristic_fn,
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        epsilons=[10, 3, 1],
+        on_solution=lambda *args: solutions.append(args),
+        return_path=True,
+    )
+
+    assert OPTIMAL_PATH_FROM_ARAD == optimal_path
+    # Solutions never get worse, and the bounds hold.
+    costs = [cost for _, cost, _ in solutions]
+    assert costs == sorted(costs, reverse=True)
+    for _, cost, bound in solutions:
+        assert cost <= bound * OPTIMAL_COSTS_FROM_ARAD["Bucharest"] + 1e-9
+    assert solutions[-1][2] == 1.0
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_ara_star_search_costs(target_node):
+    goal, cost = ara_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        epsilons=[2, 1],
+    )
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+@pytest.mark.parametrize("max_nodes", [3, 5, 8, None])
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_sma_star_search_memory_bound(max_nodes, target_node):
+    goal_fn = lambda x: x == target_node
+    _, _, a_star_path = a_star_search(
+        start_node="Arad", expand_fn=expand_fn, goal_fn=goal_fn, return_path=True
+    )
+
+    goal, path_costs, path = sma_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        max_nodes=max_nodes,
+        iter_lim=1000,
+        return_path=True,
+    )
+
+    if max_nodes is not None:
+        assert len(path_costs) <= max_nodes
+
+    # The solution is optimal if its path fits in memory.
+    if max_nodes is None or len(a_star_path) <= max_nodes:
+        assert goal == target_node
+        assert path[0] == "Arad" and path[-1] == target_node
+        assert path_costs[target_node] == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+class MemoryObserver(SearchObserver):
+    """Tracks the nodes in the memory of SMA* on a tree."""
+
+    def __init__(self, start_node):
+        self.nodes = {start_node}
+        self.max_size = 1
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        self.nodes.add(hashed_child)
+        self.max_size = max(self.max_size, len(self.nodes))
+
+    def on_prune(self, hashed_node, reason):
+        if reason == "memory":
+            self.nodes.discard(hashed_node)
+
+
+@pytest.mark.parametrize("max_nodes", [4, 10])
+def test_sma_star_search_wide_tree(max_nodes):
+    # The memory bound holds while the children of a node are added, even if
+    # there are more children than the bound.
+    observer = MemoryObserver(())
+    goal, cost = sma_star_search(
+        start_node=(),
+        expand_fn=lambda node: [(node + (i,), 1 + i) for i in range(20)],
+        goal_fn=lambda x: x == (0, 0),
+        max_nodes=max_nodes,
+        observer=observer,
+    )
+
+    assert goal == (0, 0)
+    assert cost == 2
+    assert observer.max_size <= max_nodes
+
+
+def test_sma_star_search_goal_batch_fn():
+    goal_fn_calls = []
+    goal_batch_fn_calls = []
+
+    def goal_fn(x):
+        goal_fn_calls.append(x)
+        return x == "Bucharest"
+
+    def goal_batch_fn(xs):
+        goal_batch_fn_calls.append(list(xs))
+        return [x == "Bucharest" for x in xs]
+
+    goal, cost = sma_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        heuristic_fn=heuristic_fn,
+        goal_batch_fn=goal_batch_fn,
+        max_nodes=5,
+    )
+
+    # The children at the maximum depth are tested in batches, and only the
+    # popped nodes one by one.
+    assert goal == "Bucharest"
+    assert goal_batch_fn_calls
+    assert "Bucharest" in goal_fn_calls
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_lean_search(target_node):
+    goal_fn = lambda x: x == target_node
+
+    goal, path_costs, path = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        hash_fn=hash,
+        return_path=True,
+        lean=True,
+    )
+
+    assert goal == target_node
+    assert path[0] == "Arad" and path[-1] == target_node
+    assert path_costs[hash(target_node)] == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+@pytest.mark.parametrize("lean", [False, True])
+def test_lean_search_drops_expanded_nodes(lean):
+    state = SearchState()
+    a_star_search(
+        "Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        iter_lim=3,
+        state=state,
+        lean=lean,
+    )
+
+    assert len(state.closed_set) == 3
+    kept = [x for x in state.closed_set if x in state.reverse_hashes]
+    assert len(kept) == (0 if lean else 3)
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_compact_path(target_node):
+    goal_fn = lambda x: x == target_node
+
+    # Operation code is the index of the transition from the parent.
+    op_fn = lambda node, neighbour: [n for n, _ in expand_fn(node)].index(neighbour)
+    replay_fn = lambda node, op: expand_fn(node)[op][0]
+
+    _, _, expected_path = a_star_search(
+        start_node="Arad", expand_fn=expand_fn, goal_fn=goal_fn, return_path=True
+    )
+    goal, path_costs, path = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        return_path=True,
+        op_fn=op_fn,
+        replay_fn=replay_fn,
+    )
+
+    assert isinstance(path, CompactPath)
+    assert len(path.ops) == len(expected_path) - 1
+    assert list(path) == expected_path
+    assert path[-1] == goal == target_node
+
+
+@pytest.mark.parametrize("table_size", [2, 5, 10, 100])
+def test_ida_star_search_table(table_size):
+    goal_fn_calls = []
+    heuristic_calls = []
+
+    def counting_goal_fn(node):
+        goal_fn_calls.append(node)
+        return node == "Bucharest"
+
+    def counting_heuristic_fn(node):
+        heuristic_calls.append(node)
+        return heuristic_fn(node)
+
+    ida_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=counting_goal_fn,
+        heuristic_fn=counting_heuristic_fn,
+    )
+    num_calls = len(goal_fn_calls) + len(heuristic_calls)
+    del goal_fn_calls[:], heuristic_calls[:]
+
+    goal, path_costs, optimal_path = ida_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=counting_goal_fn,
+        heuristic_fn=counting_heuristic_fn,
+        return_path=True,
+        table_size=table_size,
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    assert len(goal_fn_calls) + len(heuristic_calls) <= num_calls
+    if table_size >= 10:
+        assert 2 * (len(goal_fn_calls) + len(heuristic_calls)) < num_calls
+
+
+class RecordingObserver(SearchObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_pop(self, hashed_node, f_score, open_size):
+        self.events.append("pop")
+
+    def on_expand(self, hashed_node, cost, h_score):
+        self.events.append("expand")
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        self.events.append("generate")
+
+    def on_goal(self, node, hashed_node, cost):
+        self.events.append(("goal", node, cost))
+
+    def on_bound_change(self, bound):
+        self.events.append("bound")
+
+
+@pytest.mark.parametrize("search_fn", HEURISTIC_SEARCH_FUNCS + [ara_star_search])
+def test_search_observer_events(search_fn):
+    observer = RecordingObserver()
+    goal, cost = search_fn(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        observer=observer,
+    )
+
+    goal_events = [e for e in observer.events if isinstance(e, tuple)]
+    assert goal_events[-1] == ("goal", goal, cost)
+    assert observer.events.count("expand") >= len(OPTIMAL_PATH_FROM_ARAD) - 1
+    assert observer.events.count("generate") > 0
+    assert observer.events.count("pop") >= observer.events.count("expand")
+
+
+@pytest.mark.parametrize("search_fn", HEURISTIC_SEARCH_FUNCS)
+def test_search_observer_heuristic_error(search_fn):
+    error_observer = HeuristicErrorObserver()
+    size_observer = OpenSetSizeObserver()
+    search_fn(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        observer=CompositeObserver(error_observer, size_observer),
+    )
+
+    # The straight-line distance never overestimates.
+    assert len(error_observer.errors) == len(OPTIMAL_PATH_FROM_ARAD) - 1
+    assert all(error >= 0 for error in error_observer.errors)
+    assert 0 < error_observer.mean_ratio <= 1
+    assert size_observer.max_size > 0
+
+
+@pytest.mark.parametrize("lean", [False, True])
+@pytest.mark.parametrize("iter_lim", [1, 2, 3])
+def test_search_state_resume(lean, iter_lim):
+    kwargs = dict(
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        hash_fn=hash,
+        return_path=True,
+        lean=lean,
+    )
+    full_state = SearchState()
+    a_star_search("Arad", state=full_state, **kwargs)
+
+    state = SearchState()
+    goal, _, _ = a_star_search("Arad", iter_lim=iter_lim, state=state, **kwargs)
+    assert goal is None
+    assert state.num_iterations == iter_lim
+    assert not state.exhausted
+
+    # Continue from a copy that went through serialization.
+    state = pickle.loads(pickle.dumps(state))
+    goal, path_costs, optimal_path = a_star_search("Arad", state=state, **kwargs)
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    assert path_costs[hash(goal)] == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    assert state.num_iterations == full_state.num_iterations
+
+
+def test_search_state_resume_after_interrupted_expansion():
+    expansions = []
+
+    def limited_expand_fn(node):
+        if len(expansions) == 2:
+            raise RuntimeError("Expansion limit reached.")
+        expansions.append(node)
+        return expand_fn(node)
+
+    state = SearchState()
+    with pytest.raises(RuntimeError):
+        a_star_search(
+            "Arad",
+            expand_fn=limited_expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            state=state,
+        )
+
+    goal, cost = a_star_search(
+        "Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        state=state,
+    )
+    assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+
+def test_search_state_exhausted():
+    state = SearchState()
+    goal, cost = a_star_search(
+        "Arad", expand_fn=expand_fn, goal_fn=lambda x: False, state=state
+    )
+    assert goal is None
+    assert state.exhausted
+
+
+@pytest.mark.parametrize("hash_fn", HASH_FUNCS)
+def test_hill_climbing_search(hash_fn):
+    goal, path_costs, path = hill_climbing_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        heuristic_batch_fn=lambda xs: [heuristic_fn(x) for x in xs],
+        hash_fn=hash_fn,
+        return_path=True,
+    )
+
+    # The straight-line distance leads the climb along the optimal path.
+    assert path == OPTIMAL_PATH_FROM_ARAD
+    assert len(path_costs) == len(OPTIMAL_PATH_FROM_ARAD)
+
+
+def test_hill_climbing_search_goal_batch():
+    goal_batch_calls = []
+
+    def goal_batch_fn(nodes):
+        goal_batch_calls.append(nodes)
+        return [node == "Bucharest" for node in nodes]
+
+    goal, cost = hill_climbing_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        goal_batch_fn=goal_batch_fn,
+    )
+
+    assert goal == "Bucharest"
+    assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    assert len(goal_batch_calls) == len(OPTIMAL_PATH_FROM_ARAD) - 1
+
+
+@pytest.mark.parametrize("num_restarts, found", [(0, False), (1, True)])
+def test_hill_climbing_search_restarts(num_restarts, found):
+    # The heuristic leads to the dead end "b" first.
+    transitions = {"a": [("b", 1), ("c", 1)], "b": [], "c": [("d", 1)], "d": []}
+    heuristic = {"a": 2, "b": 0, "c": 1, "d": 0}
+
+    goal, cost = hill_climbing_search(
+        start_node="a",
+        expand_fn=lambda x: transitions[x],
+        goal_fn=lambda x: x == "d",
+        heuristic_fn=lambda x: heuristic[x],
+        num_restarts=num_restarts,
+        seed=1,
+    )
+
+    assert (goal == "d") == found
+    if found:
+        assert cost == 2
+
+
+@pytest.mark.parametrize("num_restarts,found", [(0, False), (1, True)])
+def test_hill_climbing_search_local_minimum(num_restarts, found):
+    # The child "b" is a local minimum of the heuristic: its only child is
+    # worse, so the search restarts instead of climbing out of it.
+    transitions = {"a": [("b", 1), ("c", 1)], "b": [("e", 1)], "c": [("d", 1)]}
+    transitions["d"] = transitions["e"] = []
+    heuristic = {"a": 3, "b": 1, "c": 2, "d": 0, "e": 2}
+    goal, cost = hill_climbing_search(
+        start_node="a",
+        expand_fn=lambda x: transitions[x],
+        goal_fn=lambda x: x == "d",
+        heuristic_fn=lambda x: heuristic[x],
+        num_restarts=num_restarts,
+        seed=1,
+    )
+
+    assert (goal == "d") == found
+    if found:
+        assert cost == 2
+
+
+def test_hill_climbing_search_compact_path():
+    goal, path_costs, path = hill_climbing_search(
+        start_node=0,
+        expand_fn=lambda x: [(x + 1, 1), (x + 2, 1)],
+        goal_fn=lambda x: x >= 5,
+        heuristic_fn=lambda x: max(5 - x, 0),
+        return_path=True,
+        op_fn=lambda node, child: child - node,
+        replay_fn=lambda node, op: node + op,
+    )
+
+    assert isinstance(path, CompactPath)
+    assert path[-1] == goal
+    assert path_costs[goal] == len(path.ops)
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+@pytest.mark.parametrize("target_node", ["Bucharest", "Eforie", "Oradea"])
+def test_hda_star_search_costs(num_workers, target_node):
+    goal, path_costs, optimal_path = hda_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        return_path=True,
+        num_workers=num_workers,
+    )
+
+    assert goal == target_node
+    assert path_costs[goal] == OPTIMAL_COSTS_FROM_ARAD[target_node]
+    assert optimal_path[0] == "Arad" and optimal_path[-1] == target_node
+
+
+@pytest.mark.parametrize("num_workers", [1, 2, 4])
+def test_hda_star_search_path(num_workers):
+    goal, path_costs, optimal_path = hda_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        heuristic_batch_fn=lambda xs: [heuristic_fn(x) for x in xs],
+        return_path=True,
+        num_workers=num_workers,
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+
+
+def test_hda_star_search_unreachable():
+    goal, cost = hda_star_search(
+        start_node="Arad", expand_fn=expand_fn, goal_fn=lambda x: False
+    )
+    assert goal is None and cost is None
+
+
+def test_hda_star_search_worker_error():
+    def failing_expand_fn(node):
+        raise ValueError(node)
+
+    with pytest.raises(ValueError):
+        hda_star_search(
+            start_node="Arad", expand_fn=failing_expand_fn, goal_fn=lambda x: False
+        )
+
+
+def test_hda_star_search_timeout():
+    def slow_expand_fn(node):
+        time.sleep(0.05)
+        return expand_fn(node)
+
+    with pytest.raises(SearchTimeoutError):
+        hda_star_search(
+            start_node="Arad",
+            expand_fn=slow_expand_fn,
+            goal_fn=lambda x: False,
+            time_lim=0.1,
+        )
+
+
+@pytest.mark.parametrize("search_fn", [ida_star_search, parallel_ida_star_search])
+def test_ida_star_search_iter_lim(search_fn):
+    goal, cost = search_fn(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        iter_lim=2,
+    )
+    assert goal is None and cost is None
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+@pytest.mark.parametrize("table_size", [None, 100])
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_parallel_ida_star_search_costs(num_workers, table_size, target_node):
+    # The tables of the workers are kept across the subtrees and iterations.
+    goal, cost = parallel_ida_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        num_workers=num_workers,
+        table_size=table_size,
+    )
+
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+@pytest.mark.parametrize("split_size", [1, 4, 100])
+@pytest.mark.parametrize("table_size", [None, 100])
+def test_parallel_ida_star_search_path(split_size, table_size):
+    goal, path_costs, optimal_path = parallel_ida_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        heuristic_batch_fn=lambda xs: [heuristic_fn(x) for x in xs],
+        return_path=True,
+        table_size=table_size,
+        split_size=split_size,
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    for node in optimal_path:
+        assert path_costs[node] == OPTIMAL_COSTS_FROM_ARAD[node]
+
+
+def test_parallel_ida_star_search_start_goal():
+    goal, cost = parallel_ida_star_search(
+        start_node="Arad", expand_fn=expand_fn, goal_fn=lambda x: x == "Arad"
+    )
+    assert goal == "Arad" and cost == 0
+
+
+def test_parallel_ida_star_search_unreachable():
+    goal, cost = parallel_ida_star_search(
+        start_node="Arad", expand_fn=expand_fn, goal_fn=lambda x: False
+    )
+    assert goal is None and cost is None
+
+
+def test_parallel_ida_star_search_worker_error():
+    def failing_goal_fn(node):
+        if node != "Arad":
+            raise ValueError(node)
+        return False
+
+    with pytest.raises(ValueError):
+        parallel_ida_star_search(
+            start_node="Arad", expand_fn=expand_fn, goal_fn=failing_goal_fn,
+            split_size=1,
+        )
+
+
+def test_parallel_ida_star_search_cancels_workers():
+    # Every subtree but one is infinite, so the search only ends if the
+    # workers stop once the goal is found.
+    def infinite_expand_fn(node):
+        if node == 0:
+            return [(i, 1) for i in range(1, 5)]
+        return [(node + 4, 0)]
+
+    goal, cost = parallel_ida_star_search(
+        start_node=0,
+        expand_fn=infinite_expand_fn,
+        goal_fn=lambda x: x == 2,
+        num_workers=4,
+        split_size=4,
+    )
+    assert goal == 2 and cost == 1
+
+
+def test_parallel_ida_star_search_timeout():
+    def slow_expand_fn(node):
+        time.sleep(0.05)
+        return expand_fn(node)
+
+    with pytest.raises(SearchTimeoutError):
+        parallel_ida_star_search(
+            start_node="Arad",
+            expand_fn=slow_expand_fn,
+            goal_fn=lambda x: False,
+            time_lim=0.1,
+        )
+
+
+@pytest.mark.parametrize("expansion_width", [2, 3, 10])
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_batch_expansion_costs(expansion_width, target_node):
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        expansion_width=expansion_width,
+    )
+
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+def test_batch_expansion_pool():
+    heuristic_batch_calls = []
+
+    def heuristic_batch_fn(nodes):
+        heuristic_batch_calls.append(nodes)
+        return [heuristic_fn(node) for node in nodes]
+
+    with multiprocessing.get_context("fork").Pool(2) as pool:
+        goal, path_costs, optimal_path = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            heuristic_batch_fn=heuristic_batch_fn,
+            return_path=True,
+            expansion_width=4,
+            pool=pool,
+        )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    assert max(len(nodes) for nodes in heuristic_batch_calls) > 3
+
+
+def counted_expand_fn(node):
+    ExpansionCounter.get_default().increment()
+    return expand_fn(node)
+
+
+@pytest.mark.parametrize("use_workers", [False, True])
+def test_batch_expansion_counts_expansions(use_workers):
+    # The expansions in the worker processes are counted in this one.
+    counts = []
+    for kwargs in [{}, dict(expansion_width=4)]:
+        counter = ExpansionCounter()
+        ExpansionCounter.set_global_default(counter)
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            if kwargs and use_workers:
+                kwargs["num_workers"] = 2
+            elif kwargs:
+                kwargs["pool"] = pool
+            goal, cost = a_star_search(
+                start_node="Arad",
+                expand_fn=counted_expand_fn,
+                goal_fn=lambda x: x == "Bucharest",
+                heuristic_fn=heuristic_fn,
+                **kwargs,
+            )
+        assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+        counts.append(counter.count)
+    ExpansionCounter.set_global_default(ExpansionCounter())
+
+    assert counts[1] >= counts[0] > 0
+
+
+def test_batch_expansion_num_workers_and_pool():
+    with pytest.raises(ValueError):
+        with concurrent.futures.ThreadPoolExecutor(2) as pool:
+            a_star_search(
+                start_node="Arad",
+                expand_fn=expand_fn,
+                goal_fn=lambda x: x == "Bucharest",
+                expansion_width=2,
+                pool=pool,
+                num_workers=2,
+            )
+
+
+def test_batch_expansion_iter_lim():
+    state = SearchState()
+    with concurrent.futures.ThreadPoolExecutor(2) as pool:
+        goal, cost = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: False,
+            iter_lim=5,
+            expansion_width=3,
+            pool=pool,
+            state=state,
+        )
+
+    assert goal is None
+    assert state.num_iterations == 5
+
+
+def make_romania_select_fn(heuristic_fn):
+    return PartialExpansion(
+        expand_fn=expand_fn,
+        heuristic_fn=heuristic_fn,
+        hash_fn=hash,
+        op_fn=lambda node, child: child,
+        replay_fn=lambda node, op: op,
+    )
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_partial_expansion_costs(target_node):
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        select_fn=make_romania_select_fn(lambda _: 0),
+    )
+
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+def test_partial_expansion_generates_fewer_nodes():
+    observers = {}
+    for partial in [False, True]:
+        observers[partial] = BranchingFactorObserver()
+        goal, path_costs, optimal_path = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            return_path=True,
+            select_fn=make_romania_select_fn(heuristic_fn) if partial else None,
+            observer=observers[partial],
+        )
+        assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+
+    assert observers[True].num_generated < observers[False].num_generated
+
+
+def test_partial_expansion_observer_h_scores():
+    class ExpandObserver(SearchObserver):
+        def __init__(self):
+            self.h_scores = []
+
+        def on_expand(self, hashed_node, cost, h_score):
+            self.h_scores.append((hashed_node, h_score))
+
+    # The f-scores of the partially expanded nodes in the open set are raised,
+    # but their heuristic values are not.
+    observer = ExpandObserver()
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        hash_fn=hash,
+        select_fn=make_romania_select_fn(heuristic_fn),
+        observer=observer,
+    )
+
+    names = {hash(name): name for name in HEURISTIC_MAP}
+    assert len(observer.h_scores) > len(set(h for h, _ in observer.h_scores))
+    for hashed_node, h_score in observer.h_scores:
+        assert h_score == HEURISTIC_MAP[names[hashed_node]]
+
+
+def test_partial_expansion_goal_tests_and_iterations():
+    class ExpandObserver(SearchObserver):
+        def __init__(self):
+            self.expanded = set()
+
+        def on_expand(self, hashed_node, cost, h_score):
+            self.expanded.add(hashed_node)
+
+    # The partially expanded nodes that are popped again are neither goal
+    # tested nor counted as iterations.
+    goal_fn_calls = []
+
+    def goal_fn(node):
+        goal_fn_calls.append(node)
+        return node == "Bucharest"
+
+    observer = ExpandObserver()
+    state = SearchState()
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=goal_fn,
+        heuristic_fn=heuristic_fn,
+        select_fn=make_romania_select_fn(heuristic_fn),
+        observer=observer,
+        state=state,
+    )
+
+    assert len(goal_fn_calls) == len(set(goal_fn_calls))
+    assert state.num_iterations == len(observer.expanded)
+
+
+def test_operator_selection():
+    # The children are only built for the selected operators.
+    replayed = []
+
+    def replay_fn(node, op):
+        replayed.append(op)
+        return op
+
+    def ops_fn(node):
+        return [
+            (child, cost, cost + heuristic_fn(child) - heuristic_fn(node))
+            for child, cost in GRAPH_TRANSITIONS[node]
+        ]
+
+    observer = BranchingFactorObserver()
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        observer=observer,
+    )
+    goal, path_costs, optimal_path = a_star_search(
+        start_node="Arad",
+        expand_fn=None,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        return_path=True,
+        select_fn=OperatorSelection(ops_fn=ops_fn, hash_fn=hash, replay_fn=replay_fn),
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    assert len(replayed) < observer.num_generated
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_deferred_heuristic_costs(target_node):
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        heuristic_fn=lambda x: heuristic_fn(x) if target_node == "Bucharest" else 0,
+        deferred_heuristic=True,
+    )
+
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+def test_deferred_heuristic_evaluates_fewer_nodes():
+    evaluated = {}
+    for deferred in [False, True]:
+        evaluated[deferred] = []
+
+        def counted_heuristic_fn(node):
+            evaluated[deferred].append(node)
+            return heuristic_fn(node)
+
+        goal, path_costs, optimal_path = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=counted_heuristic_fn,
+            return_path=True,
+            deferred_heuristic=deferred,
+        )
+        assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+
+    assert len(evaluated[True]) < len(evaluated[False])
+
+
+def test_deferred_heuristic_negative_bounds():
+    class PopObserver(SearchObserver):
+        def __init__(self):
+            self.costs = {"Arad": 0}
+            self.popped = []
+
+        def on_generate(self, hashed_parent, hashed_child, cost):
+            self.costs[hashed_child] = cost
+
+        def on_pop(self, hashed_node, f_score, open_size):
+            self.popped.append((hashed_node, f_score, self.costs[hashed_node]))
+
+    # With negative heuristic values, the bounds must not be clamped at zero,
+    # which would raise the f-scores above the actual ones.
+    observer = PopObserver()
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=lambda x: heuristic_fn(x) - 1000,
+        deferred_heuristic=True,
+        observer=observer,
+    )
+
+    assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    for node, f_score, cost in observer.popped:
+        assert f_score <= cost + heuristic_fn(node) - 1000
+
+
+def test_deferred_heuristic_custom_bound():
+    bounds = []
+
+    def bound_fn(node, parent_h_score, cost):
+        bounds.append((node, parent_h_score, cost))
+        return 0
+
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        deferred_heuristic=True,
+        bound_fn=bound_fn,
+    )
+
+    assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    assert ("Sibiu", heuristic_fn("Arad"), 140) in bounds
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_grid_step_costs(target_node):
+    # Road lengths are integers, so the f-scores lie on a unit grid.
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        grid_step=1,
+    )
+
+    assert goal == target_node
+    assert cost == OPTIMAL_COSTS_FROM_ARAD[target_node]
+
+
+def test_grid_step_beam_search():
+    results = []
+    for grid_step in [None, 1]:
+        results.append(
+            generalized_a_star_search(
+                start_node="Arad",
+                expand_fn=expand_fn,
+                goal_fn=lambda x: x == "Bucharest",
+                heuristic_fn=heuristic_fn,
+                beam_size=2,
+                return_path=True,
+                grid_step=grid_step,
+            )
+        )
+
+    assert results[0][2] == results[1][2]
+
+
+@pytest.mark.parametrize("tie_breaking", ["fifo", "lifo", "deep", "low_h"])
+@pytest.mark.parametrize("grid_step", [None, 1])
+def test_tie_breaking_costs(tie_breaking, grid_step):
+    for target_node, optimal_cost in OPTIMAL_COSTS_FROM_ARAD.items():
+        goal, cost = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == target_node,
+            tie_breaking=tie_breaking,
+            grid_step=grid_step,
+        )
+        assert goal == target_node
+        assert cost == optimal_cost
+
+
+def make_binary_tree_expand_fn(depth, expanded):
+    """Zero-cost complete binary tree over bit strings."""
+
+    def tree_expand_fn(node):
+        expanded.append(node)
+        if len(node) == depth:
+            return []
+        return [(node + "0", 0), (node + "1", 0)]
+
+    return tree_expand_fn
+
+
+@pytest.mark.parametrize(
+    "tie_breaking, max_expanded", [("fifo", 1023), ("lifo", 10), ("deep", 10)]
+)
+def test_tie_breaking_plateau(tie_breaking, max_expanded):
+    expanded = []
+    goal, cost = a_star_search(
+        start_node="",
+        expand_fn=make_binary_tree_expand_fn(10, expanded),
+        goal_fn=lambda x: len(x) == 10,
+        tie_breaking=tie_breaking,
+    )
+
+    assert len(goal) == 10
+    assert cost == 0
+    assert len(expanded) <= max_expanded
+    if tie_breaking == "fifo":
+        assert len(expanded) > 500
+
+
+def test_tie_breaking_low_h():
+    graph = {"s": [("b", 1), ("a", 2)], "a": [], "b": []}
+    h_scores = {"s": 0, "a": 1, "b": 2}
+    expanded = []
+
+    def graph_expand_fn(node):
+        expanded.append(node)
+        return graph[node]
+
+    for tie_breaking in ["fifo", "low_h"]:
+        expanded.clear()
+        a_star_search(
+            start_node="s",
+            expand_fn=graph_expand_fn,
+            goal_fn=lambda x: False,
+            heuristic_fn=h_scores.get,
+            tie_breaking=tie_breaking,
+        )
+        # Both children have the f-score 3.
+        if tie_breaking == "low_h":
+            assert expanded == ["s", "a", "b"]
+        else:
+            assert expanded == ["s", "b", "a"]
+
+
+def test_tie_breaking_low_h_partial_expansion():
+    class RecordingOpenList(HeapOpenList):
+        def __init__(self):
+            super().__init__()
+            self.tie_keys = []
+
+        def push(self, item, priority, tie_key=0):
+            self.tie_keys.append((item, tie_key))
+            super().push(item, priority, tie_key)
+
+    # The partially expanded nodes are put back with raised f-scores, but
+    # with the tie keys of their heuristic values.
+    open_list = RecordingOpenList()
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        select_fn=make_romania_select_fn(heuristic_fn),
+        open_list_factory=lambda _: open_list,
+        tie_breaking="low_h",
+    )
+
+    assert len(open_list.tie_keys) > len(set(open_list.tie_keys))
+    for node, tie_key in open_list.tie_keys:
+        assert tie_key == float_to_tie_key(heuristic_fn(node))
+
+
+def test_tie_breaking_unknown():
+    with pytest.raises(ValueError):
+        a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            tie_breaking="random",
+        )
+
+
+@pytest.mark.parametrize("memory_lim", [2, 100])
+def test_external_a_star_costs(tmpdir, memory_lim):
+    for target_node, optimal_cost in OPTIMAL_COSTS_FROM_ARAD.items():
+        goal, cost = external_a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == target_node,
+            memory_lim=memory_lim,
+            max_runs=2,
+            spill_dir=str(tmpdir),
+        )
+        assert goal == target_node
+        assert cost == optimal_cost
+
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_external_a_star_path(tmpdir):
+    goal, path_costs, optimal_path = external_a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        return_path=True,
+        memory_lim=2,
+        spill_dir=str(tmpdir),
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+    assert path_costs[hash("Bucharest")] == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+
+def test_external_a_star_unreachable(tmpdir):
+    goal, cost = external_a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: False,
+        memory_lim=2,
+        spill_dir=str(tmpdir),
+    )
+
+    assert goal is None
+    assert cost is None
+    assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.parametrize("weight", [1.0, 1.2, 2.0, 5.0])
+def test_focal_search_bound(weight):
+    for target_node, optimal_cost in OPTIMAL_COSTS_FROM_ARAD.items():
+        goal, cost = focal_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == target_node,
+            heuristic_fn=heuristic_fn if target_node == "Bucharest" else None,
+            weight=weight,
+        )
+        assert goal == target_node
+        assert optimal_cost <= cost <= weight * optimal_cost
+
+
+def test_focal_search_optimal_path():
+    goal, path_costs, optimal_path = focal_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        weight=1.0,
+        return_path=True,
+    )
+
+    assert optimal_path == OPTIMAL_PATH_FROM_ARAD
+
+
+def test_focal_search_secondary_heuristic():
+    # A secondary heuristic that knows the way needs fewer expansions.
+    path = set(OPTIMAL_PATH_FROM_ARAD)
+    observers = {}
+    for name, secondary_fn in [("h", None), ("path", lambda x: x not in path)]:
+        observers[name] = BranchingFactorObserver()
+        goal, cost = focal_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=lambda _: 0,
+            secondary_fn=secondary_fn,
+            weight=2.0,
+            observer=observers[name],
+        )
+        assert goal == "Bucharest"
+        assert cost <= 2 * OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+    assert observers["path"].num_expanded < observers["h"].num_expanded
+
+
+def test_focal_search_secondary_batch_fn():
+    calls = []
+
+    def secondary_batch_fn(nodes):
+        calls.append(len(nodes))
+        return [heuristic_fn(node) for node in nodes]
+
+    goal, cost = focal_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        secondary_batch_fn=secondary_batch_fn,
+        weight=1.5,
+    )
+
+    assert goal == "Bucharest"
+    assert calls[0] == 1
+    assert max(calls) > 1
+
+
+def test_focal_search_negative_f_scores():
+    # The focal list is not empty when the f-scores are negative.
+    goal, cost = focal_search(
+        start_node=0,
+        expand_fn=lambda x: [(x + 1, 1), (x + 2, 1)],
+        goal_fn=lambda x: x >= 5,
+        heuristic_fn=lambda x: -1 - x,
+        weight=2.0,
+    )
+
+    assert goal >= 5
+    assert cost == 3
+
+
+@pytest.mark.parametrize("start_node", [0, 3])
+def test_focal_search_infinite_heuristic(start_node):
+    # A goal node can get a heuristic of -inf, e.g., from a confidence heuristic.
+    goal, cost = focal_search(
+        start_node=start_node,
+        expand_fn=lambda x: [(x + 1, 1), (x + 2, 1)],
+        goal_fn=lambda x: x == 3,
+        heuristic_fn=lambda x: -float("inf") if x == 3 else 0,
+        weight=2.0,
+    )
+
+    assert goal == 3
+    assert cost == (0 if start_node == 3 else 2)
+
+
+def test_focal_search_bound_decreases():
+    # The inconsistent heuristic of "b" hides the cheap path through "a".
+    # Once it is found, the lowest f-score drops, and "c" is no longer within
+    # the bound, even though the secondary heuristic prefers it.
+    graph = {
+        "s": [("b", 1), ("c", 1)],
+        "b": [("a", 1)],
+        "a": [("g", 4)],
+        "c": [("g", 7)],
+        "g": [],
+    }
+    h_scores = {"s": 0, "b": 5, "a": 0, "c": 7, "g": 0}
+    secondary_scores = {"s": 0, "b": 0, "c": 1, "a": 2, "g": 0}
+    expanded = []
+
+    def graph_expand_fn(node):
+        expanded.append(node)
+        return graph[node]
+
+    goal, cost = focal_search(
+        start_node="s",
+        expand_fn=graph_expand_fn,
+        goal_fn=lambda x: x == "g",
+        heuristic_fn=h_scores.get,
+        secondary_fn=secondary_scores.get,
+        weight=1.5,
+    )
+
+    assert cost == 6
+    assert "c" not in expanded
+
+
+def test_focal_search_invalid_weight():
+    with pytest.raises(ValueError):
+        focal_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            weight=0.5,
+        )
+
+
+@pytest.mark.parametrize("search_fn", [dfbnb_search, rbfs_search])
+def test_linear_memory_search_unreachable(search_fn):
+    goal, path_costs, optimal_path = search_fn(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: False,
+        return_path=True,
+    )
+
+    assert goal is None
+    assert optimal_path is None
+
+
+@pytest.mark.parametrize("search_fn", [dfbnb_search, rbfs_search])
+def test_linear_memory_search_deep_path(search_fn):
+    # Deeper than the recursion limit.
+    goal, cost = search_fn(
+        start_node=0,
+        expand_fn=lambda node: [(node + 1, 1)],
+        goal_fn=lambda x: x == 5000,
+        heuristic_fn=lambda x: 5000 - x,
+    )
+
+    assert goal == 5000
+    assert cost == 5000
+
+
+def test_dfbnb_search_cost_bound():
+    optimal_cost = OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    goal_fn = lambda x: x == "Bucharest"
+
+    goal, cost = dfbnb_search(
+        "Arad", expand_fn, goal_fn, heuristic_fn, cost_bound=optimal_cost + 1
+    )
+    assert cost == optimal_cost
+
+    goal, cost = dfbnb_search(
+        "Arad", expand_fn, goal_fn, heuristic_fn, cost_bound=optimal_cost
+    )
+    assert goal is None
+
+    # With both, the tighter one prunes.
+    for cost_bound, max_cost, expected in [
+        (optimal_cost + 1, optimal_cost, optimal_cost),
+        (optimal_cost, optimal_cost + 1, None),
+        (optimal_cost + 1, optimal_cost - 1, None),
+    ]:
+        goal, cost = dfbnb_search(
+            "Arad",
+            expand_fn,
+            goal_fn,
+            heuristic_fn,
+            cost_bound=cost_bound,
+            max_cost=max_cost,
+        )
+        assert cost == expected
+
+
+def test_dfbnb_search_anytime():
+    # Without a heuristic, the first goal node found is not the cheapest one.
+    bounds = []
+    observer = SearchObserver()
+    observer.on_bound_change = bounds.append
+    goal, cost = dfbnb_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        observer=observer,
+    )
+
+    assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    assert bounds[-1] == cost
+    assert bounds == sorted(bounds, reverse=True)
+
+    # When the limit runs out, the best goal node so far is returned.
+    goal, cost = dfbnb_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        iter_lim=len(OPTIMAL_PATH_FROM_ARAD) + 2,
+    )
+    assert goal == "Bucharest"
+    assert cost >= OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+
+def test_dfbnb_search_depth_lim():
+    goal, cost = dfbnb_search(
+        start_node=0,
+        expand_fn=lambda node: [(node + 1, 0), (node - 1, 0)],
+        goal_fn=lambda x: x == 10,
+        depth_lim=5,
+    )
+    assert goal is None
+
+    goal, cost = dfbnb_search(
+        start_node=0,
+        expand_fn=lambda node: [(node + 1, 0), (node - 1, 0)],
+        goal_fn=lambda x: x == 10,
+        depth_lim=10,
+    )
+    assert goal == 10
+
+
+K_BEST_GOALS = ["Timisoara", "Craiova", "Bucharest"]
+
+
+@pytest.mark.parametrize("num_solutions", [1, 2, 3, 10])
+@pytest.mark.parametrize("expansion_width", [1, 3])
+def test_k_best_solutions(num_solutions, expansion_width):
+    solutions = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x in K_BEST_GOALS,
+        return_path=True,
+        num_solutions=num_solutions,
+        expansion_width=expansion_width,
+    )
+
+    assert [goal for goal, _, _ in solutions] == K_BEST_GOALS[:num_solutions]
+    for goal, path_costs, path in solutions:
+        assert path_costs[goal] == OPTIMAL_COSTS_FROM_ARAD[goal]
+        assert path[0] == "Arad" and path[-1] == goal
+    if num_solutions >= 3:
+        assert solutions[-1][2] == OPTIMAL_PATH_FROM_ARAD
+
+
+def test_k_best_solutions_single_search():
+    # The solutions come from one search, which expands no more nodes than
+    # the search for the most expensive of them alone.
+    observers = [BranchingFactorObserver(), BranchingFactorObserver()]
+    solutions = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x in K_BEST_GOALS,
+        num_solutions=3,
+        observer=observers[0],
+    )
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        observer=observers[1],
+    )
+
+    assert [cost for _, cost in solutions] == [118, 366, 418]
+    assert observers[0].num_expanded <= observers[1].num_expanded
+
+
+def test_k_best_solutions_early_goal():
+    solutions = generalized_a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x in K_BEST_GOALS,
+        goal_batch_fn=lambda nodes: [x in K_BEST_GOALS for x in nodes],
+        early_goal=True,
+        num_solutions=3,
+    )
+
+    assert [goal for goal, _ in solutions] == K_BEST_GOALS
+
+
+@pytest.mark.parametrize(
+    "num_solutions, expected", [(1, [("c", 2)]), (2, [("c", 2), ("a", 10)])]
+)
+def test_k_best_solutions_early_goal_costs(num_solutions, expected):
+    # The goal child "a" is generated first, but "c" is cheaper.
+    graph = {"r": [("a", 10), ("b", 1)], "b": [("c", 1)], "a": [], "c": []}
+    solutions = generalized_a_star_search(
+        start_node="r",
+        expand_fn=lambda x: graph[x],
+        goal_fn=lambda x: x in ("a", "c"),
+        early_goal=True,
+        num_solutions=num_solutions,
+    )
+
+    assert solutions == expected
+
+
+def test_k_best_solutions_unreachable():
+    solutions = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: False,
+        num_solutions=3,
+    )
+    assert solutions == []
+
+    with pytest.raises(ValueError):
+        a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: False,
+            num_solutions=0,
+        )
+
+
+@pytest.mark.parametrize("target_node", OPTIMAL_COSTS_FROM_ARAD.keys())
+def test_incumbent_costs(target_node):
+    goal, path_costs, path = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == target_node,
+        return_path=True,
+        incumbent_fn=hill_climbing_search,
+    )
+
+    assert goal == target_node
+    assert path_costs[goal] == OPTIMAL_COSTS_FROM_ARAD[target_node]
+    assert path[0] == "Arad" and path[-1] == target_node
+
+
+def test_incumbent_prunes_children():
+    # The children that cannot beat the greedy solution stay out of the
+    # open set.
+    counters, sizes = {}, {}
+    for name, incumbent_fn in [("none", None), ("greedy", hill_climbing_search)]:
+        counters[name] = BranchingFactorObserver()
+        sizes[name] = OpenSetSizeObserver()
+        goal, cost = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            incumbent_fn=incumbent_fn,
+            observer=CompositeObserver(counters[name], sizes[name]),
+        )
+        assert cost == OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+    assert counters["greedy"].num_pruned["bound"] > 0
+    assert counters["greedy"].num_expanded <= counters["none"].num_expanded
+    assert sizes["greedy"].max_size < sizes["none"].max_size
+
+
+def test_incumbent_is_optimal():
+    # Nothing is cheaper than an optimal incumbent, so it is returned as is.
+    optimal = ("Bucharest", OPTIMAL_COSTS_FROM_ARAD["Bucharest"])
+    observer = BranchingFactorObserver()
+    result = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        incumbent_fn=lambda *args, **kwargs: optimal,
+        observer=observer,
+    )
+
+    assert result == optimal
+    assert observer.num_pruned["bound"] > 0
+
+
+def test_incumbent_forgets_pruned_children():
+    # The children that cannot beat the incumbent leave no bookkeeping behind.
+    optimal_cost = OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    state = SearchState()
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        incumbent_fn=lambda *args, **kwargs: ("Bucharest", optimal_cost),
+        state=state,
+    )
+
+    assert len(state.path_costs) > 1
+    for node, cost in state.path_costs.items():
+        assert node == "Arad" or cost + heuristic_fn(node) < optimal_cost
+
+
+@pytest.mark.parametrize("time_lim", [None, 10])
+def test_incumbent_time_lim(time_lim):
+    # The incumbent gets the time that is left.
+    calls = []
+
+    def incumbent_fn(*args, **kwargs):
+        calls.append(kwargs)
+        return hill_climbing_search(*args, **kwargs)
+
+    a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        incumbent_fn=incumbent_fn,
+        time_lim=time_lim,
+    )
+
+    if time_lim is None:
+        assert "time_lim" not in calls[0]
+    else:
+        assert 0 < calls[0]["time_lim"] <= time_lim
+
+
+def test_incumbent_iter_lim():
+    # The greedy path is returned when the search runs out of iterations.
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        incumbent_fn=functools.partial(hill_climbing_search, iter_lim=100),
+        iter_lim=1,
+    )
+    assert goal == "Bucharest"
+    assert cost >= OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+
+
+@pytest.mark.parametrize("deferred_heuristic", [False, True])
+def test_cost_bound(deferred_heuristic):
+    optimal_cost = OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    for cost_bound, expected in [(optimal_cost, None), (optimal_cost + 1, optimal_cost)]:
+        goal, cost = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            deferred_heuristic=deferred_heuristic,
+            cost_bound=cost_bound,
+        )
+        assert cost == expected
+
+
+def test_incumbent_num_solutions():
+    with pytest.raises(ValueError):
+        a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            incumbent_fn=hill_climbing_search,
+            num_solutions=2,
+        )
+
+
+def test_incumbent_search_state_resume():
+    calls = []
+
+    def incumbent_fn(*args, **kwargs):
+        calls.append(1)
+        return hill_climbing_search(*args, **kwargs)
+
+    state = SearchState()
+    for _ in range(2):
+        goal, cost = a_star_search(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            incumbent_fn=incumbent_fn,
+            state=state,
+            iter_lim=1,
+        )
+        assert goal == "Bucharest"
+
+    assert len(calls) == 1
+
+
+BUDGETED_SEARCH_FUNCS = HEURISTIC_SEARCH_FUNCS + [
+    functools.partial(a_star_search, deferred_heuristic=True),
+    functools.partial(ara_star_search, epsilons=[2, 1]),
+    functools.partial(focal_search, weight=1.5),
+    hda_star_search,
+    parallel_ida_star_search,
+    external_a_star_search,
+]
+
+
+@pytest.mark.parametrize("search_fn", BUDGETED_SEARCH_FUNCS)
+def test_max_cost(search_fn):
+    # Goal nodes that cost exactly the budget are within it.
+    optimal_cost = OPTIMAL_COSTS_FROM_ARAD["Bucharest"]
+    for max_cost, expected in [(optimal_cost - 1, None), (optimal_cost, optimal_cost)]:
+        goal, cost = search_fn(
+            start_node="Arad",
+            expand_fn=expand_fn,
+            goal_fn=lambda x: x == "Bucharest",
+            heuristic_fn=heuristic_fn,
+            max_cost=max_cost,
+        )
+        assert cost == expected
+
+
+@pytest.mark.parametrize("search_fn", BUDGETED_SEARCH_FUNCS)
+def test_max_cost_infinite_graph(search_fn):
+    # The search ends once every node within the budget is exhausted.
+    goal, cost = search_fn(
+        start_node=0,
+        expand_fn=lambda node: [(node + 1, 1), (node - 1, 1)],
+        goal_fn=lambda x: False,
+        max_cost=10,
+    )
+
+    assert goal is None
+
+
+class PruneObserver(SearchObserver):
+    def __init__(self):
+        self.reasons = []
+
+    def on_prune(self, hashed_node, reason):
+        self.reasons.append(reason)
+
+
+def test_max_cost_start_node():
+    observer = PruneObserver()
+    goal, cost = a_star_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        max_cost=heuristic_fn("Arad") - 1,
+        observer=observer,
+    )
+
+    assert goal is None
+    assert observer.reasons == ["budget"]
+
+
+def test_max_cost_hill_climbing():
+    goal, cost = hill_climbing_search(
+        start_node="Arad",
+        expand_fn=expand_fn,
+        goal_fn=lambda x: x == "Bucharest",
+        heuristic_fn=heuristic_fn,
+        max_cost=OPTIMAL_COSTS_FROM_ARAD["Bucharest"] - 1,
+        num_restarts=3,
+    )
+
+    assert goal is None
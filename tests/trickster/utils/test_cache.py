@@ -0,0 +1,25 @@
+from trickster.utils.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=3)
+    for key in "abc":
+        cache[key] = key.upper()
+    cache.get("a")
+    cache["d"] = "D"
+
+    assert len(cache) == 3
+    assert "b" not in cache
+    assert cache.get("a") == "A"
+    assert cache.get("b", 0) == 0
+
+
+def test_lru_cache_update_refreshes():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["a"] = 3
+    cache["c"] = 4
+
+    assert cache.get("a") == 3
+    assert "b" not in cache
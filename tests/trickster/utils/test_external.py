@@ -0,0 +1,81 @@
+import os
+import pickle
+import random
+
+import pytest
+
+from trickster.utils.external import ExternalOpenList
+from trickster.utils.open_list import HeapOpenList
+
+
+def make_open_list(tmpdir, **kwargs):
+    return ExternalOpenList(
+        serialize_fn=pickle.dumps,
+        deserialize_fn=pickle.loads,
+        spill_dir=str(tmpdir),
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize("max_runs", [1, 8])
+def test_external_open_list_matches_heap(tmpdir, max_runs):
+    rng = random.Random(1)
+    heap_list = HeapOpenList()
+    with make_open_list(tmpdir, memory_lim=10, max_runs=max_runs) as open_list:
+        for i in range(2000):
+            if rng.random() < 0.6 or not len(heap_list):
+                priority = rng.random()
+                heap_list.push(i, priority)
+                open_list.push(i, priority, ("node", i), 0)
+            else:
+                item, priority = heap_list.pop()
+                assert open_list.pop() == (item, priority, ("node", item))
+            assert open_list.num_in_memory <= 10
+
+        assert open_list.num_spilled > 0
+        if max_runs == 1:
+            assert open_list.num_merges > 0
+
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_external_open_list_skips_stale(tmpdir):
+    costs = {}
+
+    def is_stale_fn(item, cost):
+        return costs[item] < cost
+
+    with make_open_list(tmpdir, memory_lim=2, is_stale_fn=is_stale_fn) as open_list:
+        for item, priority in [(1, 5), (2, 1), (3, 2), (4, 6)]:
+            costs[item] = priority
+            open_list.push(item, priority, str(item), priority)
+
+        # Items 1 and 3 are spilled, and item 1 is then reached by a cheaper path.
+        assert open_list.num_on_disk == 2
+        assert 1 not in open_list and 3 not in open_list
+        costs[1] = 3
+        open_list.push(1, 3, "1", 3)
+
+        popped = []
+        while True:
+            try:
+                popped.append(open_list.pop()[:2])
+            except IndexError:
+                break
+
+    assert popped == [(2, 1), (3, 2), (1, 3), (4, 6)]
+
+
+def test_external_open_list_pop_after_update(tmpdir):
+    # The outdated entry of an updated and then popped item is dropped on a spill.
+    with make_open_list(tmpdir, memory_lim=3) as open_list:
+        open_list.push(1, 5.0, "a", 5)
+        open_list.push(1, 2.0, "a", 2)
+        assert open_list.pop() == (1, 2.0, "a")
+        for item in range(2, 6):
+            open_list.push(item, float(item), str(item), item)
+
+        assert open_list.num_spilled > 0
+        popped = [open_list.pop()[0] for _ in range(4)]
+
+    assert popped == [2, 3, 4, 5]
@@ -0,0 +1,24 @@
+from trickster.utils.observers import BranchingFactorObserver, CompositeObserver
+from trickster.utils.observers import OpenSetSizeObserver
+
+
+def test_open_set_size_observer_every():
+    observer = OpenSetSizeObserver(every=3)
+    for size in range(10):
+        observer.on_pop(size, 0, size)
+
+    assert observer.num_pops == 10
+    assert observer.sizes == [0, 3, 6, 9]
+
+
+def test_composite_observer_forwards_events():
+    first, second = BranchingFactorObserver(), BranchingFactorObserver()
+    observer = CompositeObserver(first, second)
+    observer.on_expand(0, 0, 1)
+    observer.on_generate(0, 1, 1)
+    observer.on_prune(2, "closed")
+
+    for child in [first, second]:
+        assert child.num_expanded == 1
+        assert child.num_generated == 1
+        assert child.num_pruned == {"closed": 1}
@@ -0,0 +1,159 @@
+import pytest
+import pickle
+import random
+
+from trickster.utils.open_list import HeapOpenList, BoundedHeapOpenList
+from trickster.utils.open_list import BucketOpenList, make_open_list
+from trickster.utils.open_list import float_to_tie_key
+
+
+def test_heap_open_list_order():
+    open_list = HeapOpenList()
+    priorities = list(range(100))
+    random.Random(1).shuffle(priorities)
+    for i, priority in enumerate(priorities):
+        open_list.push(i, priority)
+
+    popped = [open_list.pop()[1] for _ in range(len(priorities))]
+    assert popped == sorted(priorities)
+    assert len(open_list) == 0
+
+
+def test_heap_open_list_lazy_deletion():
+    open_list = HeapOpenList()
+    open_list.push("a", 5)
+    open_list.push("b", 3)
+    open_list.push("a", 1)
+
+    assert len(open_list) == 2
+    assert open_list.pop() == ("a", 1)
+    assert open_list.pop() == ("b", 3)
+    with pytest.raises(IndexError):
+        open_list.pop()
+
+
+def test_heap_open_list_fifo_ties():
+    open_list = HeapOpenList()
+    for item in "abc":
+        open_list.push(item, 0)
+    assert [open_list.pop()[0] for _ in range(3)] == list("abc")
+
+
+def test_bounded_open_list_evicts_worst():
+    open_list = BoundedHeapOpenList(maxlen=3)
+    for i, priority in enumerate([5, 1, 4, 2, 3, 0]):
+        open_list.push(i, priority)
+
+    assert len(open_list) == 3
+    assert [open_list.pop()[1] for _ in range(3)] == [0, 1, 2]
+
+
+def test_bounded_open_list_priority_update():
+    open_list = BoundedHeapOpenList(maxlen=2)
+    open_list.push("a", 1)
+    open_list.push("b", 2)
+    open_list.push("b", 0)
+    open_list.push("c", 3)
+
+    assert len(open_list) == 2
+    assert open_list.pop() == ("b", 0)
+    assert open_list.pop() == ("a", 1)
+
+
+def test_bounded_heap_open_list_pickle():
+    open_list = BoundedHeapOpenList(maxlen=2)
+    for item, priority in [("a", 3), ("b", 1), ("c", 2)]:
+        open_list.push(item, priority)
+
+    restored = pickle.loads(pickle.dumps(open_list))
+    restored.push("d", 0)
+
+    assert len(restored) == 2
+    assert restored.pop() == ("d", 0)
+    assert restored.pop() == ("b", 1)
+
+
+def test_bucket_open_list_matches_heap():
+    rng = random.Random(1)
+    heap_list = HeapOpenList()
+    bucket_list = BucketOpenList(grid_step=0.5)
+    for _ in range(1000):
+        if rng.random() < 0.6 or not len(heap_list):
+            item, priority = rng.randrange(50), 0.5 * rng.randrange(20)
+            heap_list.push(item, priority)
+            bucket_list.push(item, priority)
+        else:
+            assert bucket_list.peek() == heap_list.peek()
+            assert bucket_list.pop() == heap_list.pop()
+        assert len(bucket_list) == len(heap_list)
+
+
+def test_bucket_open_list_rounds_to_grid():
+    open_list = BucketOpenList(grid_step=0.1)
+    open_list.push("a", 0.30000000000000004)
+    open_list.push("b", 0.3)
+    open_list.push("c", 0.2)
+
+    assert [open_list.pop()[0] for _ in range(3)] == ["c", "a", "b"]
+    with pytest.raises(IndexError):
+        open_list.pop()
+
+
+def test_bucket_open_list_off_grid():
+    open_list = BucketOpenList(grid_step=0.5)
+    with pytest.raises(ValueError):
+        open_list.push("a", 0.7)
+    assert len(open_list) == 0
+
+    open_list = BucketOpenList(grid_step=0.5, tolerance=0.5)
+    open_list.push("a", 0.7)
+    assert open_list.pop() == ("a", 0.7)
+
+
+def test_bucket_open_list_matches_bounded_heap():
+    rng = random.Random(2)
+    heap_list = BoundedHeapOpenList(maxlen=10)
+    bucket_list = BucketOpenList(grid_step=1, maxlen=10)
+    for _ in range(1000):
+        if rng.random() < 0.7 or not len(heap_list):
+            item, priority = rng.randrange(50), rng.randrange(10)
+            heap_list.push(item, priority)
+            bucket_list.push(item, priority)
+        else:
+            assert bucket_list.pop() == heap_list.pop()
+        assert set(bucket_list) == set(heap_list)
+
+
+def test_bucket_open_list_pickle():
+    open_list = BucketOpenList(grid_step=1)
+    open_list.push("a", 2)
+    open_list.push("b", 1)
+    open_list = pickle.loads(pickle.dumps(open_list))
+    open_list.push("c", 1)
+    assert [open_list.pop()[0] for _ in range(3)] == ["b", "c", "a"]
+
+
+def test_make_open_list_grid_step():
+    assert isinstance(make_open_list(grid_step=1), BucketOpenList)
+    assert make_open_list(beam_size=5, grid_step=1).maxlen == 5
+    assert isinstance(make_open_list(beam_size=5), BoundedHeapOpenList)
+
+
+@pytest.mark.parametrize(
+    "make_list",
+    [HeapOpenList, lambda: BoundedHeapOpenList(maxlen=10), lambda: BucketOpenList(1)],
+)
+def test_open_list_tie_keys(make_list):
+    open_list = make_list()
+    for item, priority, tie_key in [("a", 1, 0), ("b", 1, -2), ("c", 0, 5), ("d", 1, -2)]:
+        open_list.push(item, priority, tie_key)
+    open_list.push("a", 1, -3)
+
+    assert [open_list.pop()[0] for _ in range(4)] == ["c", "a", "b", "d"]
+
+
+def test_open_list_float_tie_keys():
+    open_list = HeapOpenList()
+    for item, h_score in [("a", 0.5), ("b", -float("inf")), ("c", 0.25)]:
+        open_list.push(item, 1, float_to_tie_key(h_score))
+    assert [open_list.pop()[0] for _ in range(3)] == ["b", "c", "a"]
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from trickster.utils.serialization import pack_array, unpack_array
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        np.array([0.0, 1.0, 1.0, 0.0]),
+        np.array([1, -1, 1], dtype=np.int64),
+        np.array([0.5, -2.0, 3.0]),
+        np.array([], dtype=np.float64),
+        np.array([3, 0, -1], dtype=np.int32),
+    ],
+)
+def test_pack_unpack_roundtrip(values):
+    restored = unpack_array(pack_array(values))
+    assert restored.dtype == values.dtype
+    np.testing.assert_array_equal(restored, values)
+
+
+def test_pack_binary_is_compact():
+    values = np.zeros(800)
+    values[::3] = 1
+    assert len(pack_array(values)) < values.nbytes / 50
+
+
+def test_unpack_at_offset():
+    data = b"abc" + pack_array([1, -1])
+    assert unpack_array(data, offset=3).tolist() == [1, -1]
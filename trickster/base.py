@@ -15,6 +15,18 @@ class GraphSearchProblem:
     :param heuristic_fn: Returns an estimate of how far the given example.
     :param hash_fn: Hash function for nodes.
     :param bench_cost_fn: An alternative cost function used for analysis and reporting.
+    :param heuristic_batch_fn: Returns estimates for a list of nodes at once.
+    :param goal_batch_fn: Tells which nodes in a list are target nodes at once.
+    :param op_fn: Returns the operation code that turns a node into its child,
+            for recording compact paths.
+    :param select_fn: Operator selection function for partial expansion. See
+            :py:class:`trickster.search.OperatorSelection`.
+    :param grid_step: Grid step of the transformation costs and the heuristic
+            values, if they all lie on a regular grid.
+    :param secondary_fn: Secondary heuristic for picking nodes in focal search.
+            See :py:func:`trickster.search.focal_search`.
+    :param secondary_batch_fn: Returns secondary heuristic values for a list of
+            nodes at once.
     """
 
     search_fn: typing.Callable
@@ -23,6 +35,13 @@ class GraphSearchProblem:
     heuristic_fn: typing.Callable
     hash_fn: typing.Callable
     bench_cost_fn: typing.Callable = None
+    heuristic_batch_fn: typing.Callable = None
+    goal_batch_fn: typing.Callable = None
+    op_fn: typing.Callable = None
+    select_fn: typing.Callable = None
+    grid_step: float = None
+    secondary_fn: typing.Callable = None
+    secondary_batch_fn: typing.Callable = None
 
 
 @attr.s
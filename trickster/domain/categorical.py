@@ -3,12 +3,14 @@ Transformations and stats for quantized, categorical, and collection features.
 """
 
 import attr
+import struct
 import typing
 import numpy as np
 
 import warnings
 
 from trickster.utils.counter import ExpansionCounter, CounterLimitExceededError
+from trickster.utils.serialization import pack_array, unpack_array
 
 
 def expand_quantized_increment(sample, feat_idxs):
@@ -239,11 +241,14 @@ class Node:
     :param x: `Raw` example.
     :param feature_extract_fn: Feature extraction funcion.
     :param depth: Number of hops from the original example.
+    :param op: Operation code of the transformation that produced this node
+            from its parent: a tuple (changed indexes, new values).
     """
 
     src: typing.List
     depth: int = 0
     feature_extract_fn: typing.Callable = None
+    op: typing.Tuple = None
 
     @property
     def features(self):
@@ -266,17 +271,54 @@ class Node:
         counter.increment()
 
         for child in expand(self.src, expansion_specs):
+            changed_idxs = np.flatnonzero(child != self.src)
+            op = (tuple(changed_idxs.tolist()), tuple(child[changed_idxs].tolist()))
 
             children.append(
                 self.__class__(
                     src=child,
                     depth=self.depth + 1,
                     feature_extract_fn=self.feature_extract_fn,
+                    op=op,
                 )
             )
 
         return children
 
+    def replay(self, op):
+        """Return the neighbour node produced by the given operation code."""
+        changed_idxs, values = op
+        child = np.array(self.src)
+        child[list(changed_idxs)] = values
+        return self.__class__(
+            src=child,
+            depth=self.depth + 1,
+            feature_extract_fn=self.feature_extract_fn,
+            op=op,
+        )
+
+    def to_bytes(self):
+        """Serialize the example and the depth, e.g., to spill the node to disk."""
+        return struct.pack("<q", self.depth) + pack_array(self.src)
+
+    def from_bytes(self, data):
+        """Rebuild a node serialized with :py:meth:`to_bytes`.
+
+        The node gets the feature extraction function of this node. The
+        operation code is not kept.
+
+        >>> node = Node(src=np.array([0., 1., 0.]), depth=2)
+        >>> restored = node.from_bytes(node.to_bytes())
+        >>> restored.src, restored.depth
+        (array([0., 1., 0.]), 2)
+        """
+        (depth,) = struct.unpack_from("<q", data)
+        return self.__class__(
+            src=unpack_array(data, offset=8),
+            depth=depth,
+            feature_extract_fn=self.feature_extract_fn,
+        )
+
     def __eq__(self, other):
         return self.src == other.src
 
@@ -135,6 +135,38 @@ def dist_to_decision_boundary(
     return np.abs(score) / _grad_norm
 
 
+def batch_dist_to_decision_boundary(
+    clf, X, target_class, target_confidence, lp_space, inv_feature_weights=None, _grad_norm=None
+):
+    """
+    Compute distances to the decision boundary of a binary linear classifier for a batch of examples.
+
+    See :py:func:`dist_to_decision_boundary`. The classifier is queried once for the whole batch.
+    """
+    X = np.array(X)
+    confidences = clf.predict_proba(X)[:, target_class]
+    scores = np.array(clf.decision_function(X), dtype=float)
+
+    # If target confidence is not 0.5, correct the scores.
+    if target_confidence != 0.5:
+        delta = sp.special.logit(target_confidence)
+        delta *= -1 if target_class == 1 else 1
+        scores += delta
+
+    if _grad_norm is None:
+        _grad_norm = np.array([
+            _compute_grad_norm(
+                clf, x, target_class, target_confidence, lp_space, inv_feature_weights
+            )
+            for x in X
+        ])
+
+    # Compute the distances to the boundary.
+    dists = np.abs(scores) / _grad_norm
+    dists[confidences > target_confidence] = 0.0
+    return dists
+
+
 @attr.s
 class LinearHeuristic(WithProblemContext):
     r"""$$L_p$$ distance to the decision boundary of a binary linear classifier.
@@ -186,6 +218,37 @@ class LinearHeuristic(WithProblemContext):
         )
         return h * ctx.epsilon
 
+    @profiled
+    def batch(self, xs):
+        """Compute the heuristic for a list of examples using a single classifier call."""
+        ctx = self.problem_ctx
+        if ctx.epsilon == 0.0:
+            return np.zeros(len(xs))
+
+        grad_norm = None
+        if self.cache_grad:
+            grad_norm = getattr(self, "_cached_grad_norm", None)
+            if grad_norm is None:
+                grad_norm = self._cached_grad_norm = _compute_grad_norm(
+                    x=xs[0],
+                    clf=ctx.clf,
+                    target_class=ctx.target_class,
+                    target_confidence=ctx.target_confidence,
+                    lp_space=ctx.lp_space,
+                    inv_feature_weights=self._inv_weight_vec,
+                )
+
+        h = batch_dist_to_decision_boundary(
+            X=xs,
+            clf=ctx.clf,
+            target_class=ctx.target_class,
+            target_confidence=ctx.target_confidence,
+            lp_space=ctx.lp_space,
+            inv_feature_weights=self._inv_weight_vec,
+            _grad_norm=grad_norm,
+        )
+        return h * ctx.epsilon
+
 
 @attr.s
 class LinearGridHeuristic(LinearHeuristic):
@@ -204,3 +267,8 @@ class LinearGridHeuristic(LinearHeuristic):
         h = super().__call__(x)
         snapped = np.ceil(h / self.grid_step) * self.grid_step
         return snapped
+
+    @profiled
+    def batch(self, xs):
+        h = super().batch(xs)
+        return np.ceil(h / self.grid_step) * self.grid_step
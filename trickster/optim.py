@@ -7,6 +7,7 @@ import warnings
 
 warnings.filterwarnings("ignore")
 
+import inspect
 import pprint
 import logging
 
@@ -23,6 +24,9 @@ from profiled import Profiler, profiled
 
 from trickster import linear
 from trickster.search import generalized_a_star_search
+from trickster.search import SearchInterruptedError
+from trickster.search import SearchTimeoutError
+from trickster.search import SearchState
 from trickster.base import ProblemContext, GraphSearchProblem, WithProblemContext
 from trickster.domain.categorical import FeatureExpansionSpec
 from trickster.domain.categorical import Node
@@ -45,6 +49,8 @@ class CategoricalLpProblemContext(ProblemContext):
             More is sub-optimal but faster.
     :param expansion_specs: List of categorical expansion specs
             (:py:class:`trickster.domain.categorical.FeatureExpansionSpec`)
+    :param search_fn: Graph search function, e.g.,
+            :py:func:`trickster.search.hill_climbing_search`.
 
     >>> problem_ctx = CategoricalLpProblemContext(
     ...     clf="stub", target_class=1, target_confidence=0.5,
@@ -58,6 +64,7 @@ class CategoricalLpProblemContext(ProblemContext):
     epsilon: float = 1.0
     lp_space: LpSpace = attr.ib(default=1, converter=LpSpace)
     expansion_specs: typing.List[FeatureExpansionSpec] = attr.Factory(list)
+    search_fn: typing.Callable = generalized_a_star_search
 
     def get_graph_search_problem(self, x):
         problem_ctx = self
@@ -66,17 +73,24 @@ class CategoricalLpProblemContext(ProblemContext):
 
         raw_heuristic = linear.LinearHeuristic(problem_ctx=problem_ctx, cache_grad=True)
         heuristic_fn = lambda x: raw_heuristic(x.features)
+        heuristic_batch_fn = lambda xs: raw_heuristic.batch([x.features for x in xs])
 
         bench_cost_fn = BenchCost(problem_ctx=problem_ctx)
         hash_fn = _default_hash_fn
+        confidence_gap = ConfidenceGap(problem_ctx=problem_ctx)
 
         return GraphSearchProblem(
-            search_fn=generalized_a_star_search,
+            search_fn=self.search_fn,
             expand_fn=expand_fn,
             heuristic_fn=heuristic_fn,
             goal_fn=goal_fn,
             hash_fn=hash_fn,
             bench_cost_fn=bench_cost_fn,
+            heuristic_batch_fn=heuristic_batch_fn,
+            goal_batch_fn=goal_fn.batch,
+            op_fn=get_node_op,
+            secondary_fn=confidence_gap,
+            secondary_batch_fn=confidence_gap.batch,
         )
 
 
@@ -115,6 +129,35 @@ class GoalFunc(WithProblemContext):
             > self.problem_ctx.target_confidence
         )
 
+    @profiled
+    def batch(self, xs):
+        """Tell which examples in a list flip the decision using a single classifier call."""
+        return (
+            self.problem_ctx.clf.predict_proba([x.features for x in xs])[
+                :, self.problem_ctx.target_class
+            ]
+            > self.problem_ctx.target_confidence
+        )
+
+
+class ConfidenceGap(WithProblemContext):
+    """How far the target class confidence is below the target. Negative for goals.
+
+    Used as the secondary heuristic of focal search.
+    """
+
+    @profiled
+    def __call__(self, x):
+        return self.batch([x])[0]
+
+    @profiled
+    def batch(self, xs):
+        """Compute the gaps for a list of examples using a single classifier call."""
+        confidences = self.problem_ctx.clf.predict_proba([x.features for x in xs])[
+            :, self.problem_ctx.target_class
+        ]
+        return self.problem_ctx.target_confidence - confidences
+
 
 class BenchCost(WithProblemContext):
     """Alternative cost function used for analyses and stats."""
@@ -128,6 +171,11 @@ class BenchCost(WithProblemContext):
         )
 
 
+def get_node_op(x, child):
+    """Operation code that turns a node into its child, recorded by the child itself."""
+    return child.op
+
+
 @profiled
 def _default_hash_fn(x):
     """Hash function for examples."""
@@ -141,6 +189,18 @@ def _find_adversarial_example(initial_example_node, graph_search_problem, **kwar
     :param initial_example_node: Graph node corresponding to the initial examplean
     :param GraphSearchProblem graph_search_problem: Graph search instance specification.
     """
+    if graph_search_problem.heuristic_batch_fn is not None:
+        kwargs.setdefault("heuristic_batch_fn", graph_search_problem.heuristic_batch_fn)
+    if kwargs.get("early_goal") and graph_search_problem.goal_batch_fn is not None:
+        kwargs.setdefault("goal_batch_fn", graph_search_problem.goal_batch_fn)
+    if graph_search_problem.select_fn is not None:
+        kwargs.setdefault("select_fn", graph_search_problem.select_fn)
+    # The grid step and the secondary heuristic only matter to some searches.
+    search_params = inspect.signature(graph_search_problem.search_fn).parameters
+    for name in ["grid_step", "secondary_fn", "secondary_batch_fn"]:
+        value = getattr(graph_search_problem, name)
+        if value is not None and name in search_params:
+            kwargs.setdefault(name, value)
     return graph_search_problem.search_fn(
         initial_example_node,
         expand_fn=graph_search_problem.expand_fn,
@@ -160,7 +220,9 @@ def _dataset_find_adversarial_examples(
     reduce_classifier=True,
     counter_kwargs=None,
     graph_search_kwargs=None,
-    get_cost_weights_fn=None
+    get_cost_weights_fn=None,
+    time_lim=None,
+    retry_iter_lim=None,
 ):
     """Find adversarial examples for specified indexes, and record statistics for reporting.
 
@@ -171,11 +233,18 @@ def _dataset_find_adversarial_examples(
     :param transformable_feature_idxs: Indices of features that can be transformed.
     :param counter_kwargs: Parameters passed to the :py:class:`trickster.utils.ExpansionCounter`.
     :param graph_search_kwargs: Parameters passed to the search function call.
+    :param time_lim: Time budget in seconds for the search of each example.
+    :param retry_iter_lim: Number of additional iterations for the examples
+            whose search ran out of ``iter_lim``. The search continues from
+            where it stopped. Requires a search function that supports
+            ``state``, such as :py:func:`trickster.search.generalized_a_star_search`.
 
     """
     logger = logging.getLogger(LOGGER_NAME)
     counter_kwargs = counter_kwargs or {}
-    graph_search_kwargs = graph_search_kwargs or {}
+    graph_search_kwargs = dict(graph_search_kwargs or {})
+    if time_lim is not None:
+        graph_search_kwargs["time_lim"] = time_lim
     get_node_fn = lambda x: Node(src=x)
 
     # Dataframe for storing the results.
@@ -193,6 +262,10 @@ def _dataset_find_adversarial_examples(
             "path",
             "nodes_expanded",
             "runtime",
+            "timed_out",
+            "interrupt_reason",
+            "best_x_features",
+            "best_path_cost",
         ]
     )
 
@@ -240,16 +313,42 @@ def _dataset_find_adversarial_examples(
         path_cost = None
         runtime = None
         path = None
+        timed_out = False
+        interrupt_reason = None
+        best_x_features = None
+        best_path_cost = None
 
-        # Run the search.
+        # Run the search. Record the path as operation codes if possible, so
+        # that the results do not hold a feature vector per path node.
         graph_search_problem = problem_ctx.get_graph_search_problem(example)
+        search_kwargs = dict(graph_search_kwargs)
+        search_params = inspect.signature(graph_search_problem.search_fn).parameters
+        if graph_search_problem.op_fn is not None and "op_fn" in search_params:
+            search_kwargs.setdefault("op_fn", graph_search_problem.op_fn)
+        if retry_iter_lim is not None:
+            search_kwargs["state"] = SearchState()
         try:
             wrapped_x_adv, path_costs, path = _find_adversarial_example(
                 initial_example_node=get_node_fn(example),
                 graph_search_problem=graph_search_problem,
                 return_path=True,
-                **graph_search_kwargs,
+                **search_kwargs,
             )
+
+            # Give the unsolved example a second budget, unless the search
+            # space was exhausted.
+            if (
+                wrapped_x_adv is None
+                and retry_iter_lim is not None
+                and not search_kwargs["state"].exhausted
+            ):
+                search_kwargs["iter_lim"] = retry_iter_lim
+                wrapped_x_adv, path_costs, path = _find_adversarial_example(
+                    initial_example_node=get_node_fn(example),
+                    graph_search_problem=graph_search_problem,
+                    return_path=True,
+                    **search_kwargs,
+                )
             if wrapped_x_adv is None:
                 x_adv_found = False
             else:
@@ -259,6 +358,21 @@ def _dataset_find_adversarial_examples(
         except CounterLimitExceededError as e:
             logger.debug("For example at index {}: {}".format(idx, e))
 
+        except SearchInterruptedError as e:
+            logger.debug("For example at index {}: {}".format(idx, e))
+            timed_out = isinstance(e, SearchTimeoutError)
+            interrupt_reason = "timeout" if timed_out else "cancelled"
+
+            # Keep the node that seemed closest to a goal, in the original
+            # feature space.
+            if e.best_node is not None:
+                if transformable_feature_idxs is not None and reduce_classifier:
+                    best_x_features = np.array(orig_example)
+                    best_x_features[transformable_feature_idxs] = e.best_node.src
+                else:
+                    best_x_features = e.best_node.features
+                best_path_cost = e.best_cost
+
         # Record some basic statistics and info.
         # - Number of node expansions.
         nodes_expanded = expanded_counter.count
@@ -313,6 +427,10 @@ def _dataset_find_adversarial_examples(
                 "path": path,
                 "nodes_expanded": nodes_expanded,
                 "runtime": runtime,
+                "timed_out": timed_out,
+                "interrupt_reason": interrupt_reason,
+                "best_x_features": best_x_features,
+                "best_path_cost": best_path_cost,
             }
 
         else:
@@ -329,6 +447,10 @@ def _dataset_find_adversarial_examples(
                 "path": None,
                 "nodes_expanded": nodes_expanded,
                 "runtime": runtime,
+                "timed_out": timed_out,
+                "interrupt_reason": interrupt_reason,
+                "best_x_features": best_x_features,
+                "best_path_cost": best_path_cost,
             }
 
         logger.debug(pprint.pformat(results.loc[i]))
@@ -347,6 +469,7 @@ def run_experiment(
     make_graph_search_problem=None,
     get_cost_weights_fn=None,
     graph_search_kwargs=None,
+    retry_iter_lim=None,
     logger=None,
 ):
     """
@@ -361,6 +484,8 @@ def run_experiment(
     :param bool reduce_classifier: Whether to use :py:func:`trickster.linear.create_reduced_linear_classifier` if possible.
     :param list transformable_feature_idxs:
     :param dict graph_search_kwargs: Parameters passed to the search function call.
+    :param int retry_iter_lim: Additional iterations for the examples that were not
+            solved within ``iter_lim``.
     :param logger: Logger instance.
     """
     logger = logger or setup_custom_logger()
@@ -396,7 +521,8 @@ def run_experiment(
         reduce_classifier=reduce_classifier,
         transformable_feature_idxs=transformable_feature_idxs,
         graph_search_kwargs=graph_search_kwargs,
-        get_cost_weights_fn=get_cost_weights_fn
+        get_cost_weights_fn=get_cost_weights_fn,
+        retry_iter_lim=retry_iter_lim,
     )
 
     # Compute feature importance based on the count of feature transformations.
@@ -1,4 +1,393 @@
-import depq
+import bisect
+import functools
+import itertools
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from trickster.utils.cache import LRUCache
+from trickster.utils.counter import ExpansionCounter
+from trickster.utils.external import ExternalOpenList
+from trickster.utils.open_list import HeapOpenList, make_open_list
+from trickster.utils.open_list import float_to_tie_key
+
+
+class SearchInterruptedError(Exception):
+    """Search was stopped before a goal node was found.
+
+    :param best_node: Node with the lowest heuristic value among the expanded
+            ones, i.e. the node that seemed closest to a goal.
+    :param best_cost: Path cost from the initial node to ``best_node``.
+    """
+
+    def __init__(self, message, best_node=None, best_cost=None):
+        super().__init__(message)
+        self.best_node = best_node
+        self.best_cost = best_cost
+
+
+class SearchTimeoutError(SearchInterruptedError):
+    """Search ran out of its time limit."""
+
+
+class SearchCancelledError(SearchInterruptedError):
+    """Search was cancelled through its cancellation token."""
+
+
+class CancellationToken:
+    """Cooperative cancellation flag that can be shared with a running search.
+
+    :param event: Underlying event object. Pass a ``multiprocessing.Event``
+            to cancel searches running in other processes. By default, a
+            ``threading.Event``.
+
+    >>> token = CancellationToken()
+    >>> token.cancelled
+    False
+    >>> token.cancel()
+    >>> token.cancelled
+    True
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        """Request the search to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class _SearchLimits:
+    """Tracks the time limit, the cancellation token, and the best node seen."""
+
+    def __init__(self, time_lim=None, cancel_token=None):
+        self.deadline = None if time_lim is None else time.monotonic() + time_lim
+        self.cancel_token = cancel_token
+        self.best_node = None
+        self.best_cost = None
+        self._best_h = None
+
+    def remaining_time(self):
+        """Return the seconds left until the time limit, or None if there is none."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0)
+
+    def update_best(self, node, cost, h_score):
+        if self._best_h is None or h_score < self._best_h:
+            self.best_node = node
+            self.best_cost = cost
+            self._best_h = h_score
+
+    def check(self):
+        """Raise if the search has to be stopped."""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeoutError(
+                "Search time limit reached.",
+                best_node=self.best_node,
+                best_cost=self.best_cost,
+            )
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            raise SearchCancelledError(
+                "Search was cancelled.",
+                best_node=self.best_node,
+                best_cost=self.best_cost,
+            )
+
+
+class CompactPath:
+    """Path stored as the initial node and the operations that lead from it.
+
+    Memory is proportional to the path length, and not to the path length
+    times the size of a node. Nodes are rebuilt on access by replaying the
+    operations from the initial node.
+
+    :param start_node: Initial node.
+    :param ops: List of operation codes, one per edge of the path.
+    :param replay_fn: Returns the child obtained by applying an operation
+            code to a node. By default, calls ``node.replay(op)``.
+
+    >>> path = CompactPath(0, [1, 2, 3], replay_fn=lambda node, op: node + op)
+    >>> len(path), list(path), path[-1]
+    (4, [0, 1, 3, 6], 6)
+    """
+
+    def __init__(self, start_node, ops, replay_fn=None):
+        self.start_node = start_node
+        self.ops = list(ops)
+        self.replay_fn = replay_fn
+
+    def _replay(self, node, op):
+        if self.replay_fn is None:
+            return node.replay(op)
+        return self.replay_fn(node, op)
+
+    def __iter__(self):
+        node = self.start_node
+        yield node
+        for op in self.ops:
+            node = self._replay(node, op)
+            yield node
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Path index out of range")
+        node = self.start_node
+        for op in self.ops[:idx]:
+            node = self._replay(node, op)
+        return node
+
+    def __len__(self):
+        return len(self.ops) + 1
+
+    def __repr__(self):
+        return "{}(start_node={!r}, ops={!r})".format(
+            self.__class__.__name__, self.start_node, self.ops
+        )
+
+
+class SearchState:
+    """Bookkeeping of a :py:func:`generalized_a_star_search` run.
+
+    Pass an empty state as ``state`` to a search to record its open set,
+    closed set, path costs, and predecessors. Passing the same state again
+    continues the search from where it stopped, e.g., when it ran out of its
+    iteration limit, instead of starting from scratch. The search has to be
+    continued with the same functions and options. States can be pickled.
+
+    >>> state = SearchState()
+    >>> state.started, state.exhausted
+    (False, False)
+    """
+
+    def __init__(self):
+        self.path_costs = None
+        self.closed_set = None
+        self.predecessors = None
+        self.reverse_hashes = None
+        self.open_set = None
+        self.deltas = None
+        self.known_h_scores = None
+        self.depths = None
+        self.goal_hashes = None
+        self.tie_count = 0
+        self.num_iterations = 0
+        self.incumbent = None
+
+    @property
+    def started(self):
+        return self.open_set is not None
+
+    @property
+    def exhausted(self):
+        """Whether there are no nodes left to expand, i.e. continuing is futile."""
+        return self.started and not len(self.open_set)
+
+
+class OperatorSelection:
+    """Operator selection function for partial expansion.
+
+    Can be passed as ``select_fn`` to :py:func:`generalized_a_star_search`.
+    The operators of a node are listed and scored once by ``ops_fn``, without
+    generating the children. On every call, only the children of the next
+    group of operators with equal f-score increases are built with
+    ``replay_fn``, so the other children are never generated unless the
+    search needs them. Node hashes have to be unique, as the scores are
+    cached by hash until the last group of a node is returned.
+
+    :param ops_fn: Returns an iterable of tuples (op, cost, delta) for the
+            operators applicable to a node, where ``delta`` is the f-score
+            increase of the child, i.e., its cost plus its heuristic value
+            minus that of the node.
+    :param hash_fn: Hash function for nodes.
+    :param replay_fn: Applies an operation code to a node.
+
+    >>> select_fn = OperatorSelection(
+    ...     ops_fn=lambda x: [(3, 3, 3), (1, 1, 1), (2, 2, 2)],
+    ...     hash_fn=hash,
+    ...     replay_fn=lambda x, op: x + op)
+    >>> select_fn(0, None)
+    ([(1, 1)], 2)
+    >>> select_fn(0, 2)
+    ([(2, 2)], 3)
+    >>> select_fn(0, 3)
+    ([(3, 3)], None)
+    """
+
+    def __init__(self, ops_fn, hash_fn, replay_fn):
+        self.ops_fn = ops_fn
+        self.hash_fn = hash_fn
+        self.replay_fn = replay_fn
+        self._scores = {}
+
+    def _score(self, node):
+        # Return the f-score increases, the operations, and the costs of the
+        # operators, sorted by the increases.
+        scored = sorted(
+            (delta, i, op, cost)
+            for i, (op, cost, delta) in enumerate(self.ops_fn(node))
+        )
+        deltas = [entry[0] for entry in scored]
+        ops = [entry[2] for entry in scored]
+        costs = [entry[3] for entry in scored]
+        return deltas, ops, costs
+
+    def __call__(self, node, delta):
+        """Return the children with the lowest f-score increase not below ``delta``.
+
+        If ``delta`` is None, returns the children with the lowest increase.
+
+        :return: Tuple of the list of (child, cost) tuples, and the next f-score
+                increase, or None if no children are left.
+        """
+        hashed_node = self.hash_fn(node)
+        if hashed_node not in self._scores:
+            self._scores[hashed_node] = self._score(node)
+        deltas, ops, costs = self._scores[hashed_node]
+
+        lo = 0 if delta is None else bisect.bisect_left(deltas, delta)
+        if lo == len(deltas):
+            del self._scores[hashed_node]
+            return [], None
+        hi = bisect.bisect_right(deltas, deltas[lo])
+        children = [
+            (self.replay_fn(node, ops[i]), costs[i]) for i in range(lo, hi)
+        ]
+        if hi == len(deltas):
+            del self._scores[hashed_node]
+            return children, None
+        return children, deltas[hi]
+
+
+class PartialExpansion(OperatorSelection):
+    """Operator selection function for partial expansion, built from a full expansion.
+
+    For domains that cannot score their operators without generating the
+    children. The children of a node are generated and scored once, and only
+    their operation codes and f-score increases are kept, as with
+    :py:class:`OperatorSelection`. This saves the open set insertions of the
+    children that are never needed, but not their generation.
+
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param heuristic_fn: Returns an estimate of the cost to the target node.
+    :param hash_fn: Hash function for nodes.
+    :param op_fn: Returns the operation code that turns a node into its child.
+    :param replay_fn: Applies an operation code to a node.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children are evaluated in one call.
+
+    >>> select_fn = PartialExpansion(
+    ...     expand_fn=lambda x: [(x + 3, 3), (x + 1, 1), (x + 2, 2)],
+    ...     heuristic_fn=lambda x: 0,
+    ...     hash_fn=hash,
+    ...     op_fn=lambda x, child: child - x,
+    ...     replay_fn=lambda x, op: x + op)
+    >>> select_fn(0, None)
+    ([(1, 1)], 2)
+    >>> select_fn(0, 2)
+    ([(2, 2)], 3)
+    >>> select_fn(0, 3)
+    ([(3, 3)], None)
+    """
+
+    def __init__(
+        self, expand_fn, heuristic_fn, hash_fn, op_fn, replay_fn, heuristic_batch_fn=None
+    ):
+        super().__init__(ops_fn=self._expand_ops, hash_fn=hash_fn, replay_fn=replay_fn)
+        self.expand_fn = expand_fn
+        self.heuristic_fn = heuristic_fn
+        self.op_fn = op_fn
+        self.heuristic_batch_fn = heuristic_batch_fn
+
+    def _expand_ops(self, node):
+        children = list(self.expand_fn(node))
+        if self.heuristic_batch_fn is not None and len(children):
+            h_scores = self.heuristic_batch_fn([c[0] for c in children])
+        else:
+            h_scores = [self.heuristic_fn(c[0]) for c in children]
+        h_score = self.heuristic_fn(node)
+        return [
+            (self.op_fn(node, child), cost, cost + child_h_score - h_score)
+            for (child, cost), child_h_score in zip(children, h_scores)
+        ]
+
+
+TIE_BREAKING_POLICIES = ("fifo", "lifo", "deep", "low_h")
+
+
+def _expand_counted(expand_fn, node):
+    """Expand a node, and tell how many expansions the counter of the process saw."""
+    counter = ExpansionCounter.get_default()
+    count = counter.count
+    children = list(expand_fn(node))
+    return children, os.getpid(), counter.count - count
+
+
+# Expansion function of a worker process of :py:class:`_ExpansionPool`.
+_worker_expand_fn = None
+
+
+def _init_expansion_worker(expand_fn):
+    global _worker_expand_fn
+    _worker_expand_fn = expand_fn
+
+
+def _expand_in_worker(node):
+    return _expand_counted(_worker_expand_fn, node)
+
+
+class _ExpansionPool:
+    """Worker processes that expand nodes with a fixed expansion function.
+
+    The workers get the expansion function once, when they start, instead of
+    with every batch of nodes.
+    """
+
+    def __init__(self, expand_fn, num_workers, mp_context):
+        self._pool = mp_context.Pool(
+            num_workers, initializer=_init_expansion_worker, initargs=(expand_fn,)
+        )
+
+    def expand(self, nodes):
+        """Return the results of :py:func:`_expand_counted` for the nodes."""
+        return self._pool.map(_expand_in_worker, nodes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def _get_compact_path(predecessors, start_node, hashed_node, hash_fn, replay_fn):
+    """Collect the operation codes from the start to the current node."""
+
+    ops = []
+    hashed_start = hash_fn(start_node)
+
+    # Backtrack through the parent hashes until starting node is found
+    while hashed_node != hashed_start:
+        hashed_node, op = predecessors[hashed_node]
+        ops.append(op)
+    ops.reverse()
+
+    return CompactPath(start_node, ops, replay_fn=replay_fn)
 
 
 def _get_optimal_path(predecessors, start_node, node, hash_fn):
@@ -25,6 +414,30 @@ def generalized_a_star_search(
     iter_lim=None,
     beam_size=None,
     return_path=False,
+    heuristic_batch_fn=None,
+    open_list_factory=None,
+    early_goal=False,
+    goal_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    lean=False,
+    op_fn=None,
+    replay_fn=None,
+    observer=None,
+    state=None,
+    expansion_width=1,
+    pool=None,
+    select_fn=None,
+    deferred_heuristic=False,
+    bound_fn=None,
+    grid_step=None,
+    tie_breaking="fifo",
+    num_solutions=None,
+    cost_bound=None,
+    incumbent_fn=None,
+    max_cost=None,
+    num_workers=None,
+    mp_context=None,
 ):
     """
     Generalized A* search.
@@ -44,81 +457,617 @@ def generalized_a_star_search(
     :param beam_size: Beam size. Turns the search into beam search.
     :param return_path: Whether to return the optimal path from the
             initial node to the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, is called once per expansion on all children
+            that are going to be added to the open set, instead of calling
+            ``heuristic_fn`` on each child separately.
+    :param open_list_factory: Returns an empty open list given the beam
+            size. See :py:mod:`trickster.utils.open_list`. By default, a
+            binary heap with lazy deletion.
+    :param early_goal: Whether to test the children for being goal nodes
+            when they are generated rather than when they are popped from
+            the open set. The search stops at the cheapest goal child as
+            soon as no node in the open set has a lower f-score, e.g., right
+            away if all transformations have zero cost. Otherwise the goal
+            children are added to the open set, and are accepted when they
+            are popped, without being tested again. The result is then
+            optimal under the same conditions as without early goal testing.
+            With ``num_solutions``, the goal children are always accepted when
+            they are popped, so that the solutions come in the order of their
+            costs.
+    :param goal_batch_fn: Returns an array of booleans for a list of nodes.
+            If given, is used instead of ``goal_fn`` to test all children of
+            an expanded node in one call when ``early_goal`` is set.
+    :param time_lim: Wall-clock time limit in seconds. When it runs out,
+            :py:class:`SearchTimeoutError` is raised, which holds the best
+            node found so far.
+    :param cancel_token: :py:class:`CancellationToken`. When it gets
+            cancelled, :py:class:`SearchCancelledError` is raised.
+    :param lean: Whether to drop the node objects as soon as they are
+            expanded, and only keep those in the open set. Their hashes and
+            path costs are kept. With ``return_path``, the predecessor nodes
+            are still kept unless ``op_fn`` is given.
+    :param op_fn: Returns a small operation code, such as the position of
+            a transformation, for a node and its child. If given, only the
+            parent hash and the operation code are recorded for every
+            child, and the returned path is a :py:class:`CompactPath`.
+    :param replay_fn: Applies an operation code to a node. See
+            :py:class:`CompactPath`.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`
+            that is notified of the search events. By default, none.
+    :param state: :py:class:`SearchState` to record the search in. If it
+            holds a search that was stopped before, the search continues from
+            there, and ``iter_lim`` only limits the new iterations.
+    :param expansion_width: Number of nodes with the lowest f-scores that are
+            expanded together. Their children are evaluated with a single
+            ``heuristic_batch_fn`` call. Every expanded node counts as an
+            iteration. Expanded nodes are reopened when a cheaper path to
+            them is found. The result stays optimal: a goal node is only
+            returned when it has the lowest f-score in the open set.
+    :param pool: Object with a ``map`` method, such as a
+            ``multiprocessing.Pool`` or a ``concurrent.futures`` executor,
+            that runs ``expand_fn`` on the nodes of a batch. By default, the
+            nodes are expanded one after another. A process pool needs a
+            picklable ``expand_fn``, which is sent with every batch. The
+            expansions that its processes count with
+            :py:class:`trickster.utils.counter.ExpansionCounter` are added to
+            the counter of the calling process.
+    :param select_fn: Operator selection function for partial expansion. If
+            given, it is called as ``select_fn(node, delta)`` instead of
+            ``expand_fn``, and returns the tuple of the children whose f-score
+            exceeds that of the node by the lowest amount that is at least
+            ``delta`` (by any amount if ``delta`` is None), and the next such
+            amount, or None if there are no children left. The node is then
+            put back into the open set with its f-score raised by the next
+            amount, and is only closed when all its children have been
+            generated. It is not goal tested again, and the later groups do
+            not count as iterations. See :py:class:`OperatorSelection` and
+            :py:class:`PartialExpansion`.
+    :param deferred_heuristic: Whether to defer the heuristic evaluation of
+            the children until they are popped from the open set. Children are
+            added with a lower bound of their heuristic value instead, and a
+            popped node is put back if its heuristic value turns out higher.
+            Saves the evaluations of the children that are never popped. The
+            result stays optimal if the bounds are admissible. Every popped
+            node is evaluated with its own ``heuristic_fn`` call, so with loose
+            bounds the batched evaluation with ``heuristic_batch_fn`` can be
+            faster.
+    :param bound_fn: Returns a lower bound of the heuristic value of a child,
+            given the child, the heuristic value of its parent, and the cost
+            of the transformation. Only used with ``deferred_heuristic``. By
+            default, the parent value minus the cost, which is a lower bound
+            for consistent heuristics, also with negative values.
+    :param grid_step: Grid step of the f-scores, if all transformation costs
+            and heuristic values are known to be its multiples. The default
+            open list is then a
+            :py:class:`trickster.utils.open_list.BucketOpenList`.
+    :param tie_breaking: Which of the nodes with equal f-scores to pop first.
+            One of ``"fifo"`` (the first added), ``"lifo"`` (the last added),
+            ``"deep"`` (the one with the most transformations from the initial
+            node), or ``"low_h"`` (the one with the lowest heuristic value).
+            Matters on plateaus, e.g., with zero-cost transformations. Other
+            policies than ``"fifo"`` need an open list that accepts tie keys.
+    :param num_solutions: Number of goal nodes to look for. If given, the
+            search goes on after the first goal node, and returns a list of
+            up to this many results, each in the format above, in the order
+            of their costs. Goal nodes are closed without being expanded, so
+            no solution is an extension of another one. The list is shorter
+            if the open set or the iteration limit runs out first.
+    :param cost_bound: Only look for goal nodes cheaper than this. Children
+            whose f-score is not lower are discarded when they are generated,
+            which keeps them out of the open set. The result stays optimal
+            among such goal nodes if the heuristic is admissible.
+    :param incumbent_fn: Search function, such as
+            :py:func:`hill_climbing_search` with an iteration limit, that is
+            run first to find some goal node quickly. It is called with the
+            same functions and ``return_path`` (and ``heuristic_batch_fn``,
+            ``op_fn``, ``replay_fn``, ``cancel_token``, ``max_cost``, and the
+            time left of ``time_lim`` if given). Its iterations do not count
+            toward ``iter_lim``, so it needs its own limit, e.g., set with
+            :py:func:`functools.partial`. The cost of its goal node becomes
+            the cost bound, and its result is returned if the search finds no
+            cheaper goal node, e.g., when the goal node is optimal, or when
+            the iteration limit runs out. Children that cannot be cheaper are
+            dropped along with their path costs and predecessors.
+    :param max_cost: Budget of the path cost. Nodes whose f-score exceeds it
+            are discarded when they are generated. If the heuristic is
+            admissible, the search then returns as soon as the open set
+            empties that no goal node is within the budget, instead of
+            exploring the costlier nodes until the iteration limit. An
+            inadmissible heuristic can discard goal nodes within the budget.
+    :param num_workers: Number of worker processes that are started for the
+            search to expand the nodes of a batch, instead of ``pool``. The
+            workers get ``expand_fn`` once, when they start. Their expansions
+            are counted as with ``pool``.
+    :param mp_context: Multiprocessing context of the workers. By default,
+            uses the ``fork`` start method if it is available, and otherwise
+            needs a picklable ``expand_fn``.
     """
 
+    # Start the worker processes, and run the search with them as the pool.
+    if num_workers is not None:
+        if pool is not None:
+            raise ValueError("Only one of pool and num_workers can be given.")
+        if mp_context is None:
+            if "fork" in multiprocessing.get_all_start_methods():
+                mp_context = multiprocessing.get_context("fork")
+            else:
+                mp_context = multiprocessing.get_context()
+        with _ExpansionPool(expand_fn, num_workers, mp_context) as pool:
+            return generalized_a_star_search(
+                start_node=start_node,
+                expand_fn=expand_fn,
+                goal_fn=goal_fn,
+                heuristic_fn=heuristic_fn,
+                hash_fn=hash_fn,
+                iter_lim=iter_lim,
+                beam_size=beam_size,
+                return_path=return_path,
+                heuristic_batch_fn=heuristic_batch_fn,
+                open_list_factory=open_list_factory,
+                early_goal=early_goal,
+                goal_batch_fn=goal_batch_fn,
+                time_lim=time_lim,
+                cancel_token=cancel_token,
+                lean=lean,
+                op_fn=op_fn,
+                replay_fn=replay_fn,
+                observer=observer,
+                state=state,
+                expansion_width=expansion_width,
+                pool=pool,
+                select_fn=select_fn,
+                deferred_heuristic=deferred_heuristic,
+                bound_fn=bound_fn,
+                grid_step=grid_step,
+                tie_breaking=tie_breaking,
+                num_solutions=num_solutions,
+                cost_bound=cost_bound,
+                incumbent_fn=incumbent_fn,
+                max_cost=max_cost,
+            )
+
     # Define default heuristic and hash functions if none given
     if heuristic_fn is None:
         heuristic_fn = lambda _: 0
     if hash_fn is None:
         hash_fn = lambda x: x
+    if open_list_factory is None:
+        open_list_factory = functools.partial(make_open_list, grid_step=grid_step)
+    if bound_fn is None:
+        bound_fn = lambda _, parent_h_score, cost: parent_h_score - cost
+    if tie_breaking not in TIE_BREAKING_POLICIES:
+        raise ValueError(
+            "Unknown tie breaking policy {!r}. Expected one of {}.".format(
+                tie_breaking, ", ".join(TIE_BREAKING_POLICIES)
+            )
+        )
+    if num_solutions is not None and num_solutions < 1:
+        raise ValueError("num_solutions has to be at least 1.")
+    if num_solutions is not None and incumbent_fn is not None:
+        raise ValueError("incumbent_fn does not support num_solutions.")
 
     iter_count = 0
-
-    # Define data structures to hold data
-    path_costs = {}
-    predecessors = {}
-    reverse_hashes = {}
-    open_set = depq.DEPQ(maxlen=beam_size)
-    closed_set = set()
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+
+    # Define data structures to hold data, or take them from the state of a
+    # previous run. With lean, only the nodes in the open set are kept in
+    # reverse_hashes.
+    resumed = state is not None and state.started
+    if resumed:
+        path_costs = state.path_costs
+        closed_set = state.closed_set
+        predecessors = state.predecessors
+        reverse_hashes = state.reverse_hashes
+        open_set = state.open_set
+        deltas = state.deltas
+        known_h_scores = state.known_h_scores
+        depths = state.depths
+        goal_hashes = state.goal_hashes
+    else:
+        path_costs = {}
+        closed_set = set()
+        predecessors = {}
+        reverse_hashes = {}
+        open_set = open_list_factory(beam_size)
+
+        # Lowest f-score increase among the children that the partially
+        # expanded nodes have not generated yet.
+        deltas = {}
+
+        # Heuristic values of the nodes evaluated so far, with deferred
+        # evaluation. Nodes missing here are in the open set with a bound.
+        known_h_scores = {}
+
+        # Number of transformations from the initial node, for tie breaking.
+        depths = {}
+
+        # Children that were found to be goal nodes when they were generated,
+        # and are accepted when they are popped.
+        goal_hashes = set()
+        if state is not None:
+            state.path_costs = path_costs
+            state.closed_set = closed_set
+            state.predecessors = predecessors
+            state.reverse_hashes = reverse_hashes
+            state.open_set = open_set
+            state.deltas = deltas
+            state.known_h_scores = known_h_scores
+            state.depths = depths
+            state.goal_hashes = goal_hashes
+
+    # Find some goal node first, and only look for cheaper ones. A resumed
+    # search keeps the goal node found at the start.
+    incumbent = None
+    if resumed:
+        incumbent = state.incumbent
+    elif incumbent_fn is not None:
+        incumbent_kwargs = dict(
+            heuristic_batch_fn=heuristic_batch_fn,
+            op_fn=op_fn,
+            replay_fn=replay_fn,
+            cancel_token=cancel_token,
+            max_cost=max_cost,
+            time_lim=limits.remaining_time(),
+        )
+        incumbent = incumbent_fn(
+            start_node,
+            expand_fn=expand_fn,
+            goal_fn=goal_fn,
+            heuristic_fn=heuristic_fn,
+            hash_fn=hash_fn,
+            return_path=return_path,
+            **{k: v for k, v in incumbent_kwargs.items() if v is not None}
+        )
+        if incumbent[0] is None:
+            incumbent = None
+        elif max_cost is not None:
+            cost = incumbent[1][hash_fn(incumbent[0])] if return_path else incumbent[1]
+            if cost > max_cost:
+                incumbent = None
+        if state is not None:
+            state.incumbent = incumbent
+    upper_bound = math.inf if cost_bound is None else cost_bound
+    if incumbent is not None:
+        incumbent_cost = (
+            incumbent[1][hash_fn(incumbent[0])] if return_path else incumbent[1]
+        )
+        upper_bound = min(upper_bound, incumbent_cost)
+        if observer is not None and not resumed:
+            observer.on_bound_change(upper_bound)
+
+    tie_counter = itertools.count(state.tie_count if resumed else 0)
+
+    def prune_reason(f_score):
+        """Tell why a node with the given f-score cannot be added, if so."""
+        if f_score >= upper_bound:
+            return "bound"
+        if max_cost is not None and f_score > max_cost:
+            return "budget"
+        return None
+
+    def forget(hashed_node):
+        """Drop a node that was pruned the first time it was generated."""
+        reverse_hashes.pop(hashed_node, None)
+        path_costs.pop(hashed_node, None)
+        predecessors.pop(hashed_node, None)
+        depths.pop(hashed_node, None)
+        known_h_scores.pop(hashed_node, None)
+
+    def push(hashed_node, f_score, h_score):
+        if tie_breaking == "fifo":
+            open_set.push(hashed_node, f_score)
+            return
+        if tie_breaking == "lifo":
+            tie_key = -next(tie_counter)
+            if state is not None:
+                state.tie_count = -tie_key + 1
+        elif tie_breaking == "deep":
+            tie_key = -depths[hashed_node]
+        else:
+            tie_key = float_to_tie_key(h_score)
+        open_set.push(hashed_node, f_score, tie_key)
+
+    def make_result(node, hashed_node):
+        if observer is not None:
+            observer.on_goal(node, hashed_node, path_costs[hashed_node])
+        if return_path and op_fn is not None:
+            optimal_path = _get_compact_path(
+                predecessors, start_node, hashed_node, hash_fn, replay_fn
+            )
+            return node, path_costs, optimal_path
+        elif return_path:
+            optimal_path = _get_optimal_path(predecessors, start_node, node, hash_fn)
+            return node, path_costs, optimal_path
+        else:
+            return (node, path_costs[hashed_node])
+
+    # Goal nodes found so far, if several are needed. Their paths are taken
+    # when they are found, since the predecessors can change later on.
+    solutions = []
+    solution_hashes = set()
+
+    def add_solution(node, hashed_node):
+        """Record a goal node, and tell whether the search is over."""
+        solutions.append(make_result(node, hashed_node))
+        if num_solutions is None:
+            return True
+        solution_hashes.add(hashed_node)
+        closed_set.add(hashed_node)
+        return len(solutions) >= num_solutions
+
+    def final_result():
+        if num_solutions is not None:
+            return solutions
+        if solutions:
+            return solutions[0]
+        if incumbent is not None:
+            return incumbent
+        if return_path:
+            return None, path_costs, None
+        else:
+            return None, None
 
     # Add the starting node; f-score equal to heuristic.
-    hashed_start = hash_fn(start_node)
-    path_costs[hashed_start] = 0
-    f_score = heuristic_fn(start_node)
-    open_set.insert(hashed_start, priority=-f_score)
-    reverse_hashes[hashed_start] = start_node
+    if not resumed:
+        hashed_start = hash_fn(start_node)
+        path_costs[hashed_start] = 0
+        depths[hashed_start] = 0
+        f_score = heuristic_fn(start_node)
+        if max_cost is None or f_score <= max_cost:
+            push(hashed_start, f_score, f_score)
+            reverse_hashes[hashed_start] = start_node
+        elif observer is not None:
+            observer.on_prune(hashed_start, "budget")
+        if deferred_heuristic:
+            known_h_scores[hashed_start] = f_score
+
+        # With early goal testing, the children are only tested when generated,
+        # so the starting node has to be tested separately.
+        if early_goal and goal_fn(start_node):
+            if add_solution(start_node, hashed_start):
+                return final_result()
+            if hashed_start in reverse_hashes:
+                reverse_hashes.pop(hashed_start)
+                open_set.pop()
 
     # Iterate until a goal node is found, open set is empty
     # or iteration limit has been reached.
     while len(open_set) and (iter_lim is None or iter_count < iter_lim):
-
-        # Retrieve the node with the lowest f-score.
-        hashed_node, _ = open_set.popfirst()
-        node = reverse_hashes[hashed_node]
-
-        # Check if the current node is a goal node.
-        if goal_fn(node):
-            if return_path:
-                optimal_path = _get_optimal_path(
-                    predecessors, start_node, node, hash_fn
-                )
-                return node, path_costs, optimal_path
+        limits.check()
+
+        # Retrieve the nodes with the lowest f-scores. Partially expanded
+        # nodes that are popped again do not count as new iterations.
+        batch = []
+        num_new = 0
+        while len(open_set) and len(batch) < expansion_width and (
+            iter_lim is None or iter_count + num_new < iter_lim
+        ):
+            hashed_node, f_score = open_set.pop()
+            if lean:
+                node = reverse_hashes.pop(hashed_node)
             else:
-                return (node, path_costs[hashed_node])
-        closed_set.add(hashed_node)
-
-        # Iterate through all neighbours of the current node
-        for neighbour, cost in expand_fn(node):
-            hashed_neighbour = hash_fn(neighbour)
-            if hashed_neighbour in closed_set:
+                node = reverse_hashes[hashed_node]
+            if observer is not None:
+                observer.on_pop(hashed_node, f_score, len(open_set))
+            if hashed_node in solution_hashes:
                 continue
 
-            # Compute tentative path cost from the start node to the neighbour.
-            tentative_cost = path_costs[hashed_node] + cost
-
-            # Skip if the tentative path cost is larger or equal than the
-            # recorded one (if the latter exists).
-            if hashed_neighbour in path_costs and (
-                tentative_cost >= path_costs[hashed_neighbour]
-            ):
+            # The f-score of a partially expanded node includes the increase
+            # to the children it has yet to generate.
+            h_score = f_score - path_costs[hashed_node] - deltas.get(hashed_node, 0)
+
+            # Evaluate the heuristic of a node that was added with a bound, and
+            # put it back if its f-score increases.
+            if deferred_heuristic and hashed_node not in known_h_scores:
+                h_score = known_h_scores[hashed_node] = heuristic_fn(node)
+                reason = prune_reason(path_costs[hashed_node] + h_score)
+                if reason is not None:
+                    if observer is not None:
+                        observer.on_prune(hashed_node, reason)
+                    forget(hashed_node)
+                    continue
+                if path_costs[hashed_node] + h_score > f_score:
+                    push(hashed_node, path_costs[hashed_node] + h_score, h_score)
+                    reverse_hashes[hashed_node] = node
+                    continue
+
+            limits.update_best(node, path_costs[hashed_node], h_score)
+
+            # Check if the current node is a goal node. A goal that comes after
+            # other nodes in the batch is only accepted once these are expanded.
+            # A partially expanded node was tested when it was first popped,
+            # and with early goal testing, the node was tested when generated.
+            if early_goal:
+                is_goal = hashed_node in goal_hashes
+            else:
+                is_goal = hashed_node not in deltas and goal_fn(node)
+            if is_goal:
+                if batch:
+                    push(hashed_node, f_score, h_score)
+                    reverse_hashes[hashed_node] = node
+                    break
+                if add_solution(node, hashed_node):
+                    return final_result()
                 continue
+            batch.append((node, hashed_node, f_score, h_score))
+            if hashed_node not in deltas:
+                num_new += 1
+
+        # Put the nodes back if the expansion gets interrupted, e.g., by the
+        # expansion counter, so that the bookkeeping can be resumed.
+        try:
+            if select_fn is not None:
+                selections = [select_fn(b[0], deltas.get(b[1])) for b in batch]
+                children_lists = [children for children, _ in selections]
+            elif pool is not None:
+                nodes = [b[0] for b in batch]
+                if isinstance(pool, _ExpansionPool):
+                    results = pool.expand(nodes)
+                else:
+                    results = pool.map(
+                        functools.partial(_expand_counted, expand_fn), nodes
+                    )
+
+                # Count the expansions of other processes in this one.
+                counter = ExpansionCounter.get_default()
+                children_lists = []
+                for children, pid, num_expanded in results:
+                    if pid != os.getpid():
+                        for _ in range(num_expanded):
+                            counter.increment()
+                    children_lists.append(children)
+            else:
+                children_lists = [expand_fn(b[0]) for b in batch]
+            children_lists = [list(children) for children in children_lists]
+        except Exception:
+            for node, hashed_node, f_score, h_score in batch:
+                push(hashed_node, f_score, h_score)
+                reverse_hashes[hashed_node] = node
+            raise
+        for i, (node, hashed_node, f_score, h_score) in enumerate(batch):
+
+            # Put a partially expanded node back with the f-score of the
+            # children it has yet to generate.
+            next_delta = selections[i][1] if select_fn is not None else None
+            if next_delta is not None:
+                push(
+                    hashed_node,
+                    f_score - deltas.get(hashed_node, 0) + next_delta,
+                    h_score,
+                )
+                reverse_hashes[hashed_node] = node
+                deltas[hashed_node] = next_delta
+            else:
+                deltas.pop(hashed_node, None)
+                closed_set.add(hashed_node)
+            if observer is not None:
+                observer.on_expand(hashed_node, path_costs[hashed_node], h_score)
+
+        # Iterate through all neighbours of the expanded nodes. The ones that
+        # were not generated before can be forgotten if they are pruned.
+        candidates = []
+        bounds = []
+        fresh = set()
+        for (node, hashed_node, _, _), children in zip(batch, children_lists):
+            for neighbour, cost in children:
+                hashed_neighbour = hash_fn(neighbour)
+
+                # Compute tentative path cost from the start node to the neighbour.
+                tentative_cost = path_costs[hashed_node] + cost
+                reason = prune_reason(tentative_cost)
+                if reason is not None:
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, reason)
+                    continue
+
+                # Nodes of a batch can be expanded before their cheapest path is
+                # known, so with batches closed nodes are reopened when improved.
+                if hashed_neighbour in closed_set and (
+                    expansion_width == 1
+                    or tentative_cost >= path_costs[hashed_neighbour]
+                ):
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "closed")
+                    continue
+
+                # Skip if the tentative path cost is larger or equal than the
+                # recorded one (if the latter exists).
+                if hashed_neighbour in path_costs and (
+                    tentative_cost >= path_costs[hashed_neighbour]
+                ):
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "cost")
+                    continue
+
+                # Record new path cost for the neighbour and the predecessor. A
+                # partially expanded node has to generate all its children anew.
+                if hashed_neighbour not in path_costs:
+                    fresh.add(hashed_neighbour)
+                path_costs[hashed_neighbour] = tentative_cost
+                reverse_hashes[hashed_neighbour] = neighbour
+                deltas.pop(hashed_neighbour, None)
+                if tie_breaking == "deep":
+                    depths[hashed_neighbour] = depths[hashed_node] + 1
+                if return_path and op_fn is not None:
+                    predecessors[hashed_neighbour] = (
+                        hashed_node,
+                        op_fn(node, neighbour),
+                    )
+                elif return_path:
+                    predecessors[hashed_neighbour] = node
+                if observer is not None:
+                    observer.on_generate(hashed_node, hashed_neighbour, tentative_cost)
+                candidates.append((neighbour, hashed_neighbour, tentative_cost))
+                if deferred_heuristic and hashed_neighbour not in known_h_scores:
+                    bounds.append(
+                        bound_fn(neighbour, known_h_scores[hashed_node], cost)
+                    )
+                elif deferred_heuristic:
+                    bounds.append(known_h_scores[hashed_neighbour])
+
+        # Test all the children for being goal nodes at once. The goal
+        # children are added to the open set, and are accepted when popped,
+        # unless the cheapest one can be accepted right away.
+        goal_candidates = []
+        if early_goal and len(candidates):
+            if goal_batch_fn is not None:
+                is_goal = goal_batch_fn([c[0] for c in candidates])
+            else:
+                is_goal = [goal_fn(c[0]) for c in candidates]
+            goal_candidates = [c for c, flag in zip(candidates, is_goal) if flag]
+            goal_hashes.update(c[1] for c in goal_candidates)
+
+        # Compute the heuristic values for all the children at once, unless
+        # their evaluation is deferred.
+        if deferred_heuristic:
+            h_scores = bounds
+        elif heuristic_batch_fn is not None and len(candidates):
+            h_scores = heuristic_batch_fn([c[0] for c in candidates])
+        else:
+            h_scores = [heuristic_fn(c[0]) for c in candidates]
+
+        # Add the children to the open set, unless they cannot lead to a goal
+        # node cheaper than the bound. A pruned child that was generated
+        # before keeps its path cost, which prunes costlier paths to it, but
+        # leaves the open set, since its f-score only decreased.
+        for (_, hashed_neighbour, tentative_cost), h_score in zip(
+            candidates, h_scores
+        ):
+            f_score = tentative_cost + h_score
+            reason = prune_reason(f_score)
+            if reason is not None:
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, reason)
+                if hashed_neighbour in fresh:
+                    forget(hashed_neighbour)
+                else:
+                    open_set.discard(hashed_neighbour)
+                    reverse_hashes.pop(hashed_neighbour)
+                continue
+            push(hashed_neighbour, f_score, h_score)
+
+        # Stop at the cheapest goal child if no node in the open set has a
+        # lower f-score, so that, with an admissible heuristic, no cheaper goal
+        # node can be found. If several goal nodes are needed, they are only
+        # accepted when popped, so that they come in the order of their costs.
+        goal_candidates = [c for c in goal_candidates if c[1] in open_set]
+        if num_solutions is None and goal_candidates:
+            neighbour, hashed_neighbour, cost = min(
+                goal_candidates, key=lambda c: c[2]
+            )
+            top_hash, min_f_score = open_set.peek()
+            if top_hash == hashed_neighbour or cost <= min_f_score:
+                open_set.discard(hashed_neighbour)
+                add_solution(neighbour, hashed_neighbour)
+                return final_result()
 
-            # Record new path cost for the neighbour, the predecessor, and add
-            # to open set.
-            path_costs[hashed_neighbour] = tentative_cost
-            f_score = tentative_cost + heuristic_fn(neighbour)
-            open_set.insert(hashed_neighbour, priority=-f_score)
-            reverse_hashes[hashed_neighbour] = neighbour
-            if return_path:
-                predecessors[hashed_neighbour] = node
-
-        iter_count += 1
+        iter_count += num_new
+        if state is not None:
+            state.num_iterations += num_new
 
-    # Goal node is unreachable.
-    if return_path:
-        return None, path_costs, None
-    else:
-        return None, None
+    # Goal node is unreachable, or fewer goal nodes than needed are.
+    return final_result()
 
 
 def a_star_search(
@@ -130,6 +1079,30 @@ def a_star_search(
     iter_lim=None,
     beam_size=None,
     return_path=False,
+    heuristic_batch_fn=None,
+    open_list_factory=None,
+    early_goal=False,
+    goal_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    lean=False,
+    op_fn=None,
+    replay_fn=None,
+    observer=None,
+    state=None,
+    expansion_width=1,
+    pool=None,
+    select_fn=None,
+    deferred_heuristic=False,
+    bound_fn=None,
+    grid_step=None,
+    tie_breaking="fifo",
+    num_solutions=None,
+    cost_bound=None,
+    incumbent_fn=None,
+    max_cost=None,
+    num_workers=None,
+    mp_context=None,
 ):
     """
     Generalized A* search with no beam size limit.
@@ -146,166 +1119,1093 @@ def a_star_search(
         iter_lim=iter_lim,
         return_path=return_path,
         beam_size=None,
+        heuristic_batch_fn=heuristic_batch_fn,
+        open_list_factory=open_list_factory,
+        early_goal=early_goal,
+        goal_batch_fn=goal_batch_fn,
+        time_lim=time_lim,
+        cancel_token=cancel_token,
+        lean=lean,
+        op_fn=op_fn,
+        replay_fn=replay_fn,
+        observer=observer,
+        state=state,
+        expansion_width=expansion_width,
+        pool=pool,
+        select_fn=select_fn,
+        deferred_heuristic=deferred_heuristic,
+        bound_fn=bound_fn,
+        grid_step=grid_step,
+        tie_breaking=tie_breaking,
+        num_solutions=num_solutions,
+        cost_bound=cost_bound,
+        incumbent_fn=incumbent_fn,
+        max_cost=max_cost,
+        num_workers=num_workers,
+        mp_context=mp_context,
     )
 
 
-def _bounded_search_recursive(
-    path, path_costs, bound, expand_fn, goal_fn, heuristic_fn, hash_fn, reverse_hashes
+def ara_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    epsilons=(5.0, 2.5, 1.5, 1.0),
+    on_solution=None,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    observer=None,
+    max_cost=None,
 ):
+    """
+    Anytime repairing A* (ARA*) search.
 
-    # Expand the last node on the search path.
-    hashed_node = path[-1]
-    node = reverse_hashes[hashed_node]
-    f_score = path_costs[hashed_node] + heuristic_fn(node)
+    Runs weighted A* with f = g + epsilon * h for a decreasing sequence of
+    weights. The first solution is found quickly with a large weight, and is
+    then improved with each smaller weight. Every run reuses the open set and
+    the path costs of the previous one: only the nodes whose costs improved
+    after they had been expanded are reconsidered. The heuristic itself
+    should not be weighted, e.g., ``epsilon`` of the problem context should be 1.
 
-    # Backtrack if f-score exceeds the bound.
-    if f_score > bound:
-        return False, f_score, node, path
-    if goal_fn(node):
-        return True, f_score, node, path
+    When the iteration or time limit runs out, or the search gets cancelled
+    after a solution has been found, the best solution so far is returned.
+    The return values are the same as in :py:func:`generalized_a_star_search`.
 
-    min_score = None
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try, in total over
+            all weights.
+    :param return_path: Whether to return the optimal path from the
+            initial node to the target node. By default equals False.
+    :param epsilons: Decreasing sequence of heuristic weights. If the last
+            one is 1 and the heuristic is admissible, the final solution is
+            optimal.
+    :param on_solution: Called as ``on_solution(node, cost, bound)`` at the
+            end of every run that has a solution, where ``bound`` is an upper
+            bound on the ratio between ``cost`` and the optimal cost.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are
+            evaluated in one call.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+            The bound change event is sent with every new weight.
+    :param max_cost: Budget of the path cost. Nodes whose unweighted f-score
+            exceeds it are discarded. See :py:func:`generalized_a_star_search`.
+    """
 
-    # Iterate through all neighbours of the current node.
-    for neighbour, cost in expand_fn(node):
-        hashed_neighbour = hash_fn(neighbour)
+    # Define default heuristic and hash functions if none given
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
 
-        # Expand the neighbour only if it was not already visited.
-        if hashed_neighbour not in path:
-            path.append(hashed_neighbour)
-            reverse_hashes[hashed_neighbour] = neighbour
-            path_costs[hashed_neighbour] = path_costs[hashed_node] + cost
+    iter_count = 0
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
 
-            # Call the search recursively on the neighbour with new path and costs.
-            output = _bounded_search_recursive(
-                path,
-                path_costs,
-                bound,
-                expand_fn,
-                goal_fn,
-                heuristic_fn,
-                hash_fn,
-                reverse_hashes,
+    # Define data structures to hold data. Heuristic values are kept so that
+    # the priorities can be recomputed when the weight changes.
+    path_costs = {}
+    h_scores = {}
+    predecessors = {}
+    reverse_hashes = {}
+    open_set = HeapOpenList()
+    closed_set = set()
+    incons_set = set()
+
+    # Incumbent solution.
+    hashed_goal = None
+    goal_cost = float("inf")
+
+    def make_result():
+        if hashed_goal is None:
+            return (None, path_costs, None) if return_path else (None, None)
+        node = reverse_hashes[hashed_goal]
+        if return_path:
+            optimal_path = _get_optimal_path(predecessors, start_node, node, hash_fn)
+            return node, path_costs, optimal_path
+        else:
+            return (node, goal_cost)
+
+    # Add the starting node.
+    hashed_start = hash_fn(start_node)
+    path_costs[hashed_start] = 0
+    h_scores[hashed_start] = heuristic_fn(start_node)
+    reverse_hashes[hashed_start] = start_node
+    if max_cost is None or h_scores[hashed_start] <= max_cost:
+        open_set.push(hashed_start, epsilons[0] * h_scores[hashed_start])
+    elif observer is not None:
+        observer.on_prune(hashed_start, "budget")
+
+    for run, epsilon in enumerate(epsilons):
+        if observer is not None:
+            observer.on_bound_change(epsilon)
+
+        # Move the inconsistent nodes to the open set, update the priorities
+        # according to the new weight, and start with an empty closed set.
+        if run > 0:
+            hashed_nodes = list(open_set) + list(incons_set)
+            open_set = HeapOpenList()
+            for hashed_node in hashed_nodes:
+                f_score = path_costs[hashed_node] + epsilon * h_scores[hashed_node]
+                open_set.push(hashed_node, f_score)
+            incons_set = set()
+            closed_set = set()
+
+        # Improve the path until no node in the open set can lead to a
+        # cheaper solution under the current weight.
+        try:
+            while len(open_set) and (iter_lim is None or iter_count < iter_lim):
+                _, min_f_score = open_set.peek()
+                if goal_cost <= min_f_score:
+                    break
+                limits.check()
+
+                hashed_node, f_score = open_set.pop()
+                node = reverse_hashes[hashed_node]
+                node_cost = path_costs[hashed_node]
+                if observer is not None:
+                    observer.on_pop(hashed_node, f_score, len(open_set))
+                limits.update_best(node, node_cost, h_scores[hashed_node])
+                closed_set.add(hashed_node)
+
+                # Record the solution, and do not expand it: its descendants
+                # cannot be cheaper goals.
+                if goal_fn(node):
+                    if node_cost < goal_cost:
+                        hashed_goal, goal_cost = hashed_node, node_cost
+                        if observer is not None:
+                            observer.on_goal(node, hashed_node, node_cost)
+                    continue
+                if observer is not None:
+                    observer.on_expand(hashed_node, node_cost, h_scores[hashed_node])
+
+                candidates = []
+                for neighbour, cost in expand_fn(node):
+                    hashed_neighbour = hash_fn(neighbour)
+                    tentative_cost = node_cost + cost
+                    if max_cost is not None and tentative_cost > max_cost:
+                        if observer is not None:
+                            observer.on_prune(hashed_neighbour, "budget")
+                        continue
+                    if hashed_neighbour in path_costs and (
+                        tentative_cost >= path_costs[hashed_neighbour]
+                    ):
+                        if observer is not None:
+                            observer.on_prune(hashed_neighbour, "cost")
+                        continue
+
+                    path_costs[hashed_neighbour] = tentative_cost
+                    reverse_hashes[hashed_neighbour] = neighbour
+                    if return_path:
+                        predecessors[hashed_neighbour] = node
+                    if observer is not None:
+                        observer.on_generate(hashed_node, hashed_neighbour, tentative_cost)
+
+                    # Nodes that were already expanded in this run are only
+                    # reconsidered in the next one.
+                    if hashed_neighbour in closed_set:
+                        incons_set.add(hashed_neighbour)
+                    else:
+                        candidates.append((neighbour, hashed_neighbour))
+
+                # Compute the missing heuristic values for all the children at once.
+                new_candidates = [c for c in candidates if c[1] not in h_scores]
+                if heuristic_batch_fn is not None and len(new_candidates):
+                    new_h_scores = heuristic_batch_fn([c[0] for c in new_candidates])
+                else:
+                    new_h_scores = [heuristic_fn(c[0]) for c in new_candidates]
+                for (_, hashed_neighbour), h_score in zip(new_candidates, new_h_scores):
+                    h_scores[hashed_neighbour] = h_score
+
+                for _, hashed_neighbour in candidates:
+                    if max_cost is not None and (
+                        path_costs[hashed_neighbour] + h_scores[hashed_neighbour]
+                        > max_cost
+                    ):
+                        if observer is not None:
+                            observer.on_prune(hashed_neighbour, "budget")
+                        continue
+                    f_score = (
+                        path_costs[hashed_neighbour]
+                        + epsilon * h_scores[hashed_neighbour]
+                    )
+                    open_set.push(hashed_neighbour, f_score)
+
+                iter_count += 1
+
+        except SearchInterruptedError:
+            if hashed_goal is None:
+                raise
+            return make_result()
+
+        if hashed_goal is not None:
+            # Bound the suboptimality using the lowest unweighted f-score of
+            # the nodes that can still be improved.
+            remaining = list(open_set) + list(incons_set)
+            lower_bound = min(
+                (path_costs[h] + h_scores[h] for h in remaining), default=goal_cost
             )
+            bound = epsilon
+            if goal_cost <= 0 or lower_bound >= goal_cost:
+                bound = 1.0
+            elif lower_bound > 0:
+                bound = max(1.0, min(epsilon, goal_cost / lower_bound))
+            if on_solution is not None:
+                on_solution(reverse_hashes[hashed_goal], goal_cost, bound)
+            if bound <= 1:
+                break
 
-            is_found, score, candidate_node, candidate_path = output
-
-            if is_found:
-                return True, score, candidate_node, candidate_path
-
-            # If score is None then leave min_score None,
-            # otherwise update if score is smaller.
-            if min_score is None or score is None or score < min_score:
-                min_score = score
-
-            # Remove the neighbour from the path.
-            path.pop()
-
-    return False, min_score, None, None
-
+        if iter_lim is not None and iter_count >= iter_lim:
+            break
 
-def _bounded_search(
-    path, path_costs, bound, expand_fn, goal_fn, heuristic_fn, hash_fn, reverse_hashes
-):
-
-    # Obtain the starting node and its cost.
-    hashed_node = path[-1]
-    path_cost = path_costs[hashed_node]
-
-    # Reset the path.
-    path = []
-
-    # Initialise stack to imitate recursive calls.
-    # Stack holds tuples (current node, cost to current node and predecessor).
-    stack = [(hashed_node, path_cost, None)]
-    min_score = None
-
-    # Iterate while stack is not empty.
-    while len(stack):
-
-        hashed_node, path_cost, predecessor = stack.pop()
-
-        # Backtracks if the last node on the path was already expanded.
-        while predecessor and predecessor != path[-1]:
-            path.pop()
-
-        path.append(hashed_node)
-        node = reverse_hashes[hashed_node]
-        path_costs[hashed_node] = path_cost
-        f_score = path_cost + heuristic_fn(node)
-
-        # Backtrack if f-score exceeds the bound.
-        if f_score > bound:
-            path.pop()
-            if min_score is None or f_score < min_score:
-                min_score = f_score
-            continue
-        if goal_fn(node):
-            return True, f_score, node, path
-
-        # Iterate through all neighbours of the current node.
-        for neighbour, cost in reversed(expand_fn(node)):
-            hashed_neighbour = hash_fn(neighbour)
-
-            # Expand the neighbour only if it was not already visited.
-            if hashed_neighbour not in path:
-                reverse_hashes[hashed_neighbour] = neighbour
-                stack.append((hashed_neighbour, path_cost + cost, hashed_node))
-
-    return False, min_score, None, None
+    return make_result()
 
 
-def ida_star_search(
+def focal_search(
     start_node,
     expand_fn,
     goal_fn,
     heuristic_fn=None,
+    secondary_fn=None,
+    weight=1.5,
     hash_fn=None,
     iter_lim=None,
     return_path=False,
+    heuristic_batch_fn=None,
+    secondary_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    op_fn=None,
+    replay_fn=None,
+    observer=None,
+    max_cost=None,
 ):
     """
-    IDA* search.
+    Focal search (A*epsilon).
 
-    Returns the tuple (cost, target_node) if return_path is set to False.
-    Otherwise, returns the target node, the costs of nodes expanded by the
-    algorithm, and the optimal path from the initial node to the target node.
+    Keeps the open set ordered by the f-score, and a focal list of the open
+    nodes whose f-scores are within ``weight`` times the lowest one, or more
+    generally, at most ``weight - 1`` times its absolute value above it. The
+    node
+    to expand is picked from the focal list by a secondary heuristic, which
+    need not be admissible, e.g., how far the classifier confidence is from
+    the target. Unlike weighted A*, the heuristic itself is not inflated. If
+    the heuristic is admissible, the cost of the found solution is at most
+    ``weight`` times the optimal one. Nodes are reopened when a cheaper path
+    to them is found.
+
+    The return values are the same as in :py:func:`generalized_a_star_search`.
 
     :param start_node: Initial node.
     :param expand_fn: Returns an iterable of tuples (neighbour, cost).
     :param goal_fn: Returns True if the current node is the target node.
-    :param heuristic_fn: Returns an estimate of the cost to the target
-            node. By default, is a constant 0.
+    :param heuristic_fn: Returns an admissible estimate of the cost to the
+            target node. By default, is a constant 0.
+    :param secondary_fn: Returns the secondary heuristic of a node. Lower is
+            better. By default, the heuristic itself.
+    :param weight: Suboptimality bound, at least 1. With 1, the search is A*
+            that breaks ties by the secondary heuristic.
     :param hash_fn: Hash function for nodes. By default equals the
             identity function f(x) = x.
     :param iter_lim: Maximum number of iterations to try.
-
-    :param return_path: Whether to return the optimal path from the
-            initial node to the target node. By default equals False.
+    :param return_path: Whether to return the path from the initial node to
+            the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are evaluated
+            in one call.
+    :param secondary_batch_fn: Returns an array of secondary heuristic values
+            for a list of nodes.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param op_fn: Returns a small operation code for a node and its child.
+            See :py:func:`generalized_a_star_search`.
+    :param replay_fn: Applies an operation code to a node.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+            The bound change event is sent with every new focal bound.
+    :param max_cost: Budget of the path cost. Nodes whose f-score exceeds it
+            are discarded. See :py:func:`generalized_a_star_search`.
     """
-
-    # Define default heuristic and hash functions if none given.
+    if weight < 1:
+        raise ValueError("Focal search weight has to be at least 1, got {}.".format(weight))
     if heuristic_fn is None:
         heuristic_fn = lambda _: 0
     if hash_fn is None:
         hash_fn = lambda x: x
+    if secondary_fn is None and secondary_batch_fn is None:
+        use_h_scores = True
+    else:
+        use_h_scores = False
+        if secondary_fn is None:
+            secondary_fn = lambda node: secondary_batch_fn([node])[0]
 
-    iter_count = 0
-
-    # Define data structures to hold data.
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
     path_costs = {}
+    closed_set = set()
+    predecessors = {}
     reverse_hashes = {}
+    f_scores = {}
+    secondary_scores = {}
+
+    # All open nodes by f-score, the open nodes outside of the focal list by
+    # f-score, and the focal list by the secondary heuristic. Ties in the
+    # focal list are broken by the f-score.
+    open_set = HeapOpenList()
+    waiting = HeapOpenList()
+    focal = HeapOpenList()
+    focal_bound = [None]
+
+    def make_result(node, hashed_node):
+        if observer is not None:
+            observer.on_goal(node, hashed_node, path_costs[hashed_node])
+        if return_path and op_fn is not None:
+            optimal_path = _get_compact_path(
+                predecessors, start_node, hashed_node, hash_fn, replay_fn
+            )
+            return node, path_costs, optimal_path
+        elif return_path:
+            optimal_path = _get_optimal_path(predecessors, start_node, node, hash_fn)
+            return node, path_costs, optimal_path
+        else:
+            return (node, path_costs[hashed_node])
+
+    def push(hashed_node, f_score):
+        open_set.push(hashed_node, f_score)
+        f_scores[hashed_node] = f_score
+        if focal_bound[0] is not None and f_score <= focal_bound[0]:
+            waiting.discard(hashed_node)
+            focal.push(
+                hashed_node, secondary_scores[hashed_node], float_to_tie_key(f_score)
+            )
+        else:
+            focal.discard(hashed_node)
+            waiting.push(hashed_node, f_score)
+
+    def update_focal_bound():
+        _, min_f_score = open_set.peek()
+        if math.isfinite(min_f_score):
+            bound = min_f_score + (weight - 1) * abs(min_f_score)
+        else:
+            # An infinite f-score cannot be relaxed, e.g., -inf would give nan.
+            bound = min_f_score
+        if bound != focal_bound[0]:
+            focal_bound[0] = bound
+            if observer is not None:
+                observer.on_bound_change(bound)
+        while len(waiting) and waiting.peek()[1] <= bound:
+            hashed_node, f_score = waiting.pop()
+            focal.push(
+                hashed_node, secondary_scores[hashed_node], float_to_tie_key(f_score)
+            )
 
-    # Add the starting node; bound equal to heuristic.
+    hashed_start = hash_fn(start_node)
+    path_costs[hashed_start] = 0
+    reverse_hashes[hashed_start] = start_node
+    h_score = heuristic_fn(start_node)
+    if max_cost is None or h_score <= max_cost:
+        secondary_scores[hashed_start] = (
+            h_score if use_h_scores else secondary_fn(start_node)
+        )
+        push(hashed_start, h_score)
+    elif observer is not None:
+        observer.on_prune(hashed_start, "budget")
+
+    iter_count = 0
+    while len(open_set) and (iter_lim is None or iter_count < iter_lim):
+        limits.check()
+        update_focal_bound()
+
+        # Nodes whose f-scores are over the bound can only be in the focal
+        # list if the lowest f-score decreased, e.g., if the heuristic is not
+        # consistent. They are put back outside of it when they are popped.
+        # The node with the lowest f-score is always in the focal list.
+        hashed_node, _ = focal.pop()
+        f_score = f_scores[hashed_node]
+        if f_score > focal_bound[0]:
+            waiting.push(hashed_node, f_score)
+            continue
+        open_set.discard(hashed_node)
+        node = reverse_hashes.pop(hashed_node)
+        node_cost = path_costs[hashed_node]
+        if observer is not None:
+            observer.on_pop(hashed_node, f_score, len(open_set))
+        limits.update_best(node, node_cost, f_score - node_cost)
+
+        if goal_fn(node):
+            return make_result(node, hashed_node)
+
+        # Put the node back if the expansion gets interrupted.
+        try:
+            children = list(expand_fn(node))
+        except Exception:
+            reverse_hashes[hashed_node] = node
+            push(hashed_node, f_score)
+            raise
+        closed_set.add(hashed_node)
+        del f_scores[hashed_node]
+        del secondary_scores[hashed_node]
+        if observer is not None:
+            observer.on_expand(hashed_node, node_cost, f_score - node_cost)
+
+        candidates = []
+        for neighbour, cost in children:
+            hashed_neighbour = hash_fn(neighbour)
+            tentative_cost = node_cost + cost
+            if max_cost is not None and tentative_cost > max_cost:
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, "budget")
+                continue
+            if hashed_neighbour in path_costs and (
+                tentative_cost >= path_costs[hashed_neighbour]
+            ):
+                if observer is not None:
+                    reason = "closed" if hashed_neighbour in closed_set else "cost"
+                    observer.on_prune(hashed_neighbour, reason)
+                continue
+
+            # Nodes expanded out of the f-score order are reopened when a
+            # cheaper path to them is found.
+            closed_set.discard(hashed_neighbour)
+            path_costs[hashed_neighbour] = tentative_cost
+            reverse_hashes[hashed_neighbour] = neighbour
+            if return_path and op_fn is not None:
+                predecessors[hashed_neighbour] = (hashed_node, op_fn(node, neighbour))
+            elif return_path:
+                predecessors[hashed_neighbour] = node
+            if observer is not None:
+                observer.on_generate(hashed_node, hashed_neighbour, tentative_cost)
+            candidates.append((neighbour, hashed_neighbour, tentative_cost))
+
+        if heuristic_batch_fn is not None and len(candidates):
+            h_scores = heuristic_batch_fn([c[0] for c in candidates])
+        else:
+            h_scores = [heuristic_fn(c[0]) for c in candidates]
+
+        # Drop the children over the budget before the secondary heuristic.
+        if max_cost is not None:
+            within = [c[2] + h_score <= max_cost for c, h_score in zip(candidates, h_scores)]
+            for (_, hashed_neighbour, _), flag in zip(candidates, within):
+                if not flag:
+                    reverse_hashes.pop(hashed_neighbour)
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "budget")
+            candidates = [c for c, flag in zip(candidates, within) if flag]
+            h_scores = [h for h, flag in zip(h_scores, within) if flag]
+
+        if use_h_scores:
+            secondary = h_scores
+        elif secondary_batch_fn is not None and len(candidates):
+            secondary = secondary_batch_fn([c[0] for c in candidates])
+        else:
+            secondary = [secondary_fn(c[0]) for c in candidates]
+
+        for (_, hashed_neighbour, tentative_cost), h_score, secondary_score in zip(
+            candidates, h_scores, secondary
+        ):
+            secondary_scores[hashed_neighbour] = secondary_score
+            push(hashed_neighbour, tentative_cost + h_score)
+
+        iter_count += 1
+
+    # Goal node is unreachable.
+    if return_path:
+        return None, path_costs, None
+    else:
+        return None, None
+
+
+class _MemoryNode:
+    """Node of the search tree kept in memory by :py:func:`sma_star_search`."""
+
+    __slots__ = [
+        "node",
+        "hashed",
+        "cost",
+        "f_score",
+        "depth",
+        "parent",
+        "children",
+        "forgotten_f_score",
+        "expanded",
+    ]
+
+    def __init__(self, node, hashed, cost, f_score, depth, parent):
+        self.node = node
+        self.hashed = hashed
+        self.cost = cost
+        self.f_score = f_score
+        self.depth = depth
+        self.parent = parent
+        self.children = set()
+        self.forgotten_f_score = float("inf")
+        self.expanded = False
+
+    @property
+    def backed_up_f_score(self):
+        """Lowest f-score among the children that are not in memory anymore."""
+        return self.forgotten_f_score if self.expanded else self.f_score
+
+
+def sma_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    max_nodes=None,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    observer=None,
+    max_cost=None,
+    goal_batch_fn=None,
+):
+    """
+    Simplified memory-bounded A* (SMA*) search.
+
+    Keeps at most ``max_nodes`` nodes of the search tree in memory. The
+    children of an expanded node are added one at a time, in the order of
+    their f-scores. When the memory is full, the leaf with the highest
+    f-score is forgotten to make room, or the child itself if no leaf is
+    worse, and the forgotten f-score is backed up to the parent. The parent is
+    then put back to the open set, and regenerates the forgotten children when
+    it has the lowest f-score again. If ``max_nodes`` is large enough to hold
+    the whole search tree, the results are the same as those of
+    :py:func:`a_star_search`. The children returned by ``expand_fn`` for the
+    node being expanded are held on top of the ``max_nodes`` nodes while they
+    are added.
+
+    Returns the tuple (cost, target_node) if return_path is set to False.
+    Otherwise, returns the target node, the costs of the nodes in memory,
+    and the optimal path from the initial node to the target node.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try.
+    :param return_path: Whether to return the optimal path from the
+            initial node to the target node. By default equals False.
+    :param max_nodes: Maximum number of nodes to keep in memory. The
+            solution can only be found if its path has at most this many
+            nodes. By default, is unlimited.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are
+            evaluated in one call.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`
+            that is notified of the search events. By default, none.
+    :param max_cost: Budget of the path cost. Nodes whose f-score exceeds it
+            get an infinite f-score, like the nodes that cannot fit in
+            memory, so the search stops when only such nodes are left.
+    :param goal_batch_fn: Tells which nodes in a list are goal nodes. If
+            given, the children at the maximum depth are tested in one call.
+    """
+
+    # Define default heuristic and hash functions if none given
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+
+    inf = float("inf")
+    iter_count = 0
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+
+    # Nodes in memory. The open set holds unexpanded nodes, and expanded nodes
+    # with forgotten children, preferring deeper nodes among equal f-scores.
+    # The leaves are candidates for being forgotten, preferring shallower
+    # nodes among equal f-scores.
+    memory = {}
+    open_set = HeapOpenList()
+    leaves = HeapOpenList()
+
+    def refresh(record):
+        f_score = record.backed_up_f_score
+        if not record.expanded or record.forgotten_f_score < inf:
+            open_set.push(record.hashed, (f_score, -record.depth))
+        else:
+            open_set.discard(record.hashed)
+        if not record.children and record.parent is not None:
+            leaves.push(record.hashed, (-f_score, record.depth))
+        else:
+            leaves.discard(record.hashed)
+
+    def remove(record):
+        # Remove the subtree rooted at the record from memory.
+        stack = [record]
+        while stack:
+            current = stack.pop()
+            stack.extend(memory[h] for h in current.children)
+            del memory[current.hashed]
+            open_set.discard(current.hashed)
+            leaves.discard(current.hashed)
+        parent = record.parent
+        parent.children.discard(record.hashed)
+        return parent
+
+    def forget_worst_leaf():
+        hashed_leaf, _ = leaves.pop()
+        leaf = memory[hashed_leaf]
+        f_score = leaf.backed_up_f_score
+        parent = remove(leaf)
+        if observer is not None:
+            observer.on_prune(hashed_leaf, "memory")
+        parent.forgotten_f_score = min(parent.forgotten_f_score, f_score)
+        refresh(parent)
+
+    def make_room(record, f_score):
+        # Forget the worst leaves until there is room for a child of the record
+        # with the given f-score. Returns False if the child is forgotten
+        # instead, since no leaf is worse than it.
+        while max_nodes is not None and len(memory) >= max_nodes:
+            if not len(leaves) or -leaves.peek()[1][0] <= f_score:
+                record.forgotten_f_score = min(record.forgotten_f_score, f_score)
+                return False
+            forget_worst_leaf()
+        return True
+
+    def make_result(record):
+        if return_path:
+            path_costs = {h: r.cost for h, r in memory.items()}
+            optimal_path = []
+            current = record
+            while current is not None:
+                optimal_path.append(current.node)
+                current = current.parent
+            optimal_path.reverse()
+            return record.node, path_costs, optimal_path
+        else:
+            return (record.node, record.cost)
+
+    # Add the starting node; f-score equal to heuristic.
+    hashed_start = hash_fn(start_node)
+    f_score = heuristic_fn(start_node)
+    if max_cost is not None and f_score > max_cost:
+        f_score = inf
+    root = _MemoryNode(start_node, hashed_start, 0, f_score, depth=0, parent=None)
+    memory[hashed_start] = root
+    refresh(root)
+
+    while len(open_set) and (iter_lim is None or iter_count < iter_lim):
+        limits.check()
+
+        # Retrieve the node with the lowest f-score.
+        hashed_node, (f_score, _) = open_set.pop()
+        if f_score == inf:
+            break
+        record = memory[hashed_node]
+        node = record.node
+        limits.update_best(node, record.cost, record.f_score - record.cost)
+        if observer is not None:
+            observer.on_pop(hashed_node, f_score, len(open_set))
+
+        # Only unexpanded nodes are tested. The expanded ones are here to
+        # regenerate their forgotten children.
+        if not record.expanded and goal_fn(node):
+            if observer is not None:
+                observer.on_goal(node, hashed_node, record.cost)
+            return make_result(record)
+        if observer is not None:
+            observer.on_expand(hashed_node, record.cost, record.f_score - record.cost)
+
+        record.expanded = True
+        record.forgotten_f_score = inf
+        leaves.discard(hashed_node)
+
+        candidates = []
+        for neighbour, cost in expand_fn(node):
+            hashed_neighbour = hash_fn(neighbour)
+            if hashed_neighbour in record.children:
+                continue
+
+            # Keep only the cheapest copy of a node in memory.
+            tentative_cost = record.cost + cost
+            if hashed_neighbour in memory:
+                other = memory[hashed_neighbour]
+                if tentative_cost >= other.cost:
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "cost")
+                    continue
+                refresh(remove(other))
+
+            candidates.append((neighbour, hashed_neighbour, tentative_cost))
+
+        # Compute the heuristic values for all the children at once.
+        if heuristic_batch_fn is not None and len(candidates):
+            h_scores = heuristic_batch_fn([c[0] for c in candidates])
+        else:
+            h_scores = [heuristic_fn(c[0]) for c in candidates]
+
+        # A non-goal node at the maximum depth cannot be on a solution path
+        # that fits in memory.
+        depth = record.depth + 1
+        if max_nodes is not None and depth >= max_nodes - 1 and len(candidates):
+            if goal_batch_fn is not None:
+                fits = goal_batch_fn([c[0] for c in candidates])
+            else:
+                fits = [goal_fn(c[0]) for c in candidates]
+        else:
+            fits = [True] * len(candidates)
+
+        children = []
+        for (neighbour, hashed_neighbour, tentative_cost), h_score, flag in zip(
+            candidates, h_scores, fits
+        ):
+            f_score = max(record.f_score, tentative_cost + h_score)
+            if not flag:
+                f_score = inf
+            if max_cost is not None and f_score > max_cost:
+                f_score = inf
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, "budget")
+            children.append((f_score, neighbour, hashed_neighbour, tentative_cost))
+
+        # Add the children from the best one, so that the worst ones are the
+        # first to be forgotten if the memory is full.
+        children.sort(key=lambda c: c[0])
+        for f_score, neighbour, hashed_neighbour, tentative_cost in children:
+            if hashed_neighbour in memory:
+                continue
+            if not make_room(record, f_score):
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, "memory")
+                continue
+
+            child = _MemoryNode(
+                neighbour, hashed_neighbour, tentative_cost, f_score, depth, record
+            )
+            memory[hashed_neighbour] = child
+            record.children.add(hashed_neighbour)
+            refresh(child)
+            if observer is not None:
+                observer.on_generate(hashed_node, hashed_neighbour, tentative_cost)
+
+        refresh(record)
+        iter_count += 1
+
+    # Goal node is unreachable.
+    if return_path:
+        return None, {h: r.cost for h, r in memory.items()}, None
+    else:
+        return None, None
+
+
+def _bounded_search_recursive(
+    path, path_costs, bound, expand_fn, goal_fn, heuristic_fn, hash_fn, reverse_hashes
+):
+
+    # Expand the last node on the search path.
+    hashed_node = path[-1]
+    node = reverse_hashes[hashed_node]
+    f_score = path_costs[hashed_node] + heuristic_fn(node)
+
+    # Backtrack if f-score exceeds the bound.
+    if f_score > bound:
+        return False, f_score, node, path
+    if goal_fn(node):
+        return True, f_score, node, path
+
+    min_score = None
+
+    # Iterate through all neighbours of the current node.
+    for neighbour, cost in expand_fn(node):
+        hashed_neighbour = hash_fn(neighbour)
+
+        # Expand the neighbour only if it was not already visited.
+        if hashed_neighbour not in path:
+            path.append(hashed_neighbour)
+            reverse_hashes[hashed_neighbour] = neighbour
+            path_costs[hashed_neighbour] = path_costs[hashed_node] + cost
+
+            # Call the search recursively on the neighbour with new path and costs.
+            output = _bounded_search_recursive(
+                path,
+                path_costs,
+                bound,
+                expand_fn,
+                goal_fn,
+                heuristic_fn,
+                hash_fn,
+                reverse_hashes,
+            )
+
+            is_found, score, candidate_node, candidate_path = output
+
+            if is_found:
+                return True, score, candidate_node, candidate_path
+
+            # If score is None then leave min_score None,
+            # otherwise update if score is smaller.
+            if min_score is None or score is None or score < min_score:
+                min_score = score
+
+            # Remove the neighbour from the path.
+            path.pop()
+
+    return False, min_score, None, None
+
+
+class _TranspositionEntry:
+    """Search data of a node cached by the memory-enhanced IDA*.
+
+    ``cost`` and ``bound`` record the lowest path cost at which the node was
+    reached under the given bound.
+    """
+
+    __slots__ = ("h_score", "is_goal", "children", "cost", "bound")
+
+    def __init__(self, h_score):
+        self.h_score = h_score
+        self.is_goal = None
+        self.children = None
+        self.cost = None
+        self.bound = None
+
+
+def _bounded_search(
+    path,
+    path_costs,
+    bound,
+    expand_fn,
+    goal_fn,
+    heuristic_fn,
+    hash_fn,
+    reverse_hashes,
+    heuristic_batch_fn=None,
+    limits=None,
+    table=None,
+    observer=None,
+):
+
+    # Obtain the starting node and its cost.
+    hashed_node = path[-1]
+    path_cost = path_costs[hashed_node]
+
+    # Reset the path. The set mirrors the path for constant-time lookups.
+    path = []
+    on_path = set()
+
+    # Initialise stack to imitate recursive calls.
+    # Stack holds tuples (current node, cost to current node, predecessor, and
+    # the heuristic value if it was already computed).
+    stack = [(hashed_node, path_cost, None, None)]
+    min_score = None
+
+    # Iterate while stack is not empty.
+    while len(stack):
+        if limits is not None:
+            limits.check()
+
+        hashed_node, path_cost, predecessor, h_score = stack.pop()
+
+        # Backtracks if the last node on the path was already expanded.
+        while predecessor and predecessor != path[-1]:
+            on_path.discard(path.pop())
+
+        # Skip the node if it was already searched under this bound from
+        # a cheaper or equally cheap path.
+        entry = None
+        if table is not None:
+            entry = table.get(hashed_node)
+            if entry is not None and entry.bound == bound and entry.cost <= path_cost:
+                if observer is not None:
+                    observer.on_prune(hashed_node, "table")
+                continue
+
+        path.append(hashed_node)
+        on_path.add(hashed_node)
+        node = reverse_hashes[hashed_node]
+        path_costs[hashed_node] = path_cost
+        if h_score is None and entry is not None:
+            h_score = entry.h_score
+        if h_score is None:
+            h_score = heuristic_fn(node)
+        if table is not None:
+            if entry is None:
+                entry = _TranspositionEntry(h_score)
+                table[hashed_node] = entry
+            entry.cost, entry.bound = path_cost, bound
+
+        f_score = path_cost + h_score
+        if limits is not None:
+            limits.update_best(node, path_cost, h_score)
+        if observer is not None:
+            observer.on_pop(hashed_node, f_score, len(stack))
+
+        # Backtrack if f-score exceeds the bound.
+        if f_score > bound:
+            if observer is not None:
+                observer.on_prune(hashed_node, "bound")
+            on_path.discard(path.pop())
+            if min_score is None or f_score < min_score:
+                min_score = f_score
+            continue
+
+        if entry is not None and entry.is_goal is not None:
+            is_goal = entry.is_goal
+        else:
+            is_goal = goal_fn(node)
+            if entry is not None:
+                entry.is_goal = is_goal
+        if is_goal:
+            if observer is not None:
+                observer.on_goal(node, hashed_node, path_cost)
+            return True, f_score, node, path
+        if observer is not None:
+            observer.on_expand(hashed_node, path_cost, h_score)
+
+        # Generate the children, or take them from the table.
+        if entry is not None and entry.children is not None:
+            children = entry.children
+        else:
+            children = [
+                (neighbour, hash_fn(neighbour), cost)
+                for neighbour, cost in reversed(list(expand_fn(node)))
+            ]
+            if entry is not None:
+                entry.children = children
+
+        # Iterate through all neighbours of the current node.
+        candidates = []
+        for neighbour, hashed_neighbour, cost in children:
+
+            # Expand the neighbour only if it was not already visited.
+            if hashed_neighbour not in on_path:
+                reverse_hashes[hashed_neighbour] = neighbour
+                candidates.append((neighbour, hashed_neighbour, path_cost + cost))
+                if observer is not None:
+                    observer.on_generate(hashed_node, hashed_neighbour, path_cost + cost)
+            elif observer is not None:
+                observer.on_prune(hashed_neighbour, "path")
+
+        # Compute the heuristic values for all the children at once, except
+        # those that are cached in the table.
+        h_scores = [None] * len(candidates)
+        if heuristic_batch_fn is not None:
+            if table is not None:
+                for i, (_, hashed_neighbour, _) in enumerate(candidates):
+                    neighbour_entry = table.get(hashed_neighbour)
+                    if neighbour_entry is not None:
+                        h_scores[i] = neighbour_entry.h_score
+            missing = [i for i, h_score in enumerate(h_scores) if h_score is None]
+            if len(missing):
+                batch = heuristic_batch_fn([candidates[i][0] for i in missing])
+                for i, h_score in zip(missing, batch):
+                    h_scores[i] = h_score
+                    if table is not None:
+                        table[candidates[i][1]] = _TranspositionEntry(h_score)
+
+        for (_, hashed_neighbour, neighbour_cost), h_score in zip(
+            candidates, h_scores
+        ):
+            stack.append((hashed_neighbour, neighbour_cost, hashed_node, h_score))
+
+    return False, min_score, None, None
+
+
+def ida_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    table_size=None,
+    observer=None,
+    max_cost=None,
+):
+    """
+    IDA* search.
+
+    Returns the tuple (cost, target_node) if return_path is set to False.
+    Otherwise, returns the target node, the costs of nodes expanded by the
+    algorithm, and the optimal path from the initial node to the target node.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try.
+
+    :param return_path: Whether to return the optimal path from the
+            initial node to the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are
+            evaluated in one call.
+    :param time_lim: Wall-clock time limit in seconds. When it runs out,
+            :py:class:`SearchTimeoutError` is raised, which holds the best
+            node found so far.
+    :param cancel_token: :py:class:`CancellationToken`. When it gets
+            cancelled, :py:class:`SearchCancelledError` is raised.
+    :param table_size: Maximum number of nodes in the transposition table.
+            If given, the heuristic values, goal tests, and children of the
+            most recently visited nodes are kept across iterations instead
+            of being recomputed, and nodes that are reached again within an
+            iteration at no lower cost are pruned.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+            The bound change event is sent at the start of every iteration.
+    :param max_cost: Budget of the path cost. The search stops when the bound
+            would exceed it, since no goal node is then within the budget if
+            the heuristic is admissible.
+    """
+
+    # Define default heuristic and hash functions if none given.
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+
+    iter_count = 0
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+
+    # Define data structures to hold data.
+    path_costs = {}
+    reverse_hashes = {}
+    table = LRUCache(maxsize=table_size) if table_size is not None else None
+
+    # Add the starting node; bound equal to heuristic.
     hashed_start = hash_fn(start_node)
     path_costs[hashed_start] = 0
     bound = heuristic_fn(start_node)
     path = [hashed_start]
     reverse_hashes[hashed_start] = start_node
 
+    # No goal node is within the budget.
+    if max_cost is not None and bound > max_cost:
+        if return_path:
+            return None, path_costs, None
+        else:
+            return None, None
+
     # Iterate until found, score is None (i.e. no children)
     # or iteration limit has been reached.
     while iter_lim is None or iter_count < iter_lim:
+        if observer is not None:
+            observer.on_bound_change(bound)
 
         output = _bounded_search(
             path,
@@ -316,6 +2216,10 @@ def ida_star_search(
             heuristic_fn,
             hash_fn,
             reverse_hashes,
+            heuristic_batch_fn=heuristic_batch_fn,
+            limits=limits,
+            table=table,
+            observer=observer,
         )
 
         is_found, score, candidate_node, candidate_path = output
@@ -327,8 +2231,8 @@ def ida_star_search(
             else:
                 return candidate_node, score
 
-        # Goal node is unreachable.
-        if score is None:
+        # Goal node is unreachable, or over the budget.
+        if score is None or (max_cost is not None and score > max_cost):
             if return_path:
                 return None, path_costs, None
             else:
@@ -337,3 +2241,1414 @@ def ida_star_search(
         # Set the bound to be equal to the lowest f-score encountered.
         bound = score
         iter_count += 1
+
+    # Iteration limit has been reached.
+    if return_path:
+        return None, path_costs, None
+    else:
+        return None, None
+
+
+def _evaluate_children(
+    node, hashed_node, node_cost, on_path, expand_fn, hash_fn, heuristic_fn,
+    heuristic_batch_fn, observer,
+):
+    """Generate the children that are not on the path, and compute their
+    heuristic values. Returns a list of tuples (f-score, cost, h-score, child,
+    hashed child), sorted by the f-score."""
+    candidates = []
+    for neighbour, cost in expand_fn(node):
+        hashed_neighbour = hash_fn(neighbour)
+        if hashed_neighbour in on_path:
+            if observer is not None:
+                observer.on_prune(hashed_neighbour, "path")
+            continue
+        if observer is not None:
+            observer.on_generate(hashed_node, hashed_neighbour, node_cost + cost)
+        candidates.append((neighbour, hashed_neighbour, node_cost + cost))
+
+    if heuristic_batch_fn is not None and len(candidates):
+        h_scores = heuristic_batch_fn([c[0] for c in candidates])
+    else:
+        h_scores = [heuristic_fn(c[0]) for c in candidates]
+
+    children = [
+        (cost + h_score, cost, h_score, neighbour, hashed_neighbour)
+        for (neighbour, hashed_neighbour, cost), h_score in zip(candidates, h_scores)
+    ]
+    children.sort(key=lambda child: child[0])
+    return children
+
+
+def _make_linear_result(start_node, goal, return_path):
+    """Result of a search that only keeps the current path, given the path to
+    the goal as a list of tuples (node, hashed node, cost)."""
+    if goal is None:
+        if return_path:
+            return None, {}, None
+        return None, None
+
+    node, _, cost = goal[-1]
+    if return_path:
+        path_costs = {hashed_node: node_cost for _, hashed_node, node_cost in goal}
+        return node, path_costs, [node for node, _, _ in goal]
+    return node, cost
+
+
+def dfbnb_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    cost_bound=None,
+    depth_lim=None,
+    table_size=None,
+    observer=None,
+    max_cost=None,
+):
+    """
+    Depth-first branch-and-bound search.
+
+    Searches depth-first, with the children of every node ordered by their
+    f-scores, and keeps the cheapest goal node found so far. Subtrees whose
+    f-scores are not lower than its cost are pruned. When the search space is
+    exhausted, the kept goal node is optimal if the heuristic is admissible.
+
+    Only the current path and the children of the nodes on it are kept, so the
+    memory is linear in the depth. The returned path costs only hold the nodes
+    on the returned path. When the iteration or time limit runs out, or the
+    search gets cancelled after a goal node has been found, the best one so
+    far is returned.
+
+    The return values are the same as in :py:func:`generalized_a_star_search`.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try.
+    :param return_path: Whether to return the path from the initial node to
+            the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are evaluated
+            in one call.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param cost_bound: Only look for goal nodes cheaper than this, e.g., the
+            cost of a known solution.
+    :param depth_lim: Maximum number of transformations on a path. Needed if
+            the graph has infinite paths that do not raise the f-score.
+    :param table_size: Maximum number of nodes in a transposition table. If
+            given, the lowest path costs of the most recently visited nodes
+            are kept, and nodes that are reached again at no lower cost are
+            pruned.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+            The bound change event is sent with the cost of every new best
+            goal node.
+    :param max_cost: Budget of the path cost. Unlike ``cost_bound``, goal
+            nodes that cost exactly this much are kept. Both can be given: a
+            node is pruned when its f-score reaches the cost bound, or the
+            cost of the best goal node so far, or exceeds the budget.
+    """
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+    table = LRUCache(maxsize=table_size) if table_size is not None else None
+    best_cost = math.inf if cost_bound is None else cost_bound
+    best_path = None
+
+    # The path holds tuples (node, hashed node, cost), and the stack holds the
+    # children of the nodes on the path that are yet to be searched, in the
+    # reverse order.
+    hashed_start = hash_fn(start_node)
+    path = []
+    on_path = set()
+    h_score = heuristic_fn(start_node)
+    stack = [[(h_score, 0, h_score, start_node, hashed_start)]]
+
+    iter_count = 0
+    try:
+        while len(stack):
+            limits.check()
+            if not stack[-1]:
+                stack.pop()
+                if path:
+                    _, hashed_node, _ = path.pop()
+                    on_path.discard(hashed_node)
+                continue
+
+            f_score, node_cost, h_score, node, hashed_node = stack[-1].pop()
+            if observer is not None:
+                observer.on_pop(hashed_node, f_score, sum(len(c) for c in stack))
+            if f_score >= best_cost:
+                if observer is not None:
+                    observer.on_prune(hashed_node, "bound")
+                continue
+            if max_cost is not None and f_score > max_cost:
+                if observer is not None:
+                    observer.on_prune(hashed_node, "budget")
+                continue
+            if table is not None:
+                table_cost = table.get(hashed_node)
+                if table_cost is not None and table_cost <= node_cost:
+                    if observer is not None:
+                        observer.on_prune(hashed_node, "cost")
+                    continue
+                table[hashed_node] = node_cost
+            limits.update_best(node, node_cost, h_score)
+
+            if goal_fn(node):
+                best_cost = node_cost
+                best_path = path + [(node, hashed_node, node_cost)]
+                if observer is not None:
+                    observer.on_goal(node, hashed_node, node_cost)
+                    observer.on_bound_change(best_cost)
+                continue
+            if depth_lim is not None and len(path) >= depth_lim:
+                if observer is not None:
+                    observer.on_prune(hashed_node, "depth")
+                continue
+            if iter_lim is not None and iter_count >= iter_lim:
+                break
+
+            if observer is not None:
+                observer.on_expand(hashed_node, node_cost, h_score)
+            path.append((node, hashed_node, node_cost))
+            on_path.add(hashed_node)
+            children = _evaluate_children(
+                node, hashed_node, node_cost, on_path, expand_fn, hash_fn,
+                heuristic_fn, heuristic_batch_fn, observer,
+            )
+            children.reverse()
+            stack.append(children)
+            iter_count += 1
+
+    except SearchInterruptedError:
+        if best_path is None:
+            raise
+
+    return _make_linear_result(start_node, best_path, return_path)
+
+
+class _RbfsFrame:
+    """Node on the path of the recursive best-first search.
+
+    :param f_score: Backed-up f-score of the node.
+    :param static_f_score: Cost plus heuristic value of the node.
+    :param bound: Backed-up f-score of the best alternative to the node.
+    :param children: Lists [backed-up f-score, f-score, cost, h-score, child,
+            hashed child], or None if the node was not expanded yet.
+    """
+
+    __slots__ = ("node", "hashed", "cost", "f_score", "static_f_score", "bound",
+                 "children")
+
+    def __init__(self, node, hashed, cost, f_score, static_f_score, bound):
+        self.node = node
+        self.hashed = hashed
+        self.cost = cost
+        self.f_score = f_score
+        self.static_f_score = static_f_score
+        self.bound = bound
+        self.children = None
+
+
+def rbfs_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    observer=None,
+    max_cost=None,
+):
+    """
+    Recursive best-first search (RBFS).
+
+    Expands nodes in the best-first order while only keeping the current path
+    and the children of the nodes on it, so the memory is linear in the depth.
+    Every node on the path remembers the f-score of the best alternative to
+    it. When all its children exceed this bound, the search backtracks, and
+    the lowest f-score of the children is backed up, so that the subtree is
+    not searched again before it becomes the best one. Returns an optimal
+    path if the heuristic is admissible. The returned path costs only hold
+    the nodes on the returned path. Implemented with an explicit stack
+    instead of recursion, so deep paths do not hit the recursion limit.
+
+    The return values are the same as in :py:func:`generalized_a_star_search`.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try.
+    :param return_path: Whether to return the path from the initial node to
+            the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children of an expanded node are evaluated
+            in one call.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+    :param max_cost: Budget of the path cost. Subtrees whose backed-up
+            f-scores exceed it are treated as dead ends.
+    """
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+
+    def within_budget(f_score):
+        if max_cost is not None and f_score > max_cost:
+            return math.inf
+        return f_score
+
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+    h_score = heuristic_fn(start_node)
+    if within_budget(h_score) == math.inf:
+        return _make_linear_result(start_node, None, return_path)
+    stack = [
+        _RbfsFrame(start_node, hash_fn(start_node), 0, h_score, h_score, math.inf)
+    ]
+    on_path = {stack[0].hashed}
+
+    iter_count = 0
+    while len(stack):
+        limits.check()
+        frame = stack[-1]
+
+        if frame.children is None:
+            if observer is not None:
+                observer.on_pop(frame.hashed, frame.f_score, len(stack) - 1)
+            limits.update_best(frame.node, frame.cost, frame.static_f_score - frame.cost)
+            if goal_fn(frame.node):
+                if observer is not None:
+                    observer.on_goal(frame.node, frame.hashed, frame.cost)
+                goal = [(f.node, f.hashed, f.cost) for f in stack]
+                return _make_linear_result(start_node, goal, return_path)
+            if iter_lim is not None and iter_count >= iter_lim:
+                break
+
+            if observer is not None:
+                observer.on_expand(
+                    frame.hashed, frame.cost, frame.static_f_score - frame.cost
+                )
+            children = _evaluate_children(
+                frame.node, frame.hashed, frame.cost, on_path, expand_fn, hash_fn,
+                heuristic_fn, heuristic_batch_fn, observer,
+            )
+            iter_count += 1
+
+            # A node that was searched before passes its backed-up f-score on
+            # to its children.
+            inherit = frame.f_score > frame.static_f_score
+            frame.children = [
+                [within_budget(max(f_score, frame.f_score) if inherit else f_score),
+                 f_score, cost, h_score, child, hashed_child]
+                for f_score, cost, h_score, child, hashed_child in children
+            ]
+
+        # Backtrack with the lowest f-score of the children if all of them
+        # exceed the bound, or lead to dead ends.
+        children = frame.children
+        children.sort(key=lambda child: child[0])
+        best_f_score = children[0][0] if children else math.inf
+        if best_f_score > frame.bound or best_f_score == math.inf:
+            stack.pop()
+            on_path.discard(frame.hashed)
+            if stack:
+                stack[-1].children[0][0] = within_budget(best_f_score)
+            continue
+
+        # Search the best child, bounded by the second best one.
+        alternative = children[1][0] if len(children) > 1 else math.inf
+        f_score, static_f_score, cost, _, child, hashed_child = children[0]
+        stack.append(
+            _RbfsFrame(
+                child, hashed_child, cost, f_score, static_f_score,
+                min(frame.bound, alternative),
+            )
+        )
+        on_path.add(hashed_child)
+
+    return _make_linear_result(start_node, None, return_path)
+
+
+def hill_climbing_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    goal_batch_fn=None,
+    num_restarts=0,
+    seed=None,
+    time_lim=None,
+    cancel_token=None,
+    op_fn=None,
+    replay_fn=None,
+    observer=None,
+    max_cost=None,
+):
+    """
+    Steepest-descent hill climbing with a tabu set and random restarts.
+
+    At every step, the search moves to the child with the lowest f-score
+    among those that were not visited before, and have a lower heuristic
+    value than the current node. The heuristic values of all children are
+    computed at once. Visited nodes stay tabu for the rest of the search, so
+    the search never cycles. When the current node has no such children,
+    i.e., at a dead end or a local minimum of the heuristic, the search
+    restarts from the initial node, and takes its first step to a random
+    unvisited child. Needs much less bookkeeping than
+    :py:func:`generalized_a_star_search` with ``beam_size=1``, and is not
+    optimal either.
+
+    Returns the tuple (cost, target_node) if return_path is set to False.
+    Otherwise, returns the target node, the costs of the visited nodes, and
+    the path from the initial node to the target node.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of expansions, in total over all
+            restarts.
+    :param return_path: Whether to return the path from the initial node to
+            the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the children are evaluated in one call.
+    :param goal_batch_fn: Returns an array of booleans for a list of nodes.
+            If given, all children are tested for being goal nodes in one
+            call, and the search stops at the cheapest goal child.
+    :param num_restarts: Number of random restarts after dead ends and local
+            minima.
+    :param seed: Seed of the random first steps after restarts.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param op_fn: Returns an operation code for a node and its child. If
+            given, the returned path is a :py:class:`CompactPath`.
+    :param replay_fn: Applies an operation code to a node. See
+            :py:class:`CompactPath`.
+    :param observer: :py:class:`trickster.utils.observers.SearchObserver`.
+    :param max_cost: Budget of the path cost. Children whose f-score exceeds
+            it are never moved to, and a node with no other children is a dead
+            end.
+    """
+
+    # Define default heuristic and hash functions if none given
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+
+    iter_count = 0
+    restart_count = 0
+    rng = random.Random(seed)
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+
+    # Path costs of the visited nodes. Its keys are the tabu set.
+    path_costs = {}
+
+    def score(candidates):
+        if heuristic_batch_fn is not None:
+            return np.asarray(heuristic_batch_fn([c[0] for c in candidates]))
+        else:
+            return np.array([heuristic_fn(c[0]) for c in candidates])
+
+    def make_result(node, hashed_node):
+        if observer is not None:
+            observer.on_goal(node, hashed_node, path_costs[hashed_node])
+        if return_path and op_fn is not None:
+            return node, path_costs, CompactPath(start_node, ops, replay_fn=replay_fn)
+        elif return_path:
+            return node, path_costs, list(path)
+        else:
+            return (node, path_costs[hashed_node])
+
+    # Start at the initial node.
+    hashed_start = hash_fn(start_node)
+    path_costs[hashed_start] = 0
+    node, hashed_node = start_node, hashed_start
+    h_score = start_h_score = heuristic_fn(start_node)
+    path, ops = [start_node], []
+    random_step = False
+    if goal_fn(start_node):
+        return make_result(start_node, hashed_start)
+
+    while iter_lim is None or iter_count < iter_lim:
+        limits.check()
+        limits.update_best(node, path_costs[hashed_node], h_score)
+        node_cost = path_costs[hashed_node]
+        if observer is not None:
+            observer.on_expand(hashed_node, node_cost, h_score)
+
+        # Collect the children that were not visited yet.
+        candidates = []
+        for neighbour, cost in expand_fn(node):
+            hashed_neighbour = hash_fn(neighbour)
+            if hashed_neighbour in path_costs:
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, "closed")
+                continue
+            if max_cost is not None and node_cost + cost > max_cost:
+                if observer is not None:
+                    observer.on_prune(hashed_neighbour, "budget")
+                continue
+            if observer is not None:
+                observer.on_generate(hashed_node, hashed_neighbour, node_cost + cost)
+            candidates.append((neighbour, hashed_neighbour, node_cost + cost))
+        iter_count += 1
+
+        # Drop the children over the budget, which needs their heuristic
+        # values before the goal test. They stay tabu.
+        h_scores = None
+        if max_cost is not None and candidates:
+            h_scores = score(candidates)
+            within = np.array([c[2] for c in candidates]) + h_scores <= max_cost
+            for (_, hashed_neighbour, neighbour_cost), flag in zip(candidates, within):
+                if not flag:
+                    path_costs[hashed_neighbour] = neighbour_cost
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "budget")
+            candidates = [c for c, flag in zip(candidates, within) if flag]
+            h_scores = h_scores[within]
+
+        # Test all the children for being goal nodes at once.
+        if goal_batch_fn is not None and candidates:
+            is_goal = goal_batch_fn([c[0] for c in candidates])
+            goal_idxs = [i for i, flag in enumerate(is_goal) if flag]
+            if goal_idxs:
+                best_idx = min(goal_idxs, key=lambda i: candidates[i][2])
+                neighbour, hashed_neighbour, neighbour_cost = candidates[best_idx]
+                path_costs[hashed_neighbour] = neighbour_cost
+                if return_path:
+                    path.append(neighbour)
+                    if op_fn is not None:
+                        ops.append(op_fn(node, neighbour))
+                return make_result(neighbour, hashed_neighbour)
+
+        # Score all the children at once, and keep those that improve the
+        # heuristic value, unless the step is random.
+        if h_scores is None and candidates:
+            h_scores = score(candidates)
+        if not random_step and candidates:
+            improving = h_scores < h_score
+            candidates = [c for c, flag in zip(candidates, improving) if flag]
+            h_scores = h_scores[improving]
+
+        # Restart from the initial node at a dead end or a local minimum.
+        if not candidates:
+            if restart_count >= num_restarts:
+                break
+            restart_count += 1
+            node, hashed_node = start_node, hashed_start
+            h_score = start_h_score
+            path, ops = [start_node], []
+            random_step = True
+            continue
+
+        # Move to the best child.
+        if random_step:
+            best_idx = rng.randrange(len(candidates))
+            random_step = False
+        else:
+            f_scores = np.array([c[2] for c in candidates]) + h_scores
+            best_idx = int(np.argmin(f_scores))
+
+        neighbour, hashed_neighbour, neighbour_cost = candidates[best_idx]
+        path_costs[hashed_neighbour] = neighbour_cost
+        if return_path:
+            path.append(neighbour)
+            if op_fn is not None:
+                ops.append(op_fn(node, neighbour))
+        node, hashed_node, h_score = neighbour, hashed_neighbour, h_scores[best_idx]
+        if goal_batch_fn is None and goal_fn(node):
+            return make_result(node, hashed_node)
+
+    # No goal node was found.
+    if return_path:
+        return None, path_costs, None
+    else:
+        return None, None
+
+
+class _HdaSharedState:
+    """Counters shared by the processes of :py:func:`hda_star_search`.
+
+    All fields are updated under the same lock. The search is over when all
+    workers are idle and every batch of nodes that was sent was also received.
+    """
+
+    def __init__(self, ctx, num_workers):
+        self.lock = ctx.Lock()
+        self.stop = ctx.Event()
+        self.num_sent = ctx.Value("q", 0, lock=False)
+        self.num_received = ctx.Value("q", 0, lock=False)
+        self.num_expanded = ctx.Value("q", 0, lock=False)
+        self.idle = ctx.Array("b", num_workers, lock=False)
+        self.goal_cost = ctx.Value("d", float("inf"), lock=False)
+        self.num_goals = ctx.Value("q", 0, lock=False)
+
+    def is_done(self):
+        with self.lock:
+            return all(self.idle) and self.num_sent.value == self.num_received.value
+
+
+def _hda_owner(hashed_node, num_workers):
+    return hash(hashed_node) % num_workers
+
+
+def _hda_worker(
+    worker_id,
+    inboxes,
+    results,
+    shared,
+    expand_fn,
+    goal_fn,
+    heuristic_fn,
+    hash_fn,
+    heuristic_batch_fn,
+    iter_lim,
+    return_path,
+    op_fn,
+    max_cost,
+):
+    """Expand the nodes owned by one worker of :py:func:`hda_star_search`."""
+
+    num_workers = len(inboxes)
+    inbox = inboxes[worker_id]
+    path_costs = {}
+    h_scores = {}
+    predecessors = {}
+    reverse_hashes = {}
+    open_set = HeapOpenList()
+
+    # Nodes are kept after the expansion only if the path is rebuilt from them.
+    keep_nodes = return_path and op_fn is None
+
+    def receive(batch):
+        # Keep the nodes that were reached at a lower cost than before. Expanded
+        # nodes are reopened, since other workers can find cheaper paths late.
+        accepted = []
+        for neighbour, hashed_neighbour, cost, parent in batch:
+            if hashed_neighbour in path_costs and cost >= path_costs[hashed_neighbour]:
+                continue
+            if max_cost is not None and cost > max_cost:
+                continue
+            path_costs[hashed_neighbour] = cost
+            reverse_hashes[hashed_neighbour] = neighbour
+            if return_path:
+                predecessors[hashed_neighbour] = parent
+            accepted.append((neighbour, hashed_neighbour))
+
+        # Compute the missing heuristic values for all the nodes at once.
+        new = [c for c in accepted if c[1] not in h_scores]
+        if heuristic_batch_fn is not None and len(new):
+            new_h_scores = heuristic_batch_fn([c[0] for c in new])
+        else:
+            new_h_scores = [heuristic_fn(c[0]) for c in new]
+        for (_, hashed_neighbour), h_score in zip(new, new_h_scores):
+            h_scores[hashed_neighbour] = h_score
+
+        for _, hashed_neighbour in accepted:
+            f_score = path_costs[hashed_neighbour] + h_scores[hashed_neighbour]
+            if max_cost is not None and f_score > max_cost:
+                if not keep_nodes:
+                    reverse_hashes.pop(hashed_neighbour)
+                continue
+            open_set.push(hashed_neighbour, f_score)
+
+    def send(outboxes):
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                with shared.lock:
+                    shared.num_sent.value += 1
+                inboxes[owner].put(batch)
+
+    def can_expand():
+        if not len(open_set):
+            return False
+        if iter_lim is not None and shared.num_expanded.value >= iter_lim:
+            return False
+        _, f_score = open_set.peek()
+        return f_score < shared.goal_cost.value
+
+    try:
+        while not shared.stop.is_set():
+
+            # Take the nodes sent by the other workers. Marking the worker as
+            # busy together with counting the batch avoids a premature stop.
+            batch = None
+            if not can_expand():
+                with shared.lock:
+                    shared.idle[worker_id] = 1
+                try:
+                    batch = inbox.get(timeout=0.01)
+                except queue.Empty:
+                    continue
+            else:
+                try:
+                    batch = inbox.get_nowait()
+                except queue.Empty:
+                    pass
+            if batch is not None:
+                with shared.lock:
+                    shared.num_received.value += 1
+                    shared.idle[worker_id] = 0
+                receive(batch)
+                continue
+
+            # Expand the node with the lowest f-score.
+            hashed_node, _ = open_set.pop()
+            node = reverse_hashes[hashed_node] if keep_nodes else reverse_hashes.pop(
+                hashed_node
+            )
+            node_cost = path_costs[hashed_node]
+
+            # Record the goal if it is the cheapest so far, and do not expand it.
+            if goal_fn(node):
+                with shared.lock:
+                    improved = node_cost < shared.goal_cost.value
+                    if improved:
+                        shared.goal_cost.value = node_cost
+                        shared.num_goals.value += 1
+                if improved:
+                    results.put(("goal", node, hashed_node, node_cost))
+                continue
+
+            with shared.lock:
+                shared.num_expanded.value += 1
+
+            outboxes = [[] for _ in range(num_workers)]
+            for neighbour, cost in expand_fn(node):
+                hashed_neighbour = hash_fn(neighbour)
+                if op_fn is not None and return_path:
+                    parent = (hashed_node, op_fn(node, neighbour))
+                else:
+                    parent = hashed_node
+                outboxes[_hda_owner(hashed_neighbour, num_workers)].append(
+                    (neighbour, hashed_neighbour, node_cost + cost, parent)
+                )
+            send(outboxes)
+
+        if return_path:
+            nodes = reverse_hashes if keep_nodes else None
+            results.put(("tables", path_costs, predecessors, nodes))
+
+    except Exception as e:
+        results.put(("error", e))
+
+
+def hda_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    op_fn=None,
+    replay_fn=None,
+    num_workers=2,
+    mp_context=None,
+    max_cost=None,
+):
+    """
+    Hash-distributed A* (HDA*) search in several processes.
+
+    Every node is owned by one worker process, chosen by its hash. A worker
+    keeps its own open set and path costs, expands its nodes, and sends the
+    children to their owners through queues. Nodes are reopened when a
+    cheaper path to them arrives, so the solution is optimal for admissible
+    heuristics. The search ends when no worker has a node cheaper than the
+    best goal so far, and no nodes are in transit.
+
+    The functions are used in the worker processes. With the default ``fork``
+    start method they can be any callables, and otherwise have to be
+    picklable. Node hashes have to be the same in all processes. The
+    :py:class:`trickster.utils.counter.ExpansionCounter` of the calling
+    process does not see the expansions.
+
+    Returns the tuple (cost, target_node) if return_path is set to False.
+    Otherwise, returns the target node, the costs of all nodes generated by
+    the workers, and the optimal path from the initial node to the target
+    node.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of expansions, in total over all
+            workers.
+    :param return_path: Whether to return the optimal path from the
+            initial node to the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, every batch of received nodes is evaluated in
+            one call.
+    :param time_lim: Wall-clock time limit in seconds. When it runs out,
+            :py:class:`SearchTimeoutError` is raised, which holds the best
+            goal node found so far, if any.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param op_fn: Returns an operation code for a node and its child. If
+            given, the returned path is a :py:class:`CompactPath`.
+    :param replay_fn: Applies an operation code to a node. See
+            :py:class:`CompactPath`.
+    :param num_workers: Number of worker processes.
+    :param mp_context: Multiprocessing context. By default, uses the
+            ``fork`` start method if it is available.
+    :param max_cost: Budget of the path cost. Nodes whose f-score exceeds it
+            are not queued, so the search ends as soon as no node within
+            the budget is left.
+    """
+
+    # Define default heuristic and hash functions if none given
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+    if mp_context is None:
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        else:
+            mp_context = multiprocessing.get_context()
+
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+    shared = _HdaSharedState(mp_context, num_workers)
+    inboxes = [mp_context.Queue() for _ in range(num_workers)]
+    results = mp_context.Queue()
+
+    # Incumbent solution.
+    goal = None
+    num_goals = 0
+
+    def handle(message):
+        nonlocal goal, num_goals
+        if message[0] == "goal":
+            _, node, hashed_node, cost = message
+            num_goals += 1
+            if goal is None or cost < goal[2]:
+                goal = (node, hashed_node, cost)
+                limits.best_node, limits.best_cost = node, cost
+        elif message[0] == "error":
+            raise message[1]
+
+    # Send the starting node to its owner.
+    hashed_start = hash_fn(start_node)
+    shared.num_sent.value = 1
+    inboxes[_hda_owner(hashed_start, num_workers)].put(
+        [(start_node, hashed_start, 0, None)]
+    )
+
+    workers = [
+        mp_context.Process(
+            target=_hda_worker,
+            args=(
+                worker_id,
+                inboxes,
+                results,
+                shared,
+                expand_fn,
+                goal_fn,
+                heuristic_fn,
+                hash_fn,
+                heuristic_batch_fn,
+                iter_lim,
+                return_path,
+                op_fn,
+                max_cost,
+            ),
+            daemon=True,
+        )
+        for worker_id in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        # Wait for the workers to run out of nodes worth expanding.
+        while not shared.is_done():
+            limits.check()
+            try:
+                handle(results.get(timeout=0.01))
+            except queue.Empty:
+                pass
+        shared.stop.set()
+
+        # Collect the goals that are still in the queue, and the tables of
+        # all the workers if the path is needed.
+        path_costs = {}
+        predecessors = {}
+        nodes = {}
+        num_tables = 0
+        while num_goals < shared.num_goals.value or (
+            return_path and num_tables < num_workers
+        ):
+            try:
+                message = results.get(timeout=0.01)
+            except queue.Empty:
+                limits.check()
+                continue
+            if message[0] == "tables":
+                _, worker_path_costs, worker_predecessors, worker_nodes = message
+                path_costs.update(worker_path_costs)
+                predecessors.update(worker_predecessors)
+                if worker_nodes is not None:
+                    nodes.update(worker_nodes)
+                num_tables += 1
+            else:
+                handle(message)
+        for worker in workers:
+            worker.join()
+
+    finally:
+        shared.stop.set()
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    if goal is None:
+        return (None, path_costs, None) if return_path else (None, None)
+
+    node, hashed_node, cost = goal
+    if not return_path:
+        return (node, cost)
+    if op_fn is not None:
+        optimal_path = _get_compact_path(
+            predecessors, start_node, hashed_node, hash_fn, replay_fn
+        )
+    else:
+        optimal_path = [node]
+        while hashed_node != hashed_start:
+            hashed_node = predecessors[hashed_node]
+            optimal_path.append(nodes[hashed_node])
+        optimal_path.reverse()
+    return node, path_costs, optimal_path
+
+
+class _ParallelIdaSharedState:
+    """State shared by the processes of :py:func:`parallel_ida_star_search`.
+
+    ``min_score`` is the lowest f-score over the bound that the workers saw in
+    the current iteration. ``found`` is set when any worker finds a goal node,
+    and cancels the other workers.
+    """
+
+    def __init__(self, ctx):
+        self.lock = ctx.Lock()
+        self.found = ctx.Event()
+        self.min_score = ctx.Value("d", float("inf"), lock=False)
+
+    def update_min_score(self, score):
+        with self.lock:
+            if score < self.min_score.value:
+                self.min_score.value = score
+
+
+def _parallel_ida_worker(
+    tasks,
+    results,
+    shared,
+    expand_fn,
+    goal_fn,
+    heuristic_fn,
+    hash_fn,
+    heuristic_batch_fn,
+    table_size,
+):
+    """Search the subtrees sent to one worker of :py:func:`parallel_ida_star_search`.
+
+    The transposition table is kept across the tasks and iterations of the
+    search, as in :py:func:`ida_star_search`. Its entries record the bound
+    under which they were searched, so a node is only pruned if this worker
+    already searched it under the current bound, in this or an earlier task
+    of the iteration. Such a task was searched to the end, since a task is
+    only cut short when a goal node is found, which ends the search.
+    """
+
+    limits = _SearchLimits(cancel_token=CancellationToken(shared.found))
+    table = LRUCache(maxsize=table_size) if table_size is not None else None
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            task_id, node, hashed_node, cost, bound = task
+            path_costs = {hashed_node: cost}
+            reverse_hashes = {hashed_node: node}
+            try:
+                is_found, score, _, path = _bounded_search(
+                    [hashed_node],
+                    path_costs,
+                    bound,
+                    expand_fn,
+                    goal_fn,
+                    heuristic_fn,
+                    hash_fn,
+                    reverse_hashes,
+                    heuristic_batch_fn=heuristic_batch_fn,
+                    limits=limits,
+                    table=table,
+                )
+            except SearchCancelledError:
+                results.put(("cancelled", task_id))
+                continue
+
+            if is_found:
+                shared.found.set()
+                nodes = [reverse_hashes[x] for x in path]
+                costs = [path_costs[x] for x in path]
+                results.put(("goal", task_id, path, nodes, costs))
+            else:
+                if score is not None:
+                    shared.update_min_score(score)
+                results.put(("done", task_id))
+
+    except Exception as e:
+        results.put(("error", e))
+
+
+def _split_root(start_node, expand_fn, goal_fn, hash_fn, split_size, limits):
+    """Expand the nodes around the initial node breadth-first until there are
+    at least ``split_size`` of them, or their number stops growing.
+
+    Returns the paths from the initial node to the frontier nodes, as lists of
+    tuples (node, hashed node, cost). Goal nodes are not expanded, and of the
+    paths to the same node only the cheapest one is kept.
+    """
+    frontier = []
+    layer = [[(start_node, hash_fn(start_node), 0)]]
+    while len(layer) and len(frontier) + len(layer) < split_size:
+        goals = []
+        next_layer = {}
+        for path in layer:
+            limits.check()
+            node, _, node_cost = path[-1]
+            if goal_fn(node):
+                goals.append(path)
+                continue
+
+            on_path = {hashed_node for _, hashed_node, _ in path}
+            for neighbour, cost in expand_fn(node):
+                hashed_neighbour = hash_fn(neighbour)
+                if hashed_neighbour in on_path:
+                    continue
+                other = next_layer.get(hashed_neighbour)
+                if other is None or node_cost + cost < other[-1][2]:
+                    next_layer[hashed_neighbour] = path + [
+                        (neighbour, hashed_neighbour, node_cost + cost)
+                    ]
+
+        if len(goals) + len(next_layer) <= len(layer):
+            break
+        frontier.extend(goals)
+        layer = list(next_layer.values())
+
+    return frontier + layer
+
+
+def parallel_ida_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    table_size=None,
+    num_workers=2,
+    split_size=None,
+    mp_context=None,
+    max_cost=None,
+):
+    """
+    IDA* search with the subtrees of the initial node searched in several
+    processes.
+
+    The nodes around the initial node are first expanded breadth-first, until
+    there are at least ``split_size`` of them. In every iteration, the
+    subtrees under these frontier nodes are searched depth-first with the
+    same f-score bound by a pool of worker processes, which take the next
+    subtree as soon as they are done with the previous one. The workers share
+    the lowest f-score that exceeded the bound, which becomes the bound of
+    the next iteration. Once any worker finds a goal node, the others are
+    cancelled. Returns the same solutions as :py:func:`ida_star_search`, if
+    the heuristic is admissible.
+
+    The functions are used in the worker processes, as in
+    :py:func:`hda_star_search`. Nodes have to be picklable, since the frontier
+    nodes and the path to the goal node are sent through queues.
+
+    Returns the tuple (cost, target_node) if return_path is set to False.
+    Otherwise, returns the target node, the costs of the nodes on the optimal
+    path, and the optimal path from the initial node to the target node.
+
+    :param start_node: Initial node.
+    :param expand_fn: Returns an iterable of tuples (neighbour, cost).
+    :param goal_fn: Returns True if the current node is the target node.
+    :param heuristic_fn: Returns an estimate of the cost to the target
+            node. By default, is a constant 0.
+    :param hash_fn: Hash function for nodes. By default equals the
+            identity function f(x) = x.
+    :param iter_lim: Maximum number of iterations to try.
+    :param return_path: Whether to return the optimal path from the
+            initial node to the target node. By default equals False.
+    :param heuristic_batch_fn: Returns an array of estimates for a list of
+            nodes. If given, the frontier nodes, and the children of every
+            node expanded by the workers, are evaluated in one call.
+    :param time_lim: Wall-clock time limit in seconds.
+    :param cancel_token: :py:class:`CancellationToken`.
+    :param table_size: Maximum number of nodes in the transposition table of
+            every worker. See :py:func:`ida_star_search`. A worker keeps its
+            table across the subtrees and iterations it searches. Nodes are
+            only pruned if the same worker searched them under the current
+            bound, and the tables of the workers are not shared.
+    :param num_workers: Number of worker processes.
+    :param split_size: Minimum number of frontier nodes. By default, four
+            times the number of workers, so that the load stays balanced
+            when the subtrees differ in size.
+    :param mp_context: Multiprocessing context. By default, uses the
+            ``fork`` start method if it is available.
+    :param max_cost: Budget of the path cost. The search stops when the bound
+            exceeds it. See :py:func:`ida_star_search`.
+    """
+
+    # Define default heuristic and hash functions if none given
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = lambda x: x
+    if split_size is None:
+        split_size = 4 * num_workers
+    if mp_context is None:
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        else:
+            mp_context = multiprocessing.get_context()
+
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+
+    # Split the search tree, and compute the heuristic values of the frontier.
+    frontier = _split_root(start_node, expand_fn, goal_fn, hash_fn, split_size, limits)
+    frontier_nodes = [path[-1][0] for path in frontier]
+    if heuristic_batch_fn is not None:
+        frontier_h_scores = heuristic_batch_fn(frontier_nodes)
+    else:
+        frontier_h_scores = [heuristic_fn(node) for node in frontier_nodes]
+    for path, h_score in zip(frontier, frontier_h_scores):
+        limits.update_best(path[-1][0], path[-1][2], h_score)
+
+    shared = _ParallelIdaSharedState(mp_context)
+    tasks = mp_context.Queue()
+    results = mp_context.Queue()
+    workers = [
+        mp_context.Process(
+            target=_parallel_ida_worker,
+            args=(
+                tasks,
+                results,
+                shared,
+                expand_fn,
+                goal_fn,
+                heuristic_fn,
+                hash_fn,
+                heuristic_batch_fn,
+                table_size,
+            ),
+            daemon=True,
+        )
+        for _ in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    bound = heuristic_fn(start_node)
+    goal = None
+    iter_count = 0
+
+    try:
+        while goal is None and (iter_lim is None or iter_count < iter_lim):
+            # No goal node is within the budget.
+            if max_cost is not None and bound > max_cost:
+                break
+            shared.min_score.value = float("inf")
+
+            # Send the subtrees within the bound to the workers. The f-scores
+            # of the other frontier nodes count toward the next bound.
+            min_score = float("inf")
+            num_tasks = 0
+            for task_id, (path, h_score) in enumerate(zip(frontier, frontier_h_scores)):
+                node, hashed_node, cost = path[-1]
+                if cost + h_score > bound:
+                    min_score = min(min_score, cost + h_score)
+                    continue
+                tasks.put((task_id, node, hashed_node, cost, bound))
+                num_tasks += 1
+
+            # Wait for all of them, and keep the cheapest goal node. After the
+            # first one is found, the remaining subtrees are cancelled.
+            num_done = 0
+            while num_done < num_tasks:
+                limits.check()
+                try:
+                    message = results.get(timeout=0.01)
+                except queue.Empty:
+                    continue
+                if message[0] == "error":
+                    raise message[1]
+                num_done += 1
+                if message[0] == "goal":
+                    _, task_id, path, nodes, costs = message
+                    if goal is None or costs[-1] < goal[-1][-1]:
+                        goal = (task_id, path, nodes, costs)
+
+            # Set the bound to be equal to the lowest f-score encountered.
+            min_score = min(min_score, shared.min_score.value)
+            if goal is None and min_score == float("inf"):
+                break
+            bound = min_score
+            iter_count += 1
+
+    finally:
+        shared.found.set()
+        for _ in workers:
+            tasks.put(None)
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()
+
+    if goal is None:
+        return (None, {}, None) if return_path else (None, None)
+
+    task_id, path, nodes, costs = goal
+    prefix = frontier[task_id][:-1]
+    if not return_path:
+        return nodes[-1], costs[-1]
+    path_costs = {hashed_node: cost for _, hashed_node, cost in prefix}
+    path_costs.update(zip(path, costs))
+    optimal_path = [node for node, _, _ in prefix] + nodes
+    return nodes[-1], path_costs, optimal_path
+
+
+def external_a_star_search(
+    start_node,
+    expand_fn,
+    goal_fn,
+    heuristic_fn=None,
+    hash_fn=None,
+    iter_lim=None,
+    return_path=False,
+    heuristic_batch_fn=None,
+    memory_lim=100000,
+    spill_dir=None,
+    max_runs=8,
+    serialize_fn=None,
+    deserialize_fn=None,
+    time_lim=None,
+    cancel_token=None,
+    op_fn=None,
+    replay_fn=None,
+    observer=None,
+    max_cost=None,
+):
+    """
+    External-memory A* search.
+
+    Same as :py:func:`a_star_search`, except that only the ``memory_lim`` nodes
+    with the lowest f-scores are kept in memory. The other nodes of the open set
+    are serialized and spilled to sorted runs on disk, and read back when they
+    are needed. See :py:class:`trickster.utils.external.ExternalOpenList`. The
+    path costs and the closed set stay in memory, so use ``op_fn`` to avoid
+    keeping the predecessor nodes as well.
+
+    :param hash_fn: Hash function for nodes. Has to return integers in the
+            signed 64-bit range. By default, ``hash``.
+    :param memory_lim: Maximum number of open nodes kept in memory.
+    :param spill_dir: Directory for the spilled runs. By default, the system
+            temporary directory. The runs are removed when the search returns.
+    :param max_runs: Maximum number of runs before they are merged.
+    :param serialize_fn: Returns the bytes of a node. By default, the
+            ``to_bytes`` method of the nodes, if they have it, such as
+            :py:meth:`trickster.domain.categorical.Node.to_bytes`, and pickle
+            otherwise.
+    :param deserialize_fn: Returns a node given its bytes. By default, the
+            ``from_bytes`` method of the start node, if it has it, and pickle
+            otherwise.
+
+    See :py:func:`generalized_a_star_search` for the other parameters.
+    """
+
+    if heuristic_fn is None:
+        heuristic_fn = lambda _: 0
+    if hash_fn is None:
+        hash_fn = hash
+    if serialize_fn is None and hasattr(start_node, "to_bytes"):
+        serialize_fn = lambda node: node.to_bytes()
+    elif serialize_fn is None:
+        serialize_fn = functools.partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL)
+    if deserialize_fn is None and hasattr(start_node, "from_bytes"):
+        deserialize_fn = start_node.from_bytes
+    elif deserialize_fn is None:
+        deserialize_fn = pickle.loads
+
+    limits = _SearchLimits(time_lim=time_lim, cancel_token=cancel_token)
+    path_costs = {}
+    closed_set = set()
+    predecessors = {}
+
+    # Spilled records of expanded nodes, or of nodes that were reached by a
+    # cheaper path after spilling, are outdated.
+    def is_stale_fn(hashed_node, cost):
+        return hashed_node in closed_set or path_costs[hashed_node] < cost
+
+    def make_result(node, hashed_node):
+        if observer is not None:
+            observer.on_goal(node, hashed_node, path_costs[hashed_node])
+        if return_path and op_fn is not None:
+            optimal_path = _get_compact_path(
+                predecessors, start_node, hashed_node, hash_fn, replay_fn
+            )
+            return node, path_costs, optimal_path
+        elif return_path:
+            optimal_path = _get_optimal_path(predecessors, start_node, node, hash_fn)
+            return node, path_costs, optimal_path
+        else:
+            return (node, path_costs[hashed_node])
+
+    with ExternalOpenList(
+        memory_lim=memory_lim,
+        serialize_fn=serialize_fn,
+        deserialize_fn=deserialize_fn,
+        is_stale_fn=is_stale_fn,
+        spill_dir=spill_dir,
+        max_runs=max_runs,
+    ) as open_set:
+        hashed_start = hash_fn(start_node)
+        path_costs[hashed_start] = 0
+        start_h_score = heuristic_fn(start_node)
+        if max_cost is None or start_h_score <= max_cost:
+            open_set.push(hashed_start, start_h_score, start_node, 0)
+        elif observer is not None:
+            observer.on_prune(hashed_start, "budget")
+
+        iter_count = 0
+        while iter_lim is None or iter_count < iter_lim:
+            limits.check()
+            try:
+                hashed_node, f_score, node = open_set.pop()
+            except IndexError:
+                break
+            node_cost = path_costs[hashed_node]
+            if observer is not None:
+                observer.on_pop(hashed_node, f_score, len(open_set))
+            limits.update_best(node, node_cost, f_score - node_cost)
+
+            if goal_fn(node):
+                return make_result(node, hashed_node)
+
+            # Put the node back if the expansion gets interrupted.
+            try:
+                children = list(expand_fn(node))
+            except Exception:
+                open_set.push(hashed_node, f_score, node, node_cost)
+                raise
+            closed_set.add(hashed_node)
+            if observer is not None:
+                observer.on_expand(hashed_node, node_cost, f_score - node_cost)
+
+            candidates = []
+            for neighbour, cost in children:
+                hashed_neighbour = hash_fn(neighbour)
+                if hashed_neighbour in closed_set:
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "closed")
+                    continue
+
+                tentative_cost = node_cost + cost
+                if hashed_neighbour in path_costs and (
+                    tentative_cost >= path_costs[hashed_neighbour]
+                ):
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "cost")
+                    continue
+                if max_cost is not None and tentative_cost > max_cost:
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "budget")
+                    continue
+
+                path_costs[hashed_neighbour] = tentative_cost
+                if return_path and op_fn is not None:
+                    predecessors[hashed_neighbour] = (
+                        hashed_node,
+                        op_fn(node, neighbour),
+                    )
+                elif return_path:
+                    predecessors[hashed_neighbour] = node
+                if observer is not None:
+                    observer.on_generate(hashed_node, hashed_neighbour, tentative_cost)
+                candidates.append((neighbour, hashed_neighbour, tentative_cost))
+
+            if heuristic_batch_fn is not None and len(candidates):
+                h_scores = heuristic_batch_fn([c[0] for c in candidates])
+            else:
+                h_scores = [heuristic_fn(c[0]) for c in candidates]
+
+            for (neighbour, hashed_neighbour, tentative_cost), h_score in zip(
+                candidates, h_scores
+            ):
+                if max_cost is not None and tentative_cost + h_score > max_cost:
+                    if observer is not None:
+                        observer.on_prune(hashed_neighbour, "budget")
+                    continue
+                open_set.push(
+                    hashed_neighbour,
+                    tentative_cost + h_score,
+                    neighbour,
+                    tentative_cost,
+                )
+
+            iter_count += 1
+
+    # Goal node is unreachable.
+    if return_path:
+        return None, path_costs, None
+    else:
+        return None, None
@@ -0,0 +1,48 @@
+"""
+Bounded caches for the search algorithms.
+"""
+
+import collections
+
+
+class LRUCache:
+    """Dictionary that holds at most ``maxsize`` items.
+
+    When full, inserting a new item evicts the least recently used one. Both
+    lookups with :py:meth:`get` and insertions count as uses.
+
+    :param maxsize: Maximum number of items.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache.get("a")
+    1
+    >>> cache["c"] = 3
+    >>> "b" in cache, len(cache)
+    (False, 2)
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,279 @@
+"""
+External-memory open list.
+
+Nodes of the big transformation graphs, e.g., full-length traces, take much more
+memory than their hashes and costs. The open list below keeps only the nodes with
+the lowest f-scores in memory. The others are serialized and spilled to runs on
+disk, which are sorted by f-score and read back through memory maps when their
+f-layers come up.
+
+Spilled records are not updated when a cheaper path to their node is found, or
+when the node gets expanded. Instead, such duplicates are detected lazily: they
+are skipped when they are read back, and dropped when the runs are merged.
+"""
+
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+_RECORD_DTYPE = np.dtype(
+    [("f", "f8"), ("g", "f8"), ("hash", "i8"), ("offset", "i8"), ("size", "i8")]
+)
+
+
+class _Run:
+    """Run of spilled nodes sorted by f-score.
+
+    Consists of an index of records, stored as a ``.npy`` file, and of a file
+    with the serialized nodes. Both are memory-mapped when read.
+    """
+
+    def __init__(self, path, records, blobs):
+        self.path = path
+        offset = 0
+        with open(path + ".bin", "wb") as f:
+            for i, data in enumerate(blobs):
+                f.write(data)
+                records["offset"][i] = offset
+                records["size"][i] = len(data)
+                offset += len(data)
+        np.save(path + ".npy", records)
+
+        self.records = np.load(path + ".npy", mmap_mode="r")
+        self.blob = np.memmap(path + ".bin", dtype=np.uint8, mode="r") if offset else None
+        self.cursor = 0
+
+    @property
+    def remaining(self):
+        return len(self.records) - self.cursor
+
+    @property
+    def head_f_score(self):
+        return self.records["f"][self.cursor]
+
+    def read(self, i):
+        """Return the serialized node of the i-th record."""
+        record = self.records[i]
+        return self.blob[record["offset"] : record["offset"] + record["size"]].tobytes()
+
+    def delete(self):
+        self.records = None
+        self.blob = None
+        for ext in [".npy", ".bin"]:
+            if os.path.exists(self.path + ext):
+                os.remove(self.path + ext)
+
+
+class ExternalOpenList:
+    """Open list that spills the nodes with the highest f-scores to disk.
+
+    Unlike the in-memory open lists in :py:mod:`trickster.utils.open_list`, stores
+    the nodes and their path costs along with the hashes. When more than
+    ``memory_lim`` nodes are in memory, the worse half of them is written to a new
+    sorted run on disk. When the best spilled f-score is lower than the best one in
+    memory, the next records of its run are read back. When there are more than
+    ``max_runs`` runs, they are merge-sorted into one, and the outdated records
+    are dropped.
+
+    :param memory_lim: Maximum number of nodes kept in memory.
+    :param serialize_fn: Returns the bytes of a node.
+    :param deserialize_fn: Returns a node given its bytes.
+    :param is_stale_fn: Tells whether a spilled record, given the node hash and
+            its path cost, is outdated. By default, no record is.
+    :param spill_dir: Directory for the runs. By default, the system temporary
+            directory. Every open list makes its own subdirectory, which is
+            removed by :py:meth:`close`.
+    :param max_runs: Maximum number of runs before they are merged.
+
+    >>> open_list = ExternalOpenList(memory_lim=2, serialize_fn=str.encode,
+    ...                              deserialize_fn=bytes.decode)
+    >>> for i, node in enumerate(["c", "a", "d", "b"]):
+    ...     open_list.push(i, ord(node), node, 0)
+    >>> open_list.num_spilled
+    2
+    >>> [open_list.pop()[2] for _ in range(4)]
+    ['a', 'b', 'c', 'd']
+    >>> open_list.close()
+    """
+
+    def __init__(
+        self,
+        memory_lim,
+        serialize_fn,
+        deserialize_fn,
+        is_stale_fn=None,
+        spill_dir=None,
+        max_runs=8,
+    ):
+        self.memory_lim = max(int(memory_lim), 2)
+        self.serialize_fn = serialize_fn
+        self.deserialize_fn = deserialize_fn
+        self.is_stale_fn = is_stale_fn
+        self.max_runs = max_runs
+        self.spill_dir = spill_dir
+
+        self._heap = []
+        self._live = {}
+        self._counter = itertools.count()
+        self._runs = []
+        self._run_ids = itertools.count()
+        self._dir = None
+
+        self.num_spilled = 0
+        self.num_merges = 0
+
+    def push(self, item, priority, node, cost):
+        """Add a node, or update the node of an item that is already in memory.
+
+        :param item: Hash of the node. Has to be an integer in the signed 64-bit
+                range, e.g., an output of ``hash``.
+        :param cost: Path cost of the node, passed to ``is_stale_fn``.
+        """
+        count = next(self._counter)
+        self._live[item] = (count, node, cost)
+        heapq.heappush(self._heap, (priority, count, item))
+        if len(self._live) > self.memory_lim:
+            self._spill()
+        elif len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = self._live_entries()
+            heapq.heapify(self._heap)
+
+    def pop(self):
+        """Remove and return the tuple (item, priority, node) with the lowest priority."""
+        while True:
+            entry = self._peek_memory()
+            run = min(self._runs, key=lambda r: r.head_f_score, default=None)
+            if run is not None and (entry is None or run.head_f_score < entry[0]):
+                self._load(run)
+                continue
+            if entry is None:
+                raise IndexError("Open list is empty")
+
+            priority, _, item = heapq.heappop(self._heap)
+            _, node, _ = self._live.pop(item)
+            return item, priority, node
+
+    def _peek_memory(self):
+        heap = self._heap
+        live = self._live
+        while heap:
+            entry = heap[0]
+            if entry[2] in live and live[entry[2]][0] == entry[1]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def _live_entries(self):
+        # An item that was pushed again and then popped leaves stale entries
+        # behind that are no longer in the live table.
+        live = self._live
+        return [e for e in self._heap if e[2] in live and live[e[2]][0] == e[1]]
+
+    def _new_run(self, records, blobs):
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="trickster-", dir=self.spill_dir)
+        path = os.path.join(self._dir, "run-{}".format(next(self._run_ids)))
+        return _Run(path, records, blobs)
+
+    def _spill(self):
+        live = self._live
+        entries = sorted(self._live_entries())
+        num_kept = self.memory_lim // 2
+        kept, spilled = entries[:num_kept], entries[num_kept:]
+
+        records = np.zeros(len(spilled), dtype=_RECORD_DTYPE)
+        blobs = []
+        for i, (priority, _, item) in enumerate(spilled):
+            _, node, cost = live.pop(item)
+            records[i]["f"] = priority
+            records[i]["g"] = cost
+            records[i]["hash"] = item
+            blobs.append(self.serialize_fn(node))
+        self._runs.append(self._new_run(records, blobs))
+        self.num_spilled += len(spilled)
+
+        # A sorted list is a valid heap.
+        self._heap = kept
+        if len(self._runs) > self.max_runs:
+            self._merge()
+
+    def _is_stale(self, record):
+        return self.is_stale_fn is not None and self.is_stale_fn(
+            int(record["hash"]), float(record["g"])
+        )
+
+    def _load(self, run):
+        end = min(run.cursor + max(self.memory_lim // 2, 1), len(run.records))
+        for i in range(run.cursor, end):
+            record = run.records[i]
+            item = int(record["hash"])
+            if self._is_stale(record) or item in self._live:
+                continue
+            node = self.deserialize_fn(run.read(i))
+            count = next(self._counter)
+            self._live[item] = (count, node, float(record["g"]))
+            heapq.heappush(self._heap, (float(record["f"]), count, item))
+        run.cursor = end
+        if not run.remaining:
+            run.delete()
+            self._runs.remove(run)
+        if len(self._live) > self.memory_lim:
+            self._spill()
+
+    def _merge(self):
+        """Merge-sort all runs into one, dropping the outdated records."""
+        sources = []
+        for run_idx, run in enumerate(self._runs):
+            for i in range(run.cursor, len(run.records)):
+                record = run.records[i]
+                if not self._is_stale(record):
+                    sources.append((float(record["f"]), run_idx, i))
+        sources.sort()
+
+        records = np.zeros(len(sources), dtype=_RECORD_DTYPE)
+        for j, (_, run_idx, i) in enumerate(sources):
+            records[j] = self._runs[run_idx].records[i]
+        blobs = (self._runs[run_idx].read(i) for _, run_idx, i in sources)
+        merged = self._new_run(records, blobs)
+
+        for run in self._runs:
+            run.delete()
+        self._runs = [merged] if len(sources) else []
+        if not len(sources):
+            merged.delete()
+        self.num_merges += 1
+
+    @property
+    def num_in_memory(self):
+        return len(self._live)
+
+    @property
+    def num_on_disk(self):
+        """Number of spilled records not read back yet, including outdated ones."""
+        return sum(run.remaining for run in self._runs)
+
+    def close(self):
+        """Remove the spilled runs from disk."""
+        for run in self._runs:
+            run.delete()
+        self._runs = []
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, item):
+        return item in self._live
+
+    def __len__(self):
+        return len(self._live) + self.num_on_disk
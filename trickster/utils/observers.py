@@ -0,0 +1,254 @@
+"""
+Observers of the graph search algorithms.
+
+An observer is passed to a search function as ``observer`` and is notified of
+the search events. Every event handler of :py:class:`SearchObserver` does
+nothing, so subclasses only override the events they need. When no observer
+is given, the search functions skip the notifications altogether.
+
+Nodes are identified by their hashes in all events except
+:py:meth:`SearchObserver.on_goal`.
+"""
+
+import math
+
+
+class SearchObserver:
+    """Base observer that ignores all events."""
+
+    def on_pop(self, hashed_node, f_score, open_size):
+        """Node was taken from the open set (or the stack, for IDA*).
+
+        :param open_size: Number of nodes left in the open set.
+        """
+
+    def on_expand(self, hashed_node, cost, h_score):
+        """Node failed the goal test and is about to be expanded.
+
+        :param cost: Path cost from the initial node.
+        :param h_score: Heuristic value of the node.
+        """
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        """Child was generated and is going to be added to the open set.
+
+        :param cost: Path cost from the initial node to the child.
+        """
+
+    def on_prune(self, hashed_node, reason):
+        """Node was discarded without being expanded.
+
+        :param reason: One of ``"closed"`` (already expanded), ``"cost"``
+                (reached before at a lower or equal cost), ``"path"`` (already
+                on the IDA* path), ``"bound"`` (f-score over the IDA* bound, or not
+                lower than the cost of a known goal node in depth-first
+                branch-and-bound and A*),
+                ``"table"`` (already searched in this IDA* iteration),
+                ``"memory"`` (forgotten by SMA*), ``"depth"`` (at the depth
+                limit of depth-first branch-and-bound), or ``"budget"``
+                (f-score over ``max_cost``).
+        """
+
+    def on_goal(self, node, hashed_node, cost):
+        """Goal node was found.
+
+        :param cost: Path cost from the initial node to the goal.
+        """
+
+    def on_bound_change(self, bound):
+        """Search started a new iteration.
+
+        :param bound: The f-score bound for IDA*, the heuristic weight for
+                ARA*, and the cost of a known goal node for depth-first
+                branch-and-bound and A*.
+        """
+
+
+class OpenSetSizeObserver(SearchObserver):
+    """Records the size of the open set over time.
+
+    :param every: Record the size after every this many pops.
+
+    >>> observer = OpenSetSizeObserver()
+    >>> for size in [1, 3, 2]:
+    ...     observer.on_pop(None, 0, size)
+    >>> observer.sizes, observer.max_size
+    ([1, 3, 2], 3)
+    """
+
+    def __init__(self, every=1):
+        self.every = every
+        self.sizes = []
+        self.num_pops = 0
+
+    def on_pop(self, hashed_node, f_score, open_size):
+        if self.num_pops % self.every == 0:
+            self.sizes.append(open_size)
+        self.num_pops += 1
+
+    @property
+    def max_size(self):
+        return max(self.sizes, default=0)
+
+
+class BranchingFactorObserver(SearchObserver):
+    """Counts the expanded, generated, and pruned nodes.
+
+    >>> observer = BranchingFactorObserver()
+    >>> for parent, child in [(0, 1), (0, 2), (1, 3), (1, 4), (1, 5), (1, 6)]:
+    ...     observer.on_generate(parent, child, 1)
+    >>> observer.on_expand(0, 0, 0)
+    >>> observer.on_expand(1, 1, 0)
+    >>> observer.mean_branching_factor
+    3.0
+    >>> round(observer.effective_branching_factor(depth=2), 3)
+    2.0
+    """
+
+    def __init__(self):
+        self.num_expanded = 0
+        self.num_generated = 0
+        self.num_pruned = {}
+
+    def on_expand(self, hashed_node, cost, h_score):
+        self.num_expanded += 1
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        self.num_generated += 1
+
+    def on_prune(self, hashed_node, reason):
+        self.num_pruned[reason] = self.num_pruned.get(reason, 0) + 1
+
+    @property
+    def mean_branching_factor(self):
+        """Average number of generated children per expanded node."""
+        if self.num_expanded == 0:
+            return 0.0
+        return self.num_generated / self.num_expanded
+
+    def effective_branching_factor(self, depth, tol=1e-6):
+        """Branching factor of a uniform tree with the same number of nodes.
+
+        Solves ``b + b^2 + ... + b^depth = num_generated`` for ``b``.
+
+        :param depth: Depth of the found solution, i.e. the number of edges
+                on its path.
+        """
+        if depth <= 0 or self.num_generated == 0:
+            return 0.0
+
+        def num_nodes(b):
+            return sum(b ** i for i in range(1, depth + 1))
+
+        low, high = 0.0, max(1.0, float(self.num_generated))
+        while high - low > tol:
+            mid = (low + high) / 2
+            if num_nodes(mid) < self.num_generated:
+                low = mid
+            else:
+                high = mid
+        return (low + high) / 2
+
+
+class HeuristicErrorObserver(SearchObserver):
+    """Measures the heuristic error along the path to the goal.
+
+    The heuristic values of the expanded nodes and the parent of every
+    generated node are recorded. Once a goal is found, the error of every
+    expanded node on the path to it is the true remaining cost minus the
+    heuristic value. Positive errors mean the heuristic underestimates.
+
+    >>> observer = HeuristicErrorObserver()
+    >>> observer.on_expand("a", 0, 3)
+    >>> observer.on_generate("a", "b", 2)
+    >>> observer.on_expand("b", 2, 1)
+    >>> observer.on_generate("b", "c", 5)
+    >>> observer.on_goal("C", "c", 5)
+    >>> observer.errors
+    [2, 2]
+    >>> observer.mean_error, round(observer.mean_ratio, 2)
+    (2.0, 0.47)
+    """
+
+    def __init__(self):
+        self._h_scores = {}
+        self._parents = {}
+        self.errors = []
+        self.ratios = []
+
+    def on_expand(self, hashed_node, cost, h_score):
+        self._h_scores[hashed_node] = (cost, h_score)
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        self._parents[hashed_child] = hashed_parent
+
+    def on_goal(self, node, hashed_node, cost):
+        path = [hashed_node]
+        while path[-1] in self._parents:
+            hashed_parent = self._parents[path[-1]]
+            if hashed_parent in path:
+                break
+            path.append(hashed_parent)
+        path.reverse()
+
+        self.errors = []
+        self.ratios = []
+        for hashed_node in path:
+            if hashed_node not in self._h_scores:
+                continue
+            node_cost, h_score = self._h_scores[hashed_node]
+            remaining = cost - node_cost
+            self.errors.append(remaining - h_score)
+            if remaining > 0:
+                self.ratios.append(h_score / remaining)
+
+    @property
+    def mean_error(self):
+        """Average difference between the true remaining cost and the heuristic."""
+        if not self.errors:
+            return math.nan
+        return sum(self.errors) / len(self.errors)
+
+    @property
+    def mean_ratio(self):
+        """Average ratio of the heuristic to the true remaining cost.
+
+        A ratio close to one means the heuristic is nearly exact.
+        """
+        if not self.ratios:
+            return math.nan
+        return sum(self.ratios) / len(self.ratios)
+
+
+class CompositeObserver(SearchObserver):
+    """Forwards every event to each of the given observers.
+
+    :param observers: Observers to notify, in order.
+    """
+
+    def __init__(self, *observers):
+        self.observers = list(observers)
+
+    def on_pop(self, hashed_node, f_score, open_size):
+        for observer in self.observers:
+            observer.on_pop(hashed_node, f_score, open_size)
+
+    def on_expand(self, hashed_node, cost, h_score):
+        for observer in self.observers:
+            observer.on_expand(hashed_node, cost, h_score)
+
+    def on_generate(self, hashed_parent, hashed_child, cost):
+        for observer in self.observers:
+            observer.on_generate(hashed_parent, hashed_child, cost)
+
+    def on_prune(self, hashed_node, reason):
+        for observer in self.observers:
+            observer.on_prune(hashed_node, reason)
+
+    def on_goal(self, node, hashed_node, cost):
+        for observer in self.observers:
+            observer.on_goal(node, hashed_node, cost)
+
+    def on_bound_change(self, bound):
+        for observer in self.observers:
+            observer.on_bound_change(bound)
@@ -0,0 +1,330 @@
+"""
+Open list (priority queue) backends for the graph search algorithms.
+
+An open list stores hashed nodes together with their priorities (f-scores). Lower
+priority values are popped first. Pushing an item that is already in the open list
+replaces its priority, and the outdated heap entry is deleted lazily, i.e. it is
+skipped when it surfaces at the top of the heap.
+
+Ties between equal priorities are broken by an optional integer tie key, lower
+first, and then by the insertion order. The tie key and the insertion counter are
+combined into a single integer, so that the heap entries are compared on at most
+two numbers.
+"""
+
+import collections
+import heapq
+import itertools
+import struct
+
+
+# Insertion counts stay below this, and tie keys are scaled by it.
+_TIE_SCALE = 1 << 48
+_INT64_SIGN = 1 << 63
+
+# Tie keys are 64-bit at most, and grid indices are scaled by this.
+_BUCKET_SCALE = 1 << 64
+
+
+def float_to_tie_key(value):
+    """Map a float to an integer tie key, preserving the order.
+
+    >>> keys = [float_to_tie_key(x) for x in [-float("inf"), -1.5, 0.0, 0.25, 2.0]]
+    >>> keys == sorted(keys)
+    True
+    """
+    (bits,) = struct.unpack("<q", struct.pack("<d", value))
+    if bits < 0:
+        bits = -(bits + _INT64_SIGN)
+    return bits
+
+
+def _make_order(count, tie_key):
+    if tie_key:
+        return tie_key * _TIE_SCALE + count
+    return count
+
+
+class HeapOpenList:
+    """Binary heap open list with lazy deletion of stale entries.
+
+    Items with equal priorities and tie keys are popped in the insertion order.
+
+    >>> open_list = HeapOpenList()
+    >>> open_list.push("a", 2)
+    >>> open_list.push("b", 1)
+    >>> open_list.push("a", 0)
+    >>> len(open_list)
+    2
+    >>> open_list.pop()
+    ('a', 0)
+    >>> open_list.pop()
+    ('b', 1)
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}
+        self._counter = itertools.count()
+
+    def push(self, item, priority, tie_key=0):
+        """Add an item, or update the priority of an item that is already present.
+
+        :param tie_key: Integer that orders the items with equal priorities.
+        """
+        order = _make_order(next(self._counter), tie_key)
+        self._live[item] = order
+        heapq.heappush(self._heap, (priority, order, item))
+        self._maybe_compact()
+
+    def pop(self):
+        """Remove and return the tuple (item, priority) with the lowest priority."""
+        heap = self._heap
+        live = self._live
+        while heap:
+            priority, order, item = heapq.heappop(heap)
+            if live.get(item) == order:
+                del live[item]
+                return item, priority
+        raise IndexError("Open list is empty")
+
+    def discard(self, item):
+        """Remove an item if it is present."""
+        self._live.pop(item, None)
+
+    def peek(self):
+        """Return the tuple (item, priority) with the lowest priority without removing it."""
+        heap = self._heap
+        live = self._live
+        while heap:
+            priority, order, item = heap[0]
+            if live.get(item) == order:
+                return item, priority
+            heapq.heappop(heap)
+        raise IndexError("Open list is empty")
+
+    def _maybe_compact(self):
+        # Rebuild the heap if stale entries outnumber the live ones.
+        if len(self._heap) > 2 * len(self._live) + 64:
+            live = self._live
+            self._heap = [entry for entry in self._heap if live.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def __getstate__(self):
+        # Counters cannot be pickled on all Python versions, so the next
+        # count is stored instead.
+        state = self.__dict__.copy()
+        state["_counter"] = next(self._counter)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter = itertools.count(state["_counter"])
+
+    def __contains__(self, item):
+        return item in self._live
+
+    def __iter__(self):
+        return iter(self._live)
+
+    def __len__(self):
+        return len(self._live)
+
+
+class BoundedHeapOpenList(HeapOpenList):
+    """Open list that holds at most ``maxlen`` items, evicting the worst ones.
+
+    Keeps a pair of heaps over the same entries: a min-heap for popping the best
+    item, and a max-heap for evicting the worst one. Both operations are O(log n).
+    Among items with equal priorities, the one with the highest tie key is evicted
+    first, and then the most recently pushed one.
+
+    :param maxlen: Maximum number of items.
+
+    >>> open_list = BoundedHeapOpenList(maxlen=2)
+    >>> for item, priority in [("a", 3), ("b", 1), ("c", 2)]:
+    ...     open_list.push(item, priority)
+    >>> len(open_list)
+    2
+    >>> "a" in open_list
+    False
+    >>> open_list.pop()
+    ('b', 1)
+    """
+
+    def __init__(self, maxlen):
+        super().__init__()
+        self.maxlen = maxlen
+        self._max_heap = []
+
+    def push(self, item, priority, tie_key=0):
+        order = _make_order(next(self._counter), tie_key)
+        self._live[item] = order
+        heapq.heappush(self._heap, (priority, order, item))
+        heapq.heappush(self._max_heap, (-priority, -order, item))
+        if len(self._live) > self.maxlen:
+            self.pop_worst()
+        self._maybe_compact()
+
+    def pop_worst(self):
+        """Remove and return the tuple (item, priority) with the highest priority."""
+        max_heap = self._max_heap
+        live = self._live
+        while max_heap:
+            neg_priority, neg_order, item = heapq.heappop(max_heap)
+            if live.get(item) == -neg_order:
+                del live[item]
+                return item, -neg_priority
+        raise IndexError("Open list is empty")
+
+    def _maybe_compact(self):
+        if len(self._heap) > 2 * len(self._live) + 64:
+            super()._maybe_compact()
+        if len(self._max_heap) > 2 * len(self._live) + 64:
+            live = self._live
+            self._max_heap = [
+                entry for entry in self._max_heap if live.get(entry[2]) == -entry[1]
+            ]
+            heapq.heapify(self._max_heap)
+
+
+class BucketOpenList(HeapOpenList):
+    """Open list for priorities that lie on a regular grid.
+
+    Keeps a FIFO bucket of items for every grid point in use. Pushing and
+    popping take constant time, except for creating and dropping buckets, which
+    is logarithmic in the number of buckets. The number of buckets is small when
+    the costs and the heuristic values are multiples of the grid step, e.g.,
+    with :py:class:`trickster.linear.LinearGridHeuristic` on a graph with unit
+    transformation costs.
+
+    Priorities are assigned to the nearest grid point, so that floating-point
+    errors do not matter. A priority that is off the grid by more than the
+    tolerance raises a :py:class:`ValueError` instead. Items with equal priorities are popped by their tie
+    keys and then in the insertion order, as in :py:class:`HeapOpenList`. Every
+    tie key in use gets its own bucket. If ``maxlen`` is set, the worst items
+    are evicted, the most recently pushed first, as in
+    :py:class:`BoundedHeapOpenList`.
+
+    :param grid_step: Grid step of the priorities.
+    :param maxlen: Maximum number of items, if any.
+    :param tolerance: Largest distance of a priority to its grid point, in
+            grid steps.
+
+    >>> open_list = BucketOpenList(grid_step=0.5, maxlen=2)
+    >>> for item, priority in [("a", 1.5), ("b", 0.5), ("c", 1.0)]:
+    ...     open_list.push(item, priority)
+    >>> "a" in open_list
+    False
+    >>> open_list.pop()
+    ('b', 0.5)
+    """
+
+    def __init__(self, grid_step, maxlen=None, tolerance=1e-6):
+        super().__init__()
+        self.grid_step = grid_step
+        self.maxlen = maxlen
+        self.tolerance = tolerance
+        self._buckets = {}
+        self._min_keys = []
+        self._max_keys = []
+        self._num_entries = 0
+
+    def push(self, item, priority, tie_key=0):
+        steps = priority / self.grid_step
+        grid_point = int(round(steps))
+        if abs(steps - grid_point) > self.tolerance:
+            raise ValueError(
+                "Priority {} is not a multiple of the grid step {}.".format(
+                    priority, self.grid_step
+                )
+            )
+        count = next(self._counter)
+        self._live[item] = count
+        key = grid_point * _BUCKET_SCALE + tie_key
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = collections.deque()
+            heapq.heappush(self._min_keys, key)
+            heapq.heappush(self._max_keys, -key)
+        bucket.append((count, item, priority))
+        self._num_entries += 1
+        if self.maxlen is not None and len(self._live) > self.maxlen:
+            self.pop_worst()
+        self._maybe_compact()
+
+    def _pop_from(self, keys, sign, pop_entry):
+        buckets = self._buckets
+        live = self._live
+        while keys:
+            key = sign * keys[0]
+            bucket = buckets.get(key)
+            while bucket:
+                count, item, priority = pop_entry(bucket)
+                self._num_entries -= 1
+                if live.get(item) == count:
+                    del live[item]
+                    if not bucket:
+                        del buckets[key]
+                    return item, priority
+            # Drop the exhausted bucket, or a key of a bucket dropped before.
+            heapq.heappop(keys)
+            if bucket is not None:
+                del buckets[key]
+        raise IndexError("Open list is empty")
+
+    def pop(self):
+        return self._pop_from(self._min_keys, 1, collections.deque.popleft)
+
+    def pop_worst(self):
+        """Remove and return the tuple (item, priority) with the highest priority."""
+        return self._pop_from(self._max_keys, -1, collections.deque.pop)
+
+    def peek(self):
+        buckets = self._buckets
+        live = self._live
+        keys = self._min_keys
+        while keys:
+            bucket = buckets.get(keys[0])
+            while bucket:
+                count, item, priority = bucket[0]
+                if live.get(item) == count:
+                    return item, priority
+                bucket.popleft()
+                self._num_entries -= 1
+            if bucket is not None:
+                del buckets[keys[0]]
+            heapq.heappop(keys)
+        raise IndexError("Open list is empty")
+
+    def _maybe_compact(self):
+        # Drop the stale entries if they outnumber the live ones.
+        if self._num_entries > 2 * len(self._live) + 64:
+            live = self._live
+            buckets = {}
+            for key, bucket in self._buckets.items():
+                bucket = collections.deque(
+                    entry for entry in bucket if live.get(entry[1]) == entry[0]
+                )
+                if bucket:
+                    buckets[key] = bucket
+            self._buckets = buckets
+            self._min_keys = list(buckets)
+            heapq.heapify(self._min_keys)
+            self._max_keys = [-key for key in buckets]
+            heapq.heapify(self._max_keys)
+            self._num_entries = sum(len(bucket) for bucket in buckets.values())
+
+
+def make_open_list(beam_size=None, grid_step=None):
+    """Default open list factory.
+
+    :param beam_size: Maximum number of items in the open list, if any.
+    :param grid_step: Grid step of the priorities, if they lie on a regular
+            grid. A :py:class:`BucketOpenList` is then used.
+    """
+    if grid_step is not None:
+        return BucketOpenList(grid_step=grid_step, maxlen=beam_size)
+    if beam_size is None:
+        return HeapOpenList()
+    return BoundedHeapOpenList(maxlen=beam_size)
@@ -0,0 +1,60 @@
+"""
+Compact serialization of node arrays.
+
+Examples in the transformation graphs are mostly one-hot vectors or traces of
+packet directions, so their values are usually binary. Such arrays are stored as
+bit masks, which is 64 times smaller than an array of floats. Other arrays are
+stored as they are.
+"""
+
+import struct
+
+import numpy as np
+
+
+# Kinds of the encoding: values in {0, 1}, values in {-1, 1}, and anything else.
+_ZERO_ONE = 0
+_MINUS_ONE_ONE = 1
+_RAW = 2
+
+_HEADER = struct.Struct("<Bqc")
+
+
+def pack_array(values):
+    """Serialize a one-dimensional array or list of numbers to bytes.
+
+    >>> data = pack_array([1, -1, -1, 1, 1, 1, -1, 1, 1])
+    >>> len(data)
+    12
+    >>> unpack_array(data).tolist()
+    [1, -1, -1, 1, 1, 1, -1, 1, 1]
+    """
+    values = np.asarray(values)
+    if np.all((values == 0) | (values == 1)):
+        kind, payload = _ZERO_ONE, np.packbits(values == 1).tobytes()
+    elif np.all((values == -1) | (values == 1)):
+        kind, payload = _MINUS_ONE_ONE, np.packbits(values == 1).tobytes()
+    else:
+        kind, payload = _RAW, values.tobytes()
+    dtype_char = values.dtype.char.encode()
+    return _HEADER.pack(kind, len(values), dtype_char) + payload
+
+
+def unpack_array(data, offset=0):
+    """Deserialize an array serialized with :py:func:`pack_array`.
+
+    :param offset: Position of the array in ``data``.
+    """
+    kind, length, dtype_char = _HEADER.unpack_from(data, offset)
+    dtype = np.dtype(dtype_char.decode())
+    start = offset + _HEADER.size
+    if kind == _RAW:
+        return np.frombuffer(data, dtype=dtype, count=length, offset=start).copy()
+
+    num_bytes = (length + 7) // 8
+    bits = np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8, count=num_bytes, offset=start)
+    )[:length]
+    if kind == _ZERO_ONE:
+        return bits.astype(dtype)
+    return (2 * bits.astype(np.int8) - 1).astype(dtype)